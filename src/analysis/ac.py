@@ -0,0 +1,214 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from ..domain.compiled import CompiledNetlist, KIND_CODES
+from .tableau import GMIN, build_reactive, build_system
+from .newton import VT, shockley
+from .solver import DENSE_MAX
+from .results import ACResult
+
+AC_METHODS = ("auto", "direct", "prima")
+# Elementos complejos (frecuencias × incógnitas²) por lote de resoluciones
+# densas: acota la memoria de la pila de matrices Y(jω).
+BATCH_ELEMENTS = 1 << 23
+# Reducción PRIMA: dimensión del subespacio y puntos de expansión reales
+# (repartidos logarítmicamente en la banda pedida).
+PRIMA_ORDER = 40
+PRIMA_POINTS = 3
+# Frecuencias en las que se mide el residuo del modelo reducido
+RESIDUAL_SAMPLES = 5
+
+
+def small_signal(cn: CompiledNetlist, sol) -> CompiledNetlist:
+    """
+    Circuito lineal equivalente alrededor del punto de operación `sol`:
+    cada diodo ideal en conducción es una fuente de 0 V y cada uno en corte
+    su GMIN; cada diodo de Shockley, su conductancia dinámica g + GMIN.
+    """
+    kind, value = cn.kind.copy(), cn.value.copy()
+    shk = np.flatnonzero(cn.kind == KIND_CODES["DS"])
+    if len(shk):
+        v = np.zeros(cn.n_nodes)
+        rows = np.flatnonzero(cn.declared & ~cn.is_ground)
+        v[rows] = [sol.node_voltages[cn.node_ids[i]] for i in rows.tolist()]
+        _, g = shockley(v[cn.n1[shk]] - v[cn.n2[shk]], cn.value[shk], cn.aux[shk] * VT)
+        kind[shk] = KIND_CODES["R"]
+        value[shk] = 1.0 / (g + GMIN)
+    dio = np.flatnonzero(cn.kind == KIND_CODES["D"])
+    if not len(dio):
+        return CompiledNetlist(cn.node_ids, cn.is_ground, cn.declared, cn.comp_ids,
+                               kind, cn.n1, cn.n2, value)
+    on = np.array([sol.diode_states[cn.comp_ids[k]] == "ON" for k in dio.tolist()], dtype=bool)
+    kind[dio] = np.where(on, KIND_CODES["V"], KIND_CODES["R"])
+    value[dio] = np.where(on, 0.0, 1.0 / GMIN)
+    # Orientación ánodo → cátodo en n1 → n2
+    flip = cn.value[dio] < 0
+    n1, n2 = cn.n1.copy(), cn.n2.copy()
+    n1[dio], n2[dio] = np.where(flip, cn.n2[dio], cn.n1[dio]), np.where(flip, cn.n1[dio], cn.n2[dio])
+    return CompiledNetlist(cn.node_ids, cn.is_ground, cn.declared, cn.comp_ids,
+                           kind, n1, n2, value)
+
+
+class ACSystem:
+    """
+    MNA de pequeña señal en forma descriptor: (G + s·E)·x = b, E = C + L.
+    - G, C, L: partes conductiva, capacitiva e inductiva (build_system y
+      build_reactive), guardadas por separado.
+    - b: excitación de las fuentes de voltaje (fasores) en sus filas.
+    """
+    def __init__(self, cn: CompiledNetlist):
+        G, _, meta = build_system(cn, sparse=True)
+        if len(meta.dio):
+            raise ValueError("ACSystem necesita el circuito linealizado (ver small_signal).")
+        self.meta = meta
+        self.G = sp.csr_matrix(G)
+        self.C, self.L = build_reactive(meta)
+        self.E = (self.C + self.L).tocsr()
+
+    def rhs(self, inputs=None) -> np.ndarray:
+        """
+        b complejo: inputs asigna a cada ID de fuente su amplitud compleja;
+        None excita todas las fuentes con amplitud 1.
+        """
+        meta = self.meta
+        b = np.zeros(meta.size, dtype=complex)
+        if inputs is None:
+            b[meta.source_rows] = 1.0
+            return b
+        col = {meta.cn.comp_ids[k]: r for k, r in zip(meta.src.tolist(), meta.source_rows.tolist())}
+        for cid, amp in inputs.items():
+            if cid not in col:
+                raise ValueError(f"{cid}: no es una fuente de voltaje del circuito.")
+            b[col[cid]] = amp
+        return b
+
+    def solve_direct(self, s, b, rows) -> np.ndarray:
+        """
+        Solución exacta (n_frec, len(rows)) en cada s: pilas de sistemas
+        densos resueltos por lotes o, con muchas incógnitas, una LU dispersa
+        compleja por frecuencia.
+        """
+        size = self.meta.size
+        out = np.empty((len(s), len(rows)), dtype=complex)
+        if size <= DENSE_MAX:
+            G, E = self.G.toarray(), self.E.toarray()
+            step = max(1, BATCH_ELEMENTS // max(size * size, 1))
+            for i in range(0, len(s), step):
+                si = s[i:i + step, None, None]
+                X = np.linalg.solve(G + si * E, np.broadcast_to(b[:, None], (len(si), size, 1)))
+                out[i:i + step] = X[:, rows, 0]
+            return out
+        G, E = self.G.astype(complex).tocsc(), self.E.astype(complex).tocsc()
+        for i, si in enumerate(s.tolist()):
+            out[i] = spla.splu(G + si * E).solve(b)[rows]
+        return out
+
+    def reduce(self, b, points, order: int = PRIMA_ORDER) -> np.ndarray:
+        """
+        Base ortonormal real V (size × q) de un subespacio de Krylov racional
+        tipo PRIMA: en cada punto real s0, Kₘ((G + s0·E)⁻¹·E, (G + s0·E)⁻¹·b).
+        Cualquier proyección Wᵀ(G + s·E)V no singular iguala m momentos de
+        la respuesta en cada punto.
+        """
+        size = self.meta.size
+        R0 = np.column_stack([b.real, b.imag])
+        R0 = R0[:, np.abs(R0).max(axis=0) > 0]
+        per_point = max(1, -(-order // (len(points) * max(R0.shape[1], 1))))
+        V = np.zeros((size, 0))
+        for s0 in points:
+            lu = spla.splu((self.G + s0 * self.E).tocsc())
+            R = lu.solve(R0)
+            for _ in range(per_point):
+                new = []
+                for r in R.T:
+                    nrm0 = np.linalg.norm(r)
+                    for _ in range(2):              # Gram-Schmidt con reortogonalización
+                        r = r - V @ (V.T @ r)
+                    nrm = np.linalg.norm(r)
+                    if nrm0 == 0.0 or nrm <= 1e-12 * nrm0:
+                        continue                    # dirección ya contenida: se descarta
+                    r = r / nrm
+                    V = np.column_stack([V, r])
+                    new.append(r)
+                if not new or V.shape[1] >= min(order, size):
+                    break
+                R = lu.solve(self.E @ np.column_stack(new))
+            if V.shape[1] >= min(order, size):
+                break
+        return V
+
+    def solve_prima(self, s, b, rows, order: int = PRIMA_ORDER, points=None):
+        """
+        Respuesta (n_frec, len(rows)) del modelo reducido (q × q) resuelto
+        por lotes para todas las frecuencias, y un dict con el orden
+        alcanzado y el residuo relativo máximo del sistema completo en
+        RESIDUAL_SAMPLES frecuencias.
+        """
+        if points is None:
+            w = np.abs(s)
+            lo, hi = max(w.min(), w.max() * 1e-6), w.max()
+            points = np.geomspace(lo, hi, PRIMA_POINTS) if hi > 0 else np.zeros(1)
+        V = self.reduce(b, points, order)
+        q = V.shape[1]
+        # Proyección de Petrov-Galerkin: W = orth((G + s_c·E)·V) con s_c el
+        # punto central. Los momentos los iguala V; con fuentes de voltaje la
+        # congruencia Vᵀ(G + s·E)V puede quedar singular y con W no (en s_c
+        # es VᵀYᵀYV, definida positiva).
+        s_c = float(points[len(points) // 2])
+        W, _ = np.linalg.qr(self.G @ V + s_c * (self.E @ V))
+        Gr = W.T @ (self.G @ V)
+        Er = W.T @ (self.E @ V)
+        br = W.T @ b
+        Y = np.empty((len(s), q), dtype=complex)
+        step = max(1, BATCH_ELEMENTS // max(q * q, 1))
+        for i in range(0, len(s), step):
+            si = s[i:i + step, None, None]
+            Y[i:i + step] = np.linalg.solve(Gr + si * Er,
+                                            np.broadcast_to(br[:, None], (len(si), q, 1)))[:, :, 0]
+        sample = np.unique(np.linspace(0, len(s) - 1, RESIDUAL_SAMPLES).astype(int))
+        nb = np.linalg.norm(b) or 1.0
+        res = 0.0
+        for k in sample.tolist():
+            x = V @ Y[k]
+            res = max(res, float(np.linalg.norm(self.G @ x + s[k] * (self.E @ x) - b)) / nb)
+        info = {"order": q, "points_hz": (np.asarray(points) / (2 * np.pi)).tolist(),
+                "residual": res}
+        return Y @ V[rows].T, info
+
+
+def run_ac(cn: CompiledNetlist, freqs, inputs=None, nodes=None, method: str = "auto",
+           order: int = PRIMA_ORDER) -> ACResult:
+    """
+    Barrido AC de un circuito lineal (o linealizado) ya validado.
+    - freqs: frecuencias en Hz; s = j·2π·f.
+    - nodes: IDs de los nodos sondeados (None = todos los no tierra).
+    - method: "direct" resuelve el sistema completo en cada frecuencia;
+      "prima" proyecta sobre un subespacio de Krylov de dimensión `order`;
+      "auto" usa "direct" hasta DENSE_MAX incógnitas y "prima" por encima.
+    """
+    if method not in AC_METHODS:
+        raise ValueError(f"Método AC desconocido: {method}.")
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+    if np.any(freqs < 0):
+        raise ValueError("Las frecuencias deben ser >= 0.")
+    system = ACSystem(cn)
+    meta = system.meta
+    if nodes is None:
+        node_ids, rows = meta.node_ids, np.arange(meta.n)
+    else:
+        index = {nid: i for i, nid in enumerate(meta.node_ids)}
+        missing = [nid for nid in nodes if nid not in index]
+        if missing:
+            raise ValueError(f"Nodos sin voltaje en el circuito: {', '.join(missing)}.")
+        node_ids, rows = list(nodes), np.array([index[nid] for nid in nodes], dtype=np.int64)
+    b = system.rhs(inputs)
+    s = 2j * np.pi * freqs
+    if method == "auto":
+        method = "direct" if meta.size <= DENSE_MAX else "prima"
+    if method == "direct":
+        H = system.solve_direct(s, b, rows)
+        info = {"method": "direct", "unknowns": meta.size}
+    else:
+        H, info = system.solve_prima(s, b, rows, order)
+        info = dict(info, method="prima", unknowns=meta.size)
+    return ACResult(freq=freqs, node_ids=node_ids, response=H, solver=info)
@@ -0,0 +1,175 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import depth_first_order
+from typing import List
+from ..domain.compiled import CompiledNetlist, KIND_CODES
+
+# Incógnitas por sub-sistema al agrupar bloques: los bloques pequeños se
+# empaquetan juntos (son independientes, la matriz queda diagonal por
+# bloques) y los grandes se resuelven solos.
+CHUNK_UNKNOWNS = 20000
+
+
+class BlockDecomposition:
+    """
+    Bloques biconexos del grafo del circuito (nodos = vértices, componentes
+    = aristas), con un DFS desde GND.
+    - block: bloque de cada componente.
+    - top: nodo de anclaje de cada bloque, el más cercano a GND; es GND o un
+      nodo de corte y sirve de tierra local del bloque.
+    - node_block: bloque en el que cada nodo es interior (-1 en GND y en
+      nodos no alcanzados, que la validación ya rechaza).
+    - parent: bloque del que cuelga cada bloque (-1 si su anclaje es GND).
+    - unknowns: incógnitas MNA de cada bloque (nodos interiores + fuentes
+      + inductores + diodos ideales).
+    Un bloque unido al resto por un solo nodo no intercambia corriente con
+    él (LCK sobre el lado separado), así que cada bloque se resuelve con su
+    anclaje a 0 V y los voltajes se recomponen sumando el del anclaje.
+    """
+    def __init__(self, block, top, node_block, parent, unknowns):
+        self.block = block
+        self.top = top
+        self.node_block = node_block
+        self.parent = parent
+        self.unknowns = unknowns
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.top)
+
+    @property
+    def articulation(self) -> np.ndarray:
+        """
+        Códigos de los nodos de corte (anclajes distintos de GND).
+        """
+        t = np.unique(self.top)
+        return t[self.node_block[t] >= 0]
+
+    def chunks(self, max_unknowns: int = CHUNK_UNKNOWNS) -> List[np.ndarray]:
+        """
+        Reparte los bloques en grupos de hasta max_unknowns incógnitas
+        (un bloque más grande forma su propio grupo), de mayor a menor.
+        """
+        order = np.argsort(-self.unknowns, kind="stable")
+        out, cur, size = [], [], 0
+        for b, u in zip(order.tolist(), self.unknowns[order].tolist()):
+            if cur and size + u > max_unknowns:
+                out.append(np.array(cur, dtype=np.int64))
+                cur, size = [], 0
+            cur.append(b)
+            size += u
+        if cur:
+            out.append(np.array(cur, dtype=np.int64))
+        return out
+
+    def subnetlist(self, cn: CompiledNetlist, blocks) -> tuple:
+        """
+        Sub-circuito de un grupo de bloques: sus componentes, con el anclaje
+        de cada bloque sustituido por una tierra común. Devuelve (sub,
+        códigos globales de los nodos no tierra de sub, posiciones de los
+        componentes en cn).
+        """
+        sel = np.zeros(self.n_blocks, dtype=bool)
+        sel[blocks] = True
+        comps = np.flatnonzero(sel[self.block])
+        nodes = np.flatnonzero((self.node_block >= 0) & sel[np.maximum(self.node_block, 0)])
+        local = np.zeros(cn.n_nodes, dtype=np.int64)
+        local[nodes] = np.arange(1, len(nodes) + 1)
+        top = self.top[self.block[comps]]
+        n1, n2 = cn.n1[comps], cn.n2[comps]
+        # Cada nodo es interior de un solo bloque: en el resto es su anclaje
+        gnd_id = cn.node_ids[int(np.flatnonzero(cn.is_ground)[0])]
+        sub = CompiledNetlist(
+            node_ids=[gnd_id] + [cn.node_ids[i] for i in nodes.tolist()],
+            is_ground=np.arange(len(nodes) + 1) == 0,
+            declared=np.ones(len(nodes) + 1, dtype=bool),
+            comp_ids=[cn.comp_ids[k] for k in comps.tolist()],
+            kind=cn.kind[comps],
+            n1=np.where(n1 == top, 0, local[n1]),
+            n2=np.where(n2 == top, 0, local[n2]),
+            value=cn.value[comps],
+            aux=cn.aux[comps],
+        )
+        return sub, nodes, comps
+
+    def stitch(self, v_local: np.ndarray) -> np.ndarray:
+        """
+        Voltajes globales por código de nodo a partir de los locales (cada
+        nodo respecto del anclaje de su bloque): se suma el voltaje de los
+        anclajes a lo largo del árbol de bloques (saltos de punteros).
+        """
+        top = self.top
+        acc = np.where(self.node_block[top] >= 0, v_local[top], 0.0)
+        parent = self.parent.copy()
+        while np.any(parent >= 0):
+            has = parent >= 0
+            acc[has] += acc[parent[has]]
+            parent[has] = parent[parent[has]]
+        out = v_local.copy()
+        inner = self.node_block >= 0
+        out[inner] += acc[self.node_block[inner]]
+        return out
+
+
+def decompose(cn: CompiledNetlist) -> BlockDecomposition:
+    """
+    Bloques biconexos por Hopcroft-Tarjan sobre un DFS desde GND: el hijo c
+    de p abre un bloque nuevo si low(c) >= disc(p). El DFS lo hace
+    scipy.sparse.csgraph; low se propaga en pre-orden inverso y las
+    etiquetas de bloque se resuelven por saltos de punteros.
+    """
+    n, m = cn.n_nodes, cn.n_components
+    root = int(np.flatnonzero(cn.is_ground)[0])
+    a, b = cn.n1.astype(np.int64), cn.n2.astype(np.int64)
+    G = sp.coo_matrix((np.ones(m, dtype=np.int8), (a, b)), shape=(n, n)).tocsr()
+    order, pred = depth_first_order(G, root, directed=False, return_predecessors=True)
+    pred = pred.astype(np.int64)
+    disc = np.full(n, n, dtype=np.int64)
+    disc[order] = np.arange(len(order))
+
+    # Arista de árbol de cada hijo: la primera entre él y su predecesor; las
+    # demás (incluidas las paralelas) cuentan como aristas de retroceso.
+    child = np.where(pred[b] == a, b, np.where(pred[a] == b, a, -1))
+    cand = np.flatnonzero(child >= 0)
+    _, first = np.unique(child[cand], return_index=True)
+    tree = np.zeros(m, dtype=bool)
+    tree[cand[first]] = True
+    back = np.flatnonzero(~tree)
+
+    low = disc.copy()
+    np.minimum.at(low, a[back], disc[b[back]])
+    np.minimum.at(low, b[back], disc[a[back]])
+    low_l = low.tolist()
+    pred_l = pred.tolist()
+    for v in order[:0:-1].tolist():
+        p = pred_l[v]
+        if low_l[v] < low_l[p]:
+            low_l[p] = low_l[v]
+    low = np.array(low_l, dtype=np.int64)
+
+    # head[v]: nodo que abre el bloque de la arista de árbol (pred[v], v)
+    reached = order[1:]
+    head = np.full(n, -1, dtype=np.int64)
+    head[reached] = np.where(low[reached] >= disc[pred[reached]], reached, pred[reached])
+    while True:
+        nxt = head[np.maximum(head, 0)]
+        step = (head >= 0) & (nxt >= 0) & (head != nxt)
+        if not step.any():
+            break
+        head[step] = nxt[step]
+    heads = np.flatnonzero(head == np.arange(n))
+    bid = np.full(n, -1, dtype=np.int64)
+    bid[heads] = np.arange(len(heads))
+    node_block = np.where(head >= 0, bid[np.maximum(head, 0)], -1)
+
+    # Cada arista pertenece al bloque de su extremo más profundo
+    deep = np.where(disc[a] > disc[b], a, b)
+    block = node_block[deep]
+    top = pred[heads]
+    parent = node_block[top]
+
+    kind = cn.kind
+    branch = np.isin(kind, [KIND_CODES["V"], KIND_CODES["L"], KIND_CODES["D"]])
+    extra = np.bincount(block[branch], minlength=len(heads))
+    unknowns = np.bincount(node_block[node_block >= 0], minlength=len(heads)) + extra
+    return BlockDecomposition(block, top, node_block, parent, unknowns)
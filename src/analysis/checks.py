@@ -1,20 +1,65 @@
-def run_checks(nl, sol, rtol=1e-6, atol=1e-9):
-    V = sol.node_voltages
-    def v(n): return V.get(n, 0.0)
-    kcl = {}
-    for nid, node in nl.nodes.items():
-        if node.is_ground: continue
-        s = 0.0
-        for c in nl.components:
-            if getattr(c, "kind", "") == "R":
-                if c.n1 == nid:
-                    s += (v(c.n1)-v(c.n2))/c.R
-                elif c.n2 == nid:
-                    s -= (v(c.n1)-v(c.n2))/c.R
-        kcl[nid] = {"sum_A": s, "ok": abs(s) <= max(atol, rtol*max(1.0, abs(s)))}
-    kvl = {}
-    for c in nl.components:
-        if getattr(c, "kind", "") == "V":
-            err = (v(c.n1) - v(c.n2)) - c.V
-            kvl[f"KVL_{c.id}"] = {"sum_V": err, "ok": abs(err) <= 1e-6}
-    return {"KCL": kcl, "KVL": kvl}
+import numpy as np
+from ..domain.compiled import as_compiled
+from .results import ArrayMap
+
+# Niveles de verificación: "off" no calcula nada, "summary" solo normas y
+# conteos, "full" añade además el detalle por nodo y por fuente.
+CHECK_LEVELS = ("off", "summary", "full")
+
+
+def _meta_for(nl):
+    from .tableau import Meta
+    return Meta(as_compiled(nl))
+
+
+def _as_array(values, ids, default=0.0):
+    if isinstance(values, ArrayMap) and values.ids == ids:
+        return values.array
+    return np.fromiter((values.get(k, default) for k in ids), dtype=float, count=len(ids))
+
+
+def run_checks(nl, sol, rtol=1e-6, atol=1e-9, level="full", meta=None):
+    """
+    Verifica LCK y LVK en una pasada vectorizada.
+    - LCK: residuo por nodo = incidencia · corrientes de rama (las de los
+      resistores se recalculan desde los voltajes con la Ley de Ohm).
+    - LVK: (v(n1) - v(n2)) - V para cada fuente de voltaje.
+    - meta: el Meta del sistema resuelto (si no se da, se construye desde
+      nl, que puede ser un Netlist o su forma compilada).
+    """
+    if level not in CHECK_LEVELS:
+        raise ValueError(f"Nivel de checks desconocido: {level}.")
+    if level == "off":
+        return {}
+    if meta is None:
+        meta = _meta_for(nl)
+
+    v = _as_array(sol.node_voltages, meta.node_ids)
+    vb = meta.incidence.T @ v
+    # Resistores: Ley de Ohm sobre los voltajes; fuentes, inductores y
+    # diodos (ideales o de Shockley): su corriente
+    I = meta.conductance * vb
+    mna = np.concatenate([meta.mna_branches, meta.shk])
+    I[mna] = _as_array(sol.branch_currents, meta.branch_ids)[mna]
+    r = meta.incidence @ I
+    kcl_ok = np.abs(r) <= np.maximum(atol, rtol * np.maximum(1.0, np.abs(r)))
+
+    vs = meta.cn.value[meta.src]
+    err = vb[meta.source_branches] - vs
+    kvl_ok = np.abs(err) <= 1e-6
+
+    out = {"summary": {
+        "kcl_max": float(np.abs(r).max(initial=0.0)),
+        "kcl_rms": float(np.sqrt(np.mean(r ** 2))) if len(r) else 0.0,
+        "kcl_failed": int((~kcl_ok).sum()),
+        "kvl_max": float(np.abs(err).max(initial=0.0)),
+        "kvl_failed": int((~kvl_ok).sum()),
+        "ok": bool(kcl_ok.all() and kvl_ok.all()),
+    }}
+    if level == "full":
+        out["KCL"] = {nid: {"sum_A": s, "ok": ok}
+                      for nid, s, ok in zip(meta.node_ids, r.tolist(), kcl_ok.tolist())}
+        ids = meta.cn.comp_ids
+        out["KVL"] = {f"KVL_{ids[k]}": {"sum_V": e, "ok": ok}
+                      for k, e, ok in zip(meta.src.tolist(), err.tolist(), kvl_ok.tolist())}
+    return out
@@ -0,0 +1,349 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from typing import Optional
+from ..domain.compiled import CompiledNetlist, KIND_CODES, as_compiled
+from .tableau import Meta, _conductance_pattern, _source_triplets
+from .ordering import OrderedLU
+from .checks import run_checks
+from .results import SweepResult
+
+# Barridos que cambian R: hasta este tamaño se resuelven como un sistema
+# denso apilado (n_puntos × n × n) con np.linalg.solve por lotes; por encima,
+# con hasta BATCH_LOWRANK_MAX resistores variados, por Woodbury sobre la
+# factorización vigente, y con más se refactoriza punto a punto con el orden
+# fijo.
+BATCH_DENSE_MAX = 200
+BATCH_LOWRANK_MAX = 64
+# Máximo de float64 por lote apilado (~128 MB).
+BATCH_MAX_FLOATS = 2 ** 24
+# Resistores cambiados que se resuelven como actualizaciones de rango 1
+# (Sherman-Morrison-Woodbury) sobre la última factorización; con más se
+# refactoriza.
+MAX_LOWRANK = 16
+# Condición máxima del sistema capacitivo de Woodbury antes de refactorizar.
+LOWRANK_MAX_COND = 1e10
+
+
+class CompiledCircuit:
+    """
+    Circuito de topología fija listo para re-simularse cuando solo cambian
+    los valores de R y V.
+    - Guarda el patrón disperso del sistema MNA, la posición de cada
+      estampado dentro de él y el orden de columnas que reduce el relleno
+      (`ordering`, ver analysis.ordering; por defecto "colamd", como
+      simulate), calculado una sola vez. ordering_stats guarda sus estadísticas.
+    - Cambiar una R es una actualización de rango 1 (Δg·u·uᵀ, u = e_n1 - e_n2)
+      que se aplica con Woodbury sobre la última factorización; pasadas
+      MAX_LOWRANK resistores cambiados se refactoriza numéricamente con el
+      mismo orden. Cambiar una V solo cambia el lado derecho y reutiliza la
+      factorización (sustitución hacia atrás).
+    - Trabaja sobre la forma compilada (cn); si se construye desde un
+      Netlist, set_value actualiza también su componente.
+    """
+    def __init__(self, nl, compiled: Optional[CompiledNetlist] = None, ordering: str = "colamd"):
+        self.cn = cn = compiled if compiled is not None else as_compiled(nl)
+        self.nl = None if isinstance(nl, CompiledNetlist) else nl
+        if np.any((cn.kind != KIND_CODES["R"]) & (cn.kind != KIND_CODES["V"])):
+            raise ValueError("CompiledCircuit solo admite resistores y fuentes; use simulate().")
+        self.meta = meta = Meta(cn)
+        n = meta.n
+        self.size = size = meta.size
+
+        # Posición (en el Netlist) -> índice dentro de resistores / fuentes
+        self._res, self._src = meta.res, meta.src
+        self._local = np.full(cn.n_components, -1, dtype=np.int64)
+        self._local[self._res] = np.arange(len(self._res))
+        self._local[self._src] = np.arange(len(self._src))
+        self._res_branch = self._res
+
+        # Valores actuales
+        self.g = meta.conductance[self._res].copy()
+        self.b = np.zeros(size, dtype=float)
+        self.b[n:] = cn.value[self._src]
+
+        # Patrón: estampados de resistores (dependen de g) y de fuentes (±1 fijos)
+        ri, rj = self._ri, self._rj = meta.terminals(self._res)
+        rows, cols, self._sign, self._owner = _conductance_pattern(ri, rj)
+        self._rows, self._cols = rows, cols
+        si, sj = meta.terminals(self._src)
+        br, bc, bv = _source_triplets(si, sj, n)
+        # Análisis simbólico: la primera factorización fija el orden de
+        # columnas, que después se aplica directamente al patrón CSC (la
+        # columna j del sistema permutado es la perm[j]).
+        A0 = sp.coo_matrix((np.concatenate([self._sign * self.g[self._owner], bv]),
+                            (np.concatenate([rows, br]), np.concatenate([cols, bc]))),
+                           shape=(size, size)).tocsc()
+        lu = OrderedLU(A0, ordering)
+        self.ordering = ordering
+        self.ordering_stats = lu.stats
+        self.perm = lu.column_order.astype(np.int64)
+        iperm = np.argsort(self.perm)
+
+        # Posición de cada tripleta en data del CSC permutado (orden col, fila)
+        keys = np.concatenate([iperm[cols], iperm[bc]]) * size + np.concatenate([rows, br])
+        ukeys, slot = np.unique(keys, return_inverse=True)
+        self.nnz = len(ukeys)
+        self._slot_r = slot[:len(rows)]
+        self._const = np.bincount(slot[len(rows):], weights=bv, minlength=self.nnz)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(ukeys // size, minlength=size))])
+        self._A = sp.csc_matrix((self._data(), ukeys % size, indptr), shape=(size, size))
+
+        self._lu = lu            # la factorización inicial resuelve A sin permutar
+        self._lu_permuted = False
+        self.factorizations = 1
+        # Conductancias de la factorización vigente y columnas A⁻¹u ya calculadas
+        self._g_fact = self.g.copy()
+        self._Z = {}
+
+    def _data(self, g=None):
+        g = self.g if g is None else g
+        return self._const + np.bincount(self._slot_r, weights=self._sign * g[self._owner],
+                                         minlength=self.nnz)
+
+    def _position(self, cid: str, kind: str = None) -> int:
+        try:
+            k = self.cn.index_of(cid)
+        except KeyError:
+            k = -1
+        if k < 0 or self._local[k] < 0 or (kind is not None and self.cn.kind[k] != KIND_CODES[kind]):
+            raise KeyError(f"{cid}: no es un resistor ni una fuente del circuito.")
+        return k
+
+    def set_value(self, cid: str, value: float) -> None:
+        """
+        Cambia R (resistor) o V (fuente) de un componente existente.
+        """
+        value = float(value)
+        k = self._position(cid)
+        if self.cn.kind[k] == KIND_CODES["R"]:
+            if not (value > 0):
+                raise ValueError(f"{cid}: la resistencia R debe ser > 0 (actual: {value}).")
+            self.g[self._local[k]] = 1.0 / value
+            self.meta.conductance[k] = 1.0 / value
+            if self.nl is not None and k < len(self.nl.components):
+                self.nl.components[k].R = value
+        else:
+            self.b[self.meta.n + self._local[k]] = value
+            if self.nl is not None and k < len(self.nl.components):
+                self.nl.components[k].V = value
+        self.cn.value[k] = value
+
+    def set_values(self, values: dict) -> None:
+        for cid, value in values.items():
+            self.set_value(cid, value)
+
+    def _factorize(self):
+        # Refactorización numérica con el orden de columnas ya calculado
+        self._A.data = self._data()
+        self._lu = spla.splu(self._A, permc_spec="NATURAL")
+        self._lu_permuted = True
+        self._g_fact = self.g.copy()
+        self._Z = {}
+        self.factorizations += 1
+
+    def _unpermute(self, z):
+        x = np.empty_like(z)
+        x[self.perm] = z
+        return x
+
+    def _base_solve(self, b):
+        z = self._lu.solve(b)
+        return self._unpermute(z) if self._lu_permuted else z
+
+    @property
+    def pending_updates(self) -> int:
+        """
+        Resistores cambiados desde la última factorización.
+        """
+        return int(np.count_nonzero(self.g != self._g_fact))
+
+    def _basis(self, ks):
+        """
+        U = [u_k] de los resistores ks y Z = A₀⁻¹U sobre la factorización
+        vigente (cada columna se calcula una vez por factorización).
+        """
+        U = np.zeros((self.size, len(ks)))
+        cols = np.arange(len(ks))
+        i, j = self._ri[ks], self._rj[ks]
+        U[i[i >= 0], cols[i >= 0]] = 1.0
+        U[j[j >= 0], cols[j >= 0]] = -1.0
+        missing = [c for c, k in enumerate(ks.tolist()) if k not in self._Z]
+        if missing:
+            Zm = self._base_solve(U[:, missing])
+            for c, z in zip(missing, Zm.T):
+                self._Z[int(ks[c])] = z
+        return U, np.stack([self._Z[k] for k in ks.tolist()], axis=1)
+
+    def _lowrank(self, y, ks):
+        """
+        Woodbury: x = y - Z·(I + D·UᵀZ)⁻¹·D·Uᵀy con U = [u_k], D = diag(Δg_k)
+        y Z = A₀⁻¹U (ver _basis).
+        Devuelve None si el sistema pequeño está mal condicionado.
+        """
+        U, Z = self._basis(ks)
+        d = self.g[ks] - self._g_fact[ks]
+        M = np.eye(len(ks)) + d[:, None] * (U.T @ Z)
+        if np.linalg.cond(M) > LOWRANK_MAX_COND:
+            return None
+        Dy = (d * (U.T @ y).T).T          # D·Uᵀy (y puede tener varias columnas)
+        return y - Z @ np.linalg.solve(M, Dy)
+
+    def solve_vector(self, b=None) -> np.ndarray:
+        """
+        Vector solución x del sistema MNA (b puede ser una matriz n×k de
+        lados derechos).
+        """
+        ks = np.flatnonzero(self.g != self._g_fact)
+        if len(ks) > MAX_LOWRANK:
+            self._factorize()
+            ks = ks[:0]
+        b = self.b if b is None else b
+        y = self._base_solve(b)
+        if not len(ks):
+            return y
+        x = self._lowrank(y, ks)
+        if x is None:
+            self._factorize()
+            x = self._base_solve(b)
+        return x
+
+    @property
+    def node_ids(self) -> list:
+        return self.meta.node_ids
+
+    @property
+    def branch_ids(self) -> list:
+        """
+        Resistores y fuentes en el orden del Netlist.
+        """
+        return self.meta.branch_ids
+
+    def is_resistor(self, cid: str) -> bool:
+        try:
+            self._position(cid, "R")
+        except KeyError:
+            return False
+        return True
+
+    def value_of(self, cid: str) -> float:
+        return float(self.cn.value[self._position(cid)])
+
+    def solve_batch(self, ids, values):
+        """
+        Resuelve n_puntos asignaciones de valores sin tocar el Netlist.
+        - ids: componentes que varían; values: matriz (n_puntos, len(ids)).
+        - Si solo varían fuentes: una factorización y n_puntos lados derechos.
+        - Si varían resistores: hasta BATCH_DENSE_MAX incógnitas, sistema
+          denso apilado; por encima, con hasta BATCH_LOWRANK_MAX resistores
+          variados, Woodbury por lotes sobre la factorización vigente (un
+          sistema k×k por punto); si no (o si queda mal condicionado),
+          refactorización numérica por punto con el orden de columnas fijo.
+        - Devuelve X (n_puntos, size) y las conductancias usadas G
+          (n_puntos, n_resistores).
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(ids))
+        P = values.shape[0]
+        n = self.meta.n
+        B = np.repeat(self.b[None, :], P, axis=0)
+        G = np.repeat(self.g[None, :], P, axis=0)
+        varied = []
+        for j, cid in enumerate(ids):
+            p = self._position(cid)
+            k = self._local[p]
+            if self.cn.kind[p] == KIND_CODES["V"]:
+                B[:, n + k] = values[:, j]
+            else:
+                if not np.all(values[:, j] > 0):
+                    raise ValueError(f"{cid}: la resistencia R debe ser > 0 en todos los puntos.")
+                G[:, k] = 1.0 / values[:, j]
+                varied.append(k)
+
+        if not varied:
+            return self.solve_vector(B.T).T, G
+        if self.size <= BATCH_DENSE_MAX:
+            return self._solve_stacked(G, B, varied), G
+        ks = np.unique(varied)
+        if len(ks) <= BATCH_LOWRANK_MAX:
+            X = self._solve_lowrank_batch(G, B, ks, vary_b=len(varied) < len(ids))
+            if X is not None:
+                return X, G
+        X = np.empty_like(B)
+        for p in range(P):
+            self._A.data = self._data(G[p])
+            lu = spla.splu(self._A, permc_spec="NATURAL")
+            X[p] = self._unpermute(lu.solve(B[p]))
+        self._A.data = self._data()
+        return X, G
+
+    def _solve_lowrank_batch(self, G, B, ks, vary_b: bool):
+        """
+        Woodbury por punto sobre la factorización de los valores actuales:
+        Z = A⁻¹U una sola vez y, por punto, (I + D_p·UᵀZ)·α = D_p·Uᵀy_p,
+        x_p = y_p - Z·α. None si algún sistema k×k está mal condicionado.
+        """
+        if self.pending_updates:
+            self._factorize()
+        U, Z = self._basis(ks)
+        W = U.T @ Z
+        if vary_b:
+            Y = self._base_solve(B.T).T
+        else:
+            Y = np.broadcast_to(self._base_solve(self.b), B.shape)
+        k = len(ks)
+        X = np.empty_like(B)
+        chunk = max(1, BATCH_MAX_FLOATS // (k * k + self.size))
+        for s in range(0, B.shape[0], chunk):
+            e = min(s + chunk, B.shape[0])
+            D = G[s:e, ks] - self.g[ks]
+            M = np.eye(k) + D[:, :, None] * W[None, :, :]
+            if np.any(np.linalg.cond(M) > LOWRANK_MAX_COND):
+                return None
+            alpha = np.linalg.solve(M, (D * (Y[s:e] @ U))[:, :, None])[:, :, 0]
+            X[s:e] = Y[s:e] - alpha @ Z.T
+        return X
+
+    def _solve_stacked(self, G, B, varied):
+        # Matriz base densa (sin permutar) + deltas de los resistores que varían
+        base = np.empty((self.size, self.size))
+        base[:, self.perm] = sp.csc_matrix((self._data(), self._A.indices, self._A.indptr),
+                                           shape=self._A.shape).toarray()
+        X = np.empty_like(B)
+        chunk = max(1, BATCH_MAX_FLOATS // (self.size * self.size))
+        for s in range(0, B.shape[0], chunk):
+            e = min(s + chunk, B.shape[0])
+            A = np.repeat(base[None, :, :], e - s, axis=0)
+            for k in varied:
+                m = self._owner == k
+                dg = G[s:e, k] - self.g[k]
+                for r, c, sg in zip(self._rows[m], self._cols[m], self._sign[m]):
+                    A[:, r, c] += sg * dg
+            X[s:e] = np.linalg.solve(A, B[s:e, :, None])[:, :, 0]
+        return X
+
+    def sweep(self, ids, values) -> SweepResult:
+        """
+        Barrido vectorizado: voltajes (n_puntos, n_nodos) y corrientes de
+        rama (n_puntos, n_ramas) para cada fila de values.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(ids))
+        X, G = self.solve_batch(ids, values)
+        V = X[:, :self.meta.n]
+        I = self.meta.branch_currents(X)
+        # Las conductancias de cada punto sustituyen a las nominales
+        I[:, self._res_branch] *= G / self.g
+        return SweepResult(params=list(ids), values=values,
+                           node_ids=self.node_ids, node_voltages=V,
+                           branch_ids=self.meta.branch_ids, branch_currents=I)
+
+    def solve(self, checks: str = "full"):
+        """
+        Resuelve con los valores actuales y devuelve un Solution.
+        - checks: nivel de run_checks ("off", "summary", "full").
+        """
+        x = self.solve_vector()
+        sol = self.meta.reconstruct_solution(x)
+        sol.solver = {"method": "splu", "iterations": 0, "factorizations": self.factorizations,
+                      "lowrank_updates": self.pending_updates, "ordering": self.ordering_stats}
+        sol.checks = run_checks(self.cn, sol, level=checks, meta=self.meta)
+        return sol
@@ -0,0 +1,142 @@
+import numpy as np
+import scipy.sparse as sp
+from .solver import Factorization
+
+# Resistencia del diodo en conducción. Con 0 Ω exactos, dos diodos en
+# paralelo (o un lazo diodo-fuente) dejan A_S singular y la búsqueda se
+# atasca; con RON la caída es despreciable (1 µV por amperio).
+RON = 1e-6
+# Caída máxima admisible en RON: por encima el diodo está cortocircuitando
+# una fuente y la corriente ideal sería ilimitada.
+MAX_ON_DROP = 1e-3
+
+
+class DiodeStateError(RuntimeError):
+    """
+    La búsqueda de estados de los diodos ideales no convergió.
+    """
+
+
+def _row_vectors(meta, size):
+    """
+    Para cada diodo d: fila de corriente r_d y vector de voltaje a_d tal que
+    a_d·x = v(ánodo) - v(cátodo). Se devuelven como matriz densa k×size.
+    """
+    k = len(meta.dio)
+    Dv = np.zeros((k, size))
+    a, c = meta.diode_anode, meta.diode_cathode
+    ka, kc = np.flatnonzero(a >= 0), np.flatnonzero(c >= 0)
+    Dv[ka, a[ka]] += 1.0
+    Dv[kc, c[kc]] -= 1.0
+    return meta.diode_ids, meta.diode_rows, Dv
+
+
+def solve_ideal_diodes(A, b, meta, max_pivots=None, tol=None, ordering="colamd"):
+    """
+    Resuelve un circuito con diodos ideales por pivoteo de estados (LCP).
+    - A, b: sistema MNA de build_system con todos los diodos en corte (A0).
+    - Poner el diodo d en conducción sustituye su fila e_dᵀ por
+      a_dᵀ - RON·e_dᵀ (v_a - v_k = RON·i): A_S = A0 + E_S W_Sᵀ con
+      w_d = a_d - (1 + RON)·e_d. Cada estado se evalúa con
+      Sherman-Morrison-Woodbury sobre UNA factorización de A0: solo cambia
+      un sistema pequeño de tamaño |S|.
+    - Si el sistema pequeño está mal condicionado (nodos alcanzados solo por
+      diodos en corte: A0 solo tiene GMIN y Woodbury pierde RON), el estado
+      se evalúa factorizando A_S directamente.
+    - Se cambian a la vez todos los diodos que violan su estado; si un
+      estado se repite o queda singular, se pasa a pivoteo simple por índice
+      mínimo (regla de Murty), que termina para circuitos pasivos.
+    - ordering: orden de la LU dispersa de A0 (ver analysis.ordering).
+    - Devuelve (x, {id: "ON"/"OFF"}, pivoteos, método de factorización).
+    """
+    size = A.shape[0]
+    ids, rows, Dv = _row_vectors(meta, size)
+    k = len(ids)
+    lu = Factorization(A, ordering)
+
+    # y = A0⁻¹ b y Z = A0⁻¹ E_D: k+1 sustituciones con la misma LU
+    E = np.zeros((size, k + 1))
+    E[:, 0] = b
+    E[rows, np.arange(1, k + 1)] = 1.0
+    YZ = lu.solve(E)
+    y, Z = YZ[:, 0], YZ[:, 1:]
+
+    # Proyecciones k-dimensionales: voltaje y corriente de cada diodo
+    vy, Vz = Dv @ y, Dv @ Z            # v = vy - Vz[:, S] α
+    iy, Iz = y[rows], Z[rows, :]       # i = iy - Iz[:, S] α
+    C = Vz - (1.0 + RON) * Iz          # Wᵀ Z
+    cy = vy - (1.0 + RON) * iy         # Wᵀ y
+
+    if tol is None:
+        tol = 1e-9 * max(1.0, float(np.abs(b).max(initial=0.0)))
+    if max_pivots is None:
+        max_pivots = 4 * k + 20
+
+    def direct(S):
+        # x de A_S = A0 + E_S W_Sᵀ factorizada, o None si es singular
+        W = Dv[S]
+        W[np.arange(len(S)), rows[S]] -= 1.0 + RON
+        r, c = np.nonzero(W)
+        dA = sp.csr_matrix((W[r, c], (rows[S][r], c)), shape=(size, size))
+        AS = (A + dA).tocsc() if sp.issparse(A) else A + dA.toarray()
+        try:
+            x = Factorization(AS, ordering).solve(b)
+        except (np.linalg.LinAlgError, RuntimeError):
+            return None
+        return x if np.all(np.isfinite(x)) else None
+
+    def evaluate(on):
+        # (v, i, α, x) del estado `on` (x solo si se factorizó A_S; si no,
+        # sale de α al final), o None si A_S es numéricamente singular
+        S = np.flatnonzero(on)
+        if not len(S):
+            return vy, iy, np.zeros(0), None
+        M = np.eye(len(S)) + C[np.ix_(S, S)]
+        if np.linalg.cond(M) > 1e12:
+            x = direct(S)
+            return None if x is None else (Dv @ x, x[rows], None, x)
+        alpha = np.linalg.solve(M, cy[S])
+        return vy - Vz[:, S] @ alpha, iy - Iz[:, S] @ alpha, alpha, None
+
+    on = np.zeros(k, dtype=bool)
+    v, i, alpha, x = evaluate(on)
+    seen = {on.tobytes()}
+    single = False
+    pivots = 0
+    while True:
+        bad = np.flatnonzero((~on & (v > tol)) | (on & (i < -tol)))
+        if len(bad) == 0:
+            break
+        if pivots >= max_pivots:
+            raise DiodeStateError(f"Los estados de los diodos no convergieron tras {pivots} pivoteos.")
+        # Primero se cambian todos los infractores; si eso repite un estado
+        # o da un sistema singular, se cambian de uno en uno por índice.
+        trials = [bad] if not single else []
+        trials += [bad[j:j + 1] for j in range(len(bad))]
+        for flip in trials:
+            cand = on.copy()
+            cand[flip] = ~cand[flip]
+            if len(flip) > 1 and cand.tobytes() in seen:
+                continue
+            res = evaluate(cand)
+            if res is not None:
+                break
+        else:
+            raise DiodeStateError("Diodos en conducción cortocircuitan un lazo de fuentes: "
+                                  + ", ".join(ids[j] for j in bad) + ".")
+        if len(flip) == 1:
+            single = True
+        on = cand
+        v, i, alpha, x = res
+        seen.add(on.tobytes())
+        pivots += 1
+
+    S = np.flatnonzero(on)
+    short = np.flatnonzero(on & (RON * i > MAX_ON_DROP))
+    if len(short):
+        raise DiodeStateError("Diodos en conducción cortocircuitan una fuente de voltaje: "
+                              + ", ".join(ids[j] for j in short) + ".")
+    if x is None:
+        x = y - Z[:, S] @ alpha if len(S) else y.copy()
+    states = {d: ("ON" if on[j] else "OFF") for j, d in enumerate(ids)}
+    return x, states, pivots, lu.method
@@ -0,0 +1,190 @@
+import hashlib
+import warnings
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+from ..domain.compiled import CompiledNetlist, KIND_CODES
+from .tableau import build_system
+from .solver import DENSE_MAX, Factorization, LinearSolver
+from .diodes import solve_ideal_diodes
+
+# Macromodelos guardados (LRU por hash de definición), compartidos por todas
+# las simulaciones del proceso.
+MACROMODEL_CACHE_SIZE = 256
+_CACHE: "OrderedDict[str, Macromodel]" = OrderedDict()
+_STATS = {"hits": 0, "misses": 0}
+
+
+class MacromodelError(ValueError):
+    """
+    La definición no admite modelo de puertos (diodos o bloque interno
+    singular): hay que resolver el circuito aplanado.
+    """
+
+
+def definition_key(dcn: CompiledNetlist, port_local, ordering: str = "colamd") -> str:
+    """
+    Hash del contenido eléctrico de una definición: puertos, tierra,
+    tipos, conexiones y valores (no depende de los nombres).
+    """
+    h = hashlib.sha256()
+    h.update(ordering.encode() + b"\0")
+    h.update(np.asarray(port_local, dtype=np.int64).tobytes())
+    h.update(dcn.is_ground.tobytes())
+    h.update(dcn.declared.tobytes())
+    h.update(dcn.kind.tobytes())
+    h.update(dcn.n1.tobytes())
+    h.update(dcn.n2.tobytes())
+    h.update(dcn.value.tobytes())
+    h.update(dcn.aux.tobytes())
+    return h.hexdigest()
+
+
+class Macromodel:
+    """
+    Modelo de puertos de una definición por complemento de Schur.
+    - El MNA de la definición se parte en P (voltajes de los nodos puerto)
+      e I (nodos internos y corrientes de sus fuentes).
+    - Y = A_PP - A_PI·A_II⁻¹·A_IP (p×p) y J = -A_PI·A_II⁻¹·b_I: cada
+      instancia suma Y a la submatriz de sus puertos y J a su lado derecho
+      (equivalente de Norton).
+    - A_II se factoriza una vez y se guarda para reconstruir los nodos
+      internos de todas las instancias en una sola resolución por lotes.
+    """
+    def __init__(self, dcn: CompiledNetlist, port_local, ordering: str = "colamd"):
+        if np.any((dcn.kind == KIND_CODES["D"]) | (dcn.kind == KIND_CODES["DS"])):
+            raise MacromodelError("Subcircuito con diodos: no tiene modelo lineal de puertos.")
+        A, b, meta = build_system(dcn, sparse=True)
+        self.meta = meta
+        self.P = P = meta.node_row[port_local]
+        if np.any(P < 0):
+            raise MacromodelError("Puerto sin fila en el sistema del subcircuito.")
+        keep = np.ones(meta.size, dtype=bool)
+        keep[P] = False
+        self.I = I = np.flatnonzero(keep)
+        A = sp.csr_matrix(A)
+        A_P, A_I = A[P], A[I]
+        A_PP = A_P[:, P].toarray()
+        self.p = p = len(P)
+        if not len(I):
+            self._lu = None
+            self.Y, self.J = A_PP, np.zeros(p)
+            return
+        A_II = A_I[:, I]
+        self._A_IP = A_I[:, P].tocsr()
+        self._b_I = b[I]
+        try:
+            with warnings.catch_warnings():
+                # El aviso de LAPACK por pivote nulo se convierte en MacromodelError
+                warnings.simplefilter("ignore")
+                self._lu = Factorization(A_II.toarray() if len(I) <= DENSE_MAX else A_II.tocsc(), ordering)
+        except (RuntimeError, np.linalg.LinAlgError):
+            raise MacromodelError("El bloque interno del subcircuito es singular.")
+        Z = self._lu.solve(np.column_stack([self._A_IP.toarray(), self._b_I]))
+        if not np.all(np.isfinite(Z)):
+            raise MacromodelError("El bloque interno del subcircuito es singular.")
+        A_PI = A_P[:, I]
+        self.Y = A_PP - A_PI @ Z[:, :p]
+        self.J = -(A_PI @ Z[:, p])
+
+    def expand(self, VP: np.ndarray) -> np.ndarray:
+        """
+        Vectores MNA completos de la definición (K, size) para K instancias
+        con voltajes de puerto VP (K, p).
+        """
+        X = np.empty((VP.shape[0], self.meta.size))
+        X[:, self.P] = VP
+        if self._lu is not None:
+            X[:, self.I] = self._lu.solve(self._b_I[:, None] - self._A_IP @ VP.T).T
+        return X
+
+
+def macromodel_for(dcn: CompiledNetlist, port_local, ordering: str = "colamd") -> Macromodel:
+    """
+    Macromodelo de la definición, desde la caché si ya se calculó.
+    """
+    key = definition_key(dcn, port_local, ordering)
+    mm = _CACHE.get(key)
+    if mm is not None:
+        _CACHE.move_to_end(key)
+        _STATS["hits"] += 1
+        return mm
+    _STATS["misses"] += 1
+    mm = Macromodel(dcn, port_local, ordering)
+    _CACHE[key] = mm
+    while len(_CACHE) > MACROMODEL_CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return mm
+
+
+def cache_stats() -> dict:
+    return dict(_STATS, entries=len(_CACHE))
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+    _STATS["hits"] = _STATS["misses"] = 0
+
+
+def solve_hierarchical(cn: CompiledNetlist, hier, method: str = "auto", ordering: str = "colamd"):
+    """
+    Resuelve un circuito aplanado (cn) usando su jerarquía: el sistema de
+    primer nivel solo tiene sus nodos (incluidos los de los puertos) más el
+    estampado Y/J de cada instancia; después se reconstruyen los nodos y
+    corrientes internos de cada definición en bloque.
+    - Devuelve (voltajes por código de nodo, corrientes por componente,
+      estados de diodos de primer nivel, dict de solver).
+    - MacromodelError si alguna definición no admite modelo de puertos.
+    """
+    models = {name: macromodel_for(g.compiled, g.port_local, ordering)
+              for name, g in hier.groups.items()}
+    top = hier.top(cn)
+    if np.any(top.kind == KIND_CODES["DS"]):
+        raise MacromodelError("Diodos de Shockley en el primer nivel: se resuelve aplanado.")
+    A, b, meta = build_system(top, sparse=True)
+    rows_all, cols_all, vals_all = [], [], []
+    rows_of = {}
+    for name, g in hier.groups.items():
+        mm = models[name]
+        rows = meta.node_row[g.ports]                    # (K, p), -1 = GND
+        rows_of[name] = rows
+        K, p = rows.shape
+        r = np.broadcast_to(rows[:, :, None], (K, p, p)).ravel()
+        c = np.broadcast_to(rows[:, None, :], (K, p, p)).ravel()
+        v = np.broadcast_to(mm.Y, (K, p, p)).ravel()
+        keep = (r >= 0) & (c >= 0)
+        rows_all.append(r[keep])
+        cols_all.append(c[keep])
+        vals_all.append(v[keep])
+        jr = rows.ravel()
+        jv = np.broadcast_to(mm.J, (K, p)).ravel()
+        np.add.at(b, jr[jr >= 0], jv[jr >= 0])
+    A = (sp.csr_matrix(A) + sp.coo_matrix(
+        (np.concatenate(vals_all), (np.concatenate(rows_all), np.concatenate(cols_all))),
+        shape=A.shape).tocsr())
+
+    if len(meta.dio):
+        x, states, pivots, fact = solve_ideal_diodes(A.tocsc(), b, meta, ordering=ordering)
+        solver = {"method": fact, "iterations": 0, "diode_pivots": pivots}
+    else:
+        ls = LinearSolver(method, ordering=ordering)
+        x = ls.solve(A, b)
+        states, solver = {}, ls.info()
+
+    v = np.zeros(cn.n_nodes)
+    v[np.flatnonzero(top.declared & ~top.is_ground)] = x[:meta.n]
+    I = np.empty(cn.n_components)
+    I[:top.n_components] = meta.branch_currents(x)
+    for name, g in hier.groups.items():
+        mm, rows = models[name], rows_of[name]
+        VP = np.where(rows >= 0, x[np.maximum(rows, 0)], 0.0)
+        X = mm.expand(VP)
+        n_int, m = len(g.internal), g.compiled.n_components
+        v[g.node_start[:, None] + np.arange(n_int)] = X[:, mm.meta.node_row[g.internal]]
+        I[g.comp_start[:, None] + np.arange(m)] = mm.meta.branch_currents(X)
+    solver["macromodels"] = {
+        "definitions": len(models),
+        "instances": int(sum(len(g.ids) for g in hier.groups.values())),
+        "top_unknowns": int(meta.size),
+    }
+    return v, I, states, solver
@@ -0,0 +1,213 @@
+import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sp
+from .ordering import OrderedLU
+from .solver import DENSE_MAX
+from .tableau import _conductance_pattern
+
+# Voltaje térmico kT/q a 300 K
+VT = 0.025852
+# Argumento máximo de la exponencial: por encima la característica sigue
+# por su tangente (evita desbordes en iteraciones lejos de la solución).
+EXP_LIMIT = 80.0
+# Criterios de convergencia (como SPICE): paso relativo + absoluto por
+# incógnita (voltios en filas de nodo, amperios en el resto) y residuo.
+RELTOL = 1e-6
+VNTOL = 1e-6
+ABSTOL = 1e-12
+RESTOL = 1e-9
+MAX_ITER = 200
+# Newton modificado: si el residuo no baja al menos a esta fracción, el
+# jacobiano se recalcula en la siguiente iteración.
+REUSE_CONTRACTION = 0.5
+
+
+class NewtonError(RuntimeError):
+    """
+    Newton-Raphson no convergió en MAX_ITER iteraciones, o convergió a un
+    punto con alguna unión en la continuación lineal de la exponencial.
+    """
+
+
+def shockley(v, Is, nvt):
+    """
+    Corriente y conductancia (i, g) del diodo de Shockley
+    i = Is·(exp(v/(n·Vt)) - 1), continuada linealmente por encima de
+    EXP_LIMIT·n·Vt.
+    """
+    a = v / nvt
+    e = np.exp(np.minimum(a, EXP_LIMIT))
+    return Is * (e * (1.0 + np.maximum(a - EXP_LIMIT, 0.0)) - 1.0), Is * e / nvt
+
+
+def pnjlim(vnew, vold, nvt, vcrit):
+    """
+    Limitación de voltaje de unión de SPICE: por encima de vcrit, un salto
+    de más de 2·n·Vt se comprime logarítmicamente.
+    """
+    v = vnew.copy()
+    big = (vnew > vcrit) & (np.abs(vnew - vold) > 2.0 * nvt)
+    up = big & (vold > 0)
+    arg = 1.0 + (vnew[up] - vold[up]) / nvt[up]
+    v[up] = np.where(arg > 0, vold[up] + nvt[up] * np.log(np.maximum(arg, 1e-300)), vcrit[up])
+    low = big & ~(vold > 0)
+    v[low] = nvt[low] * np.log(vnew[low] / nvt[low])
+    return v
+
+
+class NewtonSystem:
+    """
+    F(x) = A·x + D·i(Dᵀ·x) - b: el MNA lineal de build_system (con GMIN en
+    cada diodo de Shockley) más la corriente exponencial de los diodos.
+    - D: columnas +1 en el ánodo y -1 en el cátodo de cada diodo.
+    - Jacobiano J = A + D·diag(g)·Dᵀ sobre un patrón CSC fijo: la posición
+      en J.data de cada entrada de los diodos se calcula una vez y cada
+      iteración solo suma las conductancias.
+    - La primera factorización dispersa elige el orden de columnas
+      (analysis.ordering); las siguientes lo reutilizan (OrderedLU.refactor).
+    """
+    def __init__(self, A, b, meta, ordering: str = "colamd"):
+        if len(meta.dio):
+            raise ValueError("Newton-Raphson no admite diodos ideales junto a diodos de Shockley.")
+        cn, size = meta.cn, meta.size
+        self.meta, self.b, self.ordering = meta, b, ordering
+        self.Is = cn.value[meta.shk]
+        self.nvt = cn.aux[meta.shk] * VT
+        self.vcrit = self.nvt * np.log(self.nvt / (np.sqrt(2.0) * self.Is))
+        Bd = sp.coo_matrix(meta.incidence[:, meta.shk])
+        self.D = sp.csr_matrix((Bd.data, (Bd.row, Bd.col)), shape=(size, len(meta.shk)))
+        self.Dt = self.D.T.tocsr()
+
+        A = sp.coo_matrix(A)
+        self.A = A.tocsr()
+        a, k = meta.terminals(meta.shk)
+        rows, cols, self._sign, self._owner = _conductance_pattern(a, k)
+        J = sp.csc_matrix((np.concatenate([A.data, np.zeros(len(rows))]),
+                           (np.concatenate([A.row, rows]), np.concatenate([A.col, cols]))),
+                          shape=(size, size))
+        J.sum_duplicates()
+        J.sort_indices()
+        keys = np.repeat(np.arange(size, dtype=np.int64), np.diff(J.indptr)) * size + J.indices
+        self._pos = np.searchsorted(keys, cols.astype(np.int64) * size + rows)
+        self._J = J
+        self._base = J.data.copy()
+        self._lu = None
+        self.dense = size <= DENSE_MAX
+        self.factorizations = 0
+
+    def diode_currents(self, x):
+        """
+        (vd, i, g) de cada diodo en x (sin el GMIN en paralelo).
+        """
+        vd = self.Dt @ x
+        i, g = shockley(vd, self.Is, self.nvt)
+        return vd, i, g
+
+    def residual(self, x) -> np.ndarray:
+        return self.A @ x + self.D @ self.diode_currents(x)[1] - self.b
+
+    def factor(self, g) -> None:
+        """
+        Factoriza J = A + D·diag(g)·Dᵀ sobre el patrón fijo.
+        """
+        J = self._J
+        J.data = self._base + np.bincount(self._pos, weights=self._sign * g[self._owner],
+                                          minlength=len(self._base))
+        if self.dense:
+            self._lu = sla.lu_factor(J.toarray(), check_finite=False)
+        elif self._lu is None:
+            self._lu = OrderedLU(J, self.ordering)
+        else:
+            self._lu.refactor(J)
+        self.factorizations += 1
+
+    def solve(self, r) -> np.ndarray:
+        if self.dense:
+            return sla.lu_solve(self._lu, r, check_finite=False)
+        return self._lu.solve(r)
+
+    def run(self, x0=None, jacobian_reuse: int = 1, max_iter: int = MAX_ITER):
+        """
+        Newton-Raphson amortiguado desde x0 (por defecto 0).
+        - Cada paso es Δ = -J⁻¹·F(x); el factor de amortiguación λ ≤ 1 es el
+          mayor que respeta pnjlim en todas las uniones.
+        - jacobian_reuse > 1 activa Newton modificado: el jacobiano se
+          reutiliza hasta jacobian_reuse iteraciones, o menos si el
+          residuo deja de bajar a REUSE_CONTRACTION por iteración.
+        - Devuelve (x, historia) con residuo, paso, λ y si el jacobiano era
+          reutilizado, por iteración. NewtonError si no converge.
+        - Un punto con alguna unión por encima de EXP_LIMIT·n·Vt anula el
+          residuo de la característica continuada, no el de la exponencial
+          real (p. ej. una fuente de voltaje directamente sobre un diodo):
+          también es NewtonError.
+        """
+        n, size = self.meta.n, self.meta.size
+        x = np.zeros(size) if x0 is None else np.array(x0, dtype=float)
+        tol = np.where(np.arange(size) < n, VNTOL, ABSTOL)
+        history = {"residual": [], "step": [], "damping": [], "reused": []}
+        vd, i, g = self.diode_currents(x)
+        F = self.A @ x + self.D @ i - self.b
+        res = np.abs(F).max(initial=0.0)
+        age = jacobian_reuse
+        for _ in range(max_iter):
+            reused = age < jacobian_reuse
+            if not reused:
+                self.factor(g)
+                age = 0
+            age += 1
+            dx = -self.solve(F)
+            vnew = vd + self.Dt @ dx
+            vlim = pnjlim(vnew, vd, self.nvt, self.vcrit)
+            up = vnew > vd
+            lam = float(np.min((vlim - vd)[up] / (vnew - vd)[up], initial=1.0))
+            x = x + lam * dx
+            vd, i, g = self.diode_currents(x)
+            F = self.A @ x + self.D @ i - self.b
+            res_new = np.abs(F).max(initial=0.0)
+            step = lam * dx
+            history["residual"].append(res_new)
+            history["step"].append(float(np.abs(step).max(initial=0.0)))
+            history["damping"].append(lam)
+            history["reused"].append(reused)
+            scale = max(np.abs(self.b).max(initial=0.0), np.abs(i).max(initial=0.0))
+            if (lam == 1.0 and np.all(np.abs(step) <= RELTOL * np.abs(x) + tol)
+                    and res_new <= RESTOL + RELTOL * scale):
+                self._check_physical(vd)
+                return x, history
+            if reused and res_new > REUSE_CONTRACTION * res:
+                age = jacobian_reuse
+            res = res_new
+        raise NewtonError(f"Newton-Raphson no convergió en {max_iter} iteraciones "
+                          f"(residuo {res:.3g}).")
+
+
+    def _check_physical(self, vd) -> None:
+        over = np.flatnonzero(vd > EXP_LIMIT * self.nvt)
+        if len(over):
+            j = int(over[0])
+            cid = self.meta.cn.comp_ids[int(self.meta.shk[j])]
+            raise NewtonError(f"Newton-Raphson: {len(over)} unión(es) fuera del rango de la "
+                              f"exponencial ({cid}: {vd[j]:.3g} V); la corriente no es física "
+                              f"(¿fuente de voltaje directamente sobre el diodo?).")
+
+
+def solve_newton(A, b, meta, ordering: str = "colamd", jacobian_reuse: int = 1):
+    """
+    Resuelve el punto de operación DC con diodos de Shockley.
+    - A, b: sistema lineal de build_system.
+    - Devuelve (x, corrientes por componente, dict de solver con
+      iteraciones, factorizaciones e historia de convergencia).
+    """
+    ns = NewtonSystem(A, b, meta, ordering)
+    x, history = ns.run(jacobian_reuse=jacobian_reuse)
+    I = meta.branch_currents(x)
+    I[meta.shk] += ns.diode_currents(x)[1]
+    solver = {
+        "method": "newton",
+        "factorization": "dense" if ns.dense else "splu",
+        "iterations": len(history["residual"]),
+        "factorizations": ns.factorizations,
+        "jacobian_reuse": jacobian_reuse,
+        "history": history,
+    }
+    return x, I, solver
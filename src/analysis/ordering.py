@@ -0,0 +1,163 @@
+import time
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+# Órdenes de las incógnitas antes de la LU dispersa:
+# - "colamd": grado mínimo aproximado por columnas de SuperLU (por defecto).
+# - "mmd": grado mínimo múltiple sobre Aᵀ+A (SuperLU).
+# - "rcm": Cuthill-McKee inverso sobre el grafo de Aᵀ+A, aplicado como
+#   permutación simétrica; SuperLU factoriza después sin reordenar.
+# - "natural": sin reordenar (orden de inserción de Netlist.nodes).
+ORDERINGS = ("colamd", "mmd", "rcm", "natural")
+_PERMC = {"colamd": "COLAMD", "mmd": "MMD_AT_PLUS_A", "rcm": "NATURAL", "natural": "NATURAL"}
+# Con natural_fill=True, el relleno exacto sin reordenar se mide con una
+# factorización en orden natural solo si su perfil (cota del relleno) no pasa
+# de este número de entradas; por encima se informa solo la cota.
+NATURAL_FILL_MAX = 1 << 22
+
+
+def bandwidth(A, order=None, row_order=None) -> int:
+    """
+    Ancho de banda de A con columnas en `order` y filas en `row_order`
+    (por defecto, las mismas que las columnas; None = natural).
+    """
+    A = sp.coo_matrix(A)
+    if not A.nnz:
+        return 0
+    if row_order is None:
+        row_order = order
+    if order is None and row_order is None:
+        return int(np.abs(A.row - A.col).max())
+    n = A.shape[0]
+    cpos = np.arange(n) if order is None else np.argsort(order)
+    rpos = np.arange(n) if row_order is None else np.argsort(row_order)
+    return int(np.abs(rpos[A.row] - cpos[A.col]).max())
+
+
+def profile(A, order=None) -> int:
+    """
+    Perfil (envolvente) de L+U con filas y columnas en `order` sobre el
+    patrón de Aᵀ+A: cota del nnz de la LU sin pivoteo, sin factorizar.
+    """
+    A = sp.coo_matrix(A)
+    n = A.shape[0]
+    pos = np.arange(n) if order is None else np.argsort(order)
+    r, c = pos[A.row], pos[A.col]
+    first = np.arange(n)
+    np.minimum.at(first, np.maximum(r, c), np.minimum(r, c))
+    return int(n + 2 * (np.arange(n) - first).sum())
+
+
+def symmetric_order(A, ordering: str):
+    """
+    Permutación simétrica a aplicar antes de SuperLU (None si el orden lo
+    elige SuperLU o no se reordena).
+    """
+    if ordering != "rcm":
+        return None
+    P = sp.csr_matrix(A, copy=True)
+    P.data = np.ones_like(P.data)
+    return reverse_cuthill_mckee((P + P.T).tocsr(), symmetric_mode=True).astype(np.int64)
+
+
+class OrderedLU:
+    """
+    LU dispersa (SuperLU) con el orden de incógnitas elegido; deshace la
+    permutación al resolver.
+    - stats: orden, ancho de banda antes/después (el de después con las
+      filas tal como las pivotó SuperLU y las columnas en column_order),
+      perfil antes/después (el de después solo con órdenes simétricos,
+      "rcm" y "natural"; None con "colamd"/"mmd"), nnz de A y de L+U, y
+      "fill" = (relleno natural, relleno con el orden) = nnz(L+U) - nnz(A).
+    - El relleno natural ("nnz_LU_natural") solo se mide con
+      natural_fill=True (una segunda factorización, si el perfil natural no
+      pasa de NATURAL_FILL_MAX) o con ordering="natural"; si no, es None.
+      compare_orderings lo toma de la factorización "natural".
+    - column_order / row_order: orden efectivo de columnas y filas de A.
+    - refactor(A) vuelve a factorizar una matriz con el mismo patrón
+      reutilizando el orden de columnas ya calculado.
+    """
+    def __init__(self, A, ordering: str = "colamd", natural_fill: bool = False):
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Orden desconocido: {ordering}.")
+        A = sp.csc_matrix(A)
+        self.ordering = ordering
+        self.perm = perm = symmetric_order(A, ordering)
+        Ap = A if perm is None else A[perm][:, perm].tocsc()
+        self._lu = lu = spla.splu(Ap, permc_spec=_PERMC[ordering])
+        self._cols = None
+        # Orden efectivo de las columnas: permutación simétrica + la de SuperLU
+        self._order = cols = np.argsort(lu.perm_c)
+        self.column_order = order = cols if perm is None else perm[cols]
+        rows = np.argsort(lu.perm_r)
+        self.row_order = rows if perm is None else perm[rows]
+        nnz_LU = int(lu.L.nnz + lu.U.nnz)
+        if ordering == "natural":
+            natural = nnz_LU
+        elif natural_fill and profile(A) <= NATURAL_FILL_MAX:
+            nat = spla.splu(A, permc_spec="NATURAL")
+            natural = int(nat.L.nnz + nat.U.nnz)
+        else:
+            natural = None
+        symmetric = ordering in ("rcm", "natural")
+        self.stats = {
+            "ordering": ordering,
+            "bandwidth": (bandwidth(A), bandwidth(A, order, self.row_order)),
+            "profile": (profile(A), profile(A, perm) if symmetric else None),
+            "nnz_A": int(A.nnz),
+            "nnz_LU": nnz_LU,
+            "nnz_LU_natural": natural,
+        }
+        self._update_fill()
+
+    def _update_fill(self) -> None:
+        st = self.stats
+        natural = st["nnz_LU_natural"]
+        st["fill"] = (None if natural is None else natural - st["nnz_A"], st["nnz_LU"] - st["nnz_A"])
+
+    def refactor(self, A) -> None:
+        """
+        Factorización numérica de A (mismo patrón que la matriz original)
+        con las columnas ya ordenadas: SuperLU no vuelve a calcular el orden.
+        """
+        A = sp.csc_matrix(A)
+        Ap = A if self.perm is None else A[self.perm][:, self.perm]
+        self._cols = self._order
+        self._lu = lu = spla.splu(Ap[:, self._cols].tocsc(), permc_spec="NATURAL")
+        self.stats["nnz_LU"] = int(lu.L.nnz + lu.U.nnz)
+        self._update_fill()
+
+    def solve(self, B):
+        B = np.asarray(B, dtype=float)
+        Bp = B if self.perm is None else B[self.perm]
+        Y = self._lu.solve(Bp)
+        if self._cols is not None:
+            Z = np.empty_like(Y)
+            Z[self._cols] = Y
+            Y = Z
+        if self.perm is None:
+            return Y
+        X = np.empty_like(B)
+        X[self.perm] = Y
+        return X
+
+
+def compare_orderings(A, orderings=ORDERINGS) -> dict:
+    """
+    Factoriza A con cada orden y devuelve {orden: stats + "time_s"}; el
+    tiempo es solo el de su factorización (el relleno natural de referencia
+    sale de la de "natural", si está en `orderings`).
+    """
+    out = {}
+    for name in orderings:
+        t0 = time.perf_counter()
+        lu = OrderedLU(A, name, natural_fill=False)
+        out[name] = dict(lu.stats, time_s=time.perf_counter() - t0)
+    if "natural" in out:
+        natural = out["natural"]["nnz_LU"]
+        for st in out.values():
+            st["nnz_LU_natural"] = natural
+            st["fill"] = (natural - st["nnz_A"], st["fill"][1])
+    return out
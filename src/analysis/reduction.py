@@ -0,0 +1,164 @@
+import numpy as np
+from ..domain.compiled import CompiledNetlist, KIND_CODES
+
+# Prefijo de los IDs de los resistores equivalentes del circuito reducido
+REDUCED_PREFIX = "~eq"
+
+
+class Reduction:
+    """
+    Circuito reducido por serie/paralelo y datos para deshacer la reducción.
+    - reduced: CompiledNetlist reducido. Conserva GND, las fuentes, los
+      diodos y los resistores no eliminados (en ese orden, con sus IDs); los
+      equivalentes se llaman "~eq<k>".
+    - kept: código en cn de cada nodo de reduced.
+    - stats: tamaño antes/después y número de reducciones de cada tipo.
+    """
+    def __init__(self, cn, reduced, kept, records, stats):
+        self.cn = cn
+        self.reduced = reduced
+        self.kept = kept
+        self._records = records
+        self.stats = stats
+
+    def expand(self, v_reduced, i_reduced):
+        """
+        Voltajes (por código de nodo de cn) y corrientes (por componente de
+        cn) del circuito original a partir de la solución reducida.
+        - v_reduced: voltajes de los nodos no tierra de reduced, en orden.
+        - Los nodos eliminados se rellenan en orden inverso: un nodo en
+          serie es el divisor de voltaje entre sus dos vecinos; uno colgante
+          toma el voltaje de su vecino.
+        - Las corrientes de los resistores salen de la Ley de Ohm; las de
+          fuentes y diodos, de la solución reducida.
+        """
+        cn, red = self.cn, self.reduced
+        v = np.zeros(cn.n_nodes)
+        v[self.kept[~red.is_ground]] = v_reduced
+        vl = v.tolist()
+        for x, a, b, t in reversed(self._records):
+            vl[x] = vl[a] if b < 0 else vl[a] + (vl[b] - vl[a]) * t
+        v = np.array(vl)
+        I = np.empty(cn.n_components)
+        res = cn.kind == KIND_CODES["R"]
+        other = np.flatnonzero(~res)
+        I[other] = np.asarray(i_reduced)[:len(other)]
+        I[res] = (v[cn.n1[res]] - v[cn.n2[res]]) / cn.value[res]
+        return v, I
+
+
+def reduce_network(cn: CompiledNetlist) -> Reduction:
+    """
+    Reduce un circuito validado antes de ensamblarlo:
+    - paralelo: resistores entre el mismo par de nodos -> R = 1/Σ(1/Ri);
+    - serie: nodo interno con exactamente dos resistores y nada más
+      conectado -> un resistor entre sus vecinos, R = R1 + R2;
+    - colgante: nodo con un solo resistor (no lleva corriente) -> se quita.
+    Las reducciones se encadenan (una serie puede dejar un paralelo y al
+    revés) con una lista de trabajo. GND y los nodos con fuentes o diodos
+    no se eliminan.
+    """
+    res = np.flatnonzero(cn.kind == KIND_CODES["R"])
+    other = np.flatnonzero(cn.kind != KIND_CODES["R"])
+    n = cn.n_nodes
+    # Nodos fijos: GND y terminales de fuentes/diodos
+    fixed = cn.is_ground.copy()
+    fixed[cn.n1[other]] = True
+    fixed[cn.n2[other]] = True
+    fixed = fixed.tolist()
+
+    ea = cn.n1[res].tolist()
+    eb = cn.n2[res].tolist()
+    er = cn.value[res].tolist()
+    alive = [True] * len(ea)
+    adj = [dict() for _ in range(n)]     # nodo -> {vecino: arista}
+    n_series = n_parallel = n_dangling = 0
+
+    def add(a, b, r):
+        # Nueva arista a-b; si ya hay una, se funden en paralelo
+        nonlocal n_parallel
+        e = adj[a].get(b)
+        if e is not None:
+            alive[e] = False
+            r = er[e] * r / (er[e] + r)
+            n_parallel += 1
+        e = len(ea)
+        ea.append(a)
+        eb.append(b)
+        er.append(r)
+        alive.append(True)
+        adj[a][b] = adj[b][a] = e
+
+    for e in range(len(ea)):
+        a, b = ea[e], eb[e]
+        if b in adj[a]:
+            alive[e] = False
+            add(a, b, er[e])
+        else:
+            adj[a][b] = adj[b][a] = e
+
+    records = []                          # (nodo, a, b, t) con v = v_a + (v_b - v_a)·t
+    eliminated = [False] * n
+    work = [x for x in range(n) if not fixed[x] and len(adj[x]) <= 2]
+    while work:
+        x = work.pop()
+        if eliminated[x] or fixed[x]:
+            continue
+        nb = adj[x]
+        if len(nb) == 1:
+            (a, e), = nb.items()
+            alive[e] = False
+            del adj[a][x]
+            nb.clear()
+            records.append((x, a, -1, 0.0))
+            touched = (a,)
+            n_dangling += 1
+        elif len(nb) == 2:
+            (a, e1), (b, e2) = nb.items()
+            r1, r2 = er[e1], er[e2]
+            alive[e1] = alive[e2] = False
+            del adj[a][x], adj[b][x]
+            nb.clear()
+            records.append((x, a, b, r1 / (r1 + r2)))
+            add(a, b, r1 + r2)
+            touched = (a, b)
+            n_series += 1
+        else:
+            continue
+        eliminated[x] = True
+        work.extend(y for y in touched if not fixed[y] and len(adj[y]) <= 2)
+
+    kept = np.flatnonzero(cn.declared & ~np.array(eliminated, dtype=bool))
+    code = np.full(n, -1, dtype=np.int64)
+    code[kept] = np.arange(len(kept))
+    live = np.flatnonzero(np.array(alive, dtype=bool))
+    nres = len(res)
+    ea_a, eb_a = np.array(ea, dtype=np.int64), np.array(eb, dtype=np.int64)
+    comp_ids = ([cn.comp_ids[k] for k in other.tolist()]
+                + [cn.comp_ids[res[e]] if e < nres else f"{REDUCED_PREFIX}{e - nres}"
+                   for e in live.tolist()])
+    reduced = CompiledNetlist(
+        node_ids=[cn.node_ids[i] for i in kept.tolist()],
+        is_ground=cn.is_ground[kept],
+        declared=np.ones(len(kept), dtype=bool),
+        comp_ids=comp_ids,
+        kind=np.concatenate([cn.kind[other], np.full(len(live), KIND_CODES["R"], dtype=np.int8)]),
+        n1=code[np.concatenate([cn.n1[other], ea_a[live]])],
+        n2=code[np.concatenate([cn.n2[other], eb_a[live]])],
+        value=np.concatenate([cn.value[other], np.array(er)[live]]),
+        aux=np.concatenate([cn.aux[other], np.zeros(len(live))]),
+    )
+
+    def unknowns(c):
+        branch = np.isin(c.kind, [KIND_CODES["V"], KIND_CODES["L"], KIND_CODES["D"]])
+        return int((c.declared & ~c.is_ground).sum()) + int(branch.sum())
+
+    stats = {
+        "nodes": (int(cn.declared.sum()), len(kept)),
+        "components": (cn.n_components, reduced.n_components),
+        "unknowns": (unknowns(cn), unknowns(reduced)),
+        "series": n_series,
+        "parallel": n_parallel,
+        "dangling": n_dangling,
+    }
+    return Reduction(cn, reduced, kept, records, stats)
@@ -1,4 +1,38 @@
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+import numpy as np
+
+
+class ArrayMap(Mapping):
+    """
+    Vista de solo lectura tipo dict sobre (ids, array). El índice id → fila
+    solo se construye al primer acceso por clave; items() recorre los arrays
+    directamente. El array queda disponible en `.array`.
+    """
+    __slots__ = ("ids", "array", "_index")
+
+    def __init__(self, ids, array):
+        self.ids = ids
+        self.array = array
+        self._index = None
+
+    def __getitem__(self, key):
+        if self._index is None:
+            self._index = {k: i for i, k in enumerate(self.ids)}
+        return float(self.array[self._index[key]])
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def items(self):
+        return zip(self.ids, self.array.tolist())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
 
 @dataclass
 class Solution:
@@ -6,3 +40,84 @@ class Solution:
     branch_currents: dict[str, float] = field(default_factory=dict)
     diode_states: dict[str, str] = field(default_factory=dict)
     checks: dict[str, dict] = field(default_factory=dict)
+    solver: dict[str, object] = field(default_factory=dict)
+
+@dataclass
+class SweepResult:
+    """
+    Resultados de un barrido: una fila por punto.
+    - values: (n_puntos, n_parámetros), en el orden de params.
+    - node_voltages: (n_puntos, n_nodos), columnas según node_ids.
+    - branch_currents: (n_puntos, n_ramas), columnas según branch_ids.
+    """
+    params: list[str]
+    values: np.ndarray
+    node_ids: list[str]
+    node_voltages: np.ndarray
+    branch_ids: list[str]
+    branch_currents: np.ndarray
+
+@dataclass
+class MonteCarloResult:
+    """
+    Estadísticos de un análisis de Monte Carlo (sin guardar las muestras).
+    - signals: nombres "V(nodo)" / "I(componente)", columnas de los arrays.
+    - quantiles: (len(q), n_señales), estimados sobre una submuestra uniforme.
+    - yield_: fracción de muestras que cumple todos los límites.
+    """
+    n_samples: int
+    signals: list[str]
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    q: tuple
+    quantiles: np.ndarray
+    yield_: float = 1.0
+    limit_yield: dict[str, float] = field(default_factory=dict)
+
+@dataclass
+class TransientResult:
+    """
+    Formas de onda de un análisis transitorio: una fila por instante guardado.
+    - time: (n_puntos,) en segundos.
+    - node_voltages: (n_puntos, n_nodos), columnas según node_ids.
+    - branch_currents: (n_puntos, n_ramas), columnas según branch_ids (vacío
+      si no se pidieron corrientes).
+    - solver: integrador, paso, número de pasos y cómo se resolvió cada paso.
+    """
+    time: np.ndarray
+    node_ids: list[str]
+    node_voltages: np.ndarray
+    branch_ids: list[str]
+    branch_currents: np.ndarray
+    solver: dict[str, object] = field(default_factory=dict)
+
+@dataclass
+class ACResult:
+    """
+    Respuesta en frecuencia de pequeña señal: una fila por frecuencia.
+    - response: (n_frec, n_nodos) fasores de los nodos sondeados, columnas
+      según node_ids.
+    - magnitude / magnitude_db / phase: módulo, módulo en dB y fase en
+      grados (desenrollada a lo largo de la frecuencia).
+    - solver: método ("direct" o "prima") y, con reducción, el orden y el
+      residuo relativo del modelo reducido.
+    """
+    freq: np.ndarray
+    node_ids: list[str]
+    response: np.ndarray
+    solver: dict[str, object] = field(default_factory=dict)
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        return np.abs(self.response)
+
+    @property
+    def magnitude_db(self) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            return 20.0 * np.log10(np.abs(self.response))
+
+    @property
+    def phase(self) -> np.ndarray:
+        return np.degrees(np.unwrap(np.angle(self.response), axis=0))
@@ -1,5 +1,371 @@
 import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import connected_components, shortest_path
+from .ordering import ORDERINGS, OrderedLU
+
+# Política "auto": sistemas hasta este tamaño (o más densos que DENSE_FILL)
+# se resuelven con LAPACK denso; el resto con los backends dispersos.
+DENSE_MAX = 400
+DENSE_FILL = 0.1
+# Relación máxima entre elementos diagonales del bloque nodal (NodalBlock)
+# para confiar en el criterio de parada de CG (con escalas muy dispares el
+# residuo relativo engaña).
+CG_MAX_SPREAD = 1e8
+
+
+class SolverBackend:
+    """
+    Interfaz de un backend de resolución: solve(A, b) -> (x, iteraciones).
+    Los métodos directos reportan 0 iteraciones.
+    """
+    name = "base"
+
+    def solve(self, A, b):
+        raise NotImplementedError
+
+
+class DenseBackend(SolverBackend):
+    name = "dense"
+
+    def solve(self, A, b):
+        if sp.issparse(A):
+            A = A.toarray()
+        return np.linalg.solve(A, b), 0
+
+
+class SparseLUBackend(SolverBackend):
+    """
+    LU dispersa con el orden de incógnitas `ordering` (ver analysis.ordering);
+    tras solve, `stats` describe ancho de banda y relleno.
+    """
+    name = "splu"
+
+    def __init__(self, ordering="colamd"):
+        self.ordering = ordering
+        self.stats = None
+
+    def solve(self, A, b):
+        lu = OrderedLU(A, self.ordering)
+        self.stats = lu.stats
+        return lu.solve(b), 0
+
+
+class NodalBlock:
+    """
+    Bloque nodal de un MNA [[G, B], [Bᵀ, 0]] para CG.
+    - Las filas con diagonal nula son restricciones de fuentes (±1 entre dos
+      nodos, o en un nodo si el otro es GND) y deben formar un bosque.
+    - Los nodos unidos a GND por fuentes tienen voltaje conocido; en cada
+      árbol sin GND los voltajes se expresan respecto de su raíz:
+      v = T·y + c, con c las sumas de fuentes desde la raíz.
+    - matrix = Tᵀ·G·T es el sistema (simétrico en redes resistivas) que
+      resuelve CG; las corrientes de las fuentes salen de la LCK recorriendo
+      cada árbol desde las hojas.
+    - ValueError si A no tiene esa estructura (diodos ideales, lazos de
+      fuentes, nodos sin conductancia propia).
+    """
+    def __init__(self, A):
+        A = sp.csr_matrix(A)
+        d = A.diagonal()
+        self.size = A.shape[0]
+        self.K = K = np.flatnonzero(d == 0)
+        self.N = N = np.flatnonzero(d != 0)
+        n, m = len(N), len(K)
+        A_N = A[N]
+        self.G = G = A_N[:, N].tocsr()
+        Bm = A_N[:, K].tocsc()
+        Bm.eliminate_zeros()
+        A_K = A[K]
+        A_KK = A_K[:, K]
+        if A_KK.count_nonzero() or (A_K[:, N] - Bm.T).count_nonzero():
+            raise ValueError("La matriz no es un MNA con bloque de fuentes [[G, B], [Bᵀ, 0]].")
+        per_col = np.diff(Bm.indptr)
+        if np.any((per_col < 1) | (per_col > 2)) or np.any(np.abs(Bm.data) != 1.0):
+            raise ValueError("Restricción que no es una fuente entre dos nodos.")
+        first = Bm.indptr[:-1]
+        two = per_col == 2
+        eu = Bm.indices[first]
+        es = Bm.data[first]
+        ev = np.full(m, n, dtype=np.int64)          # n = GND
+        ev[two] = Bm.indices[first[two] + 1]
+        if np.any(Bm.data[first[two] + 1] != -es[two]):
+            raise ValueError("Restricción que no es una fuente entre dos nodos.")
+
+        # Bosque de fuentes sobre los nodos + GND
+        graph = sp.coo_matrix((np.ones(m), (eu, ev)), shape=(n + 1, n + 1)).tocsr()
+        ncomp, labels = connected_components(graph, directed=False)
+        touched = np.unique(np.concatenate([eu, ev]))
+        if m != len(touched) - len(np.unique(labels[touched])):
+            raise ValueError("Lazo de fuentes de voltaje.")
+        # Raíz de cada árbol sin GND: su nodo de menor índice, colgado de GND
+        # por una arista virtual para recorrer todo el bosque desde GND
+        comp_root = np.full(ncomp, n + 1, dtype=np.int64)
+        np.minimum.at(comp_root, labels[touched], touched)
+        roots = comp_root[np.unique(labels[touched])]
+        roots = roots[labels[roots] != labels[n]]
+        tree = sp.coo_matrix((np.ones(m + len(roots)),
+                              (np.concatenate([eu, roots]), np.concatenate([ev, np.full(len(roots), n)]))),
+                             shape=(n + 1, n + 1)).tocsr()
+        depth, pred = shortest_path(tree, directed=False, unweighted=True, indices=n,
+                                    return_predecessors=True)
+        tu = np.flatnonzero(np.isfinite(depth) & (pred >= 0))
+        tu = tu[np.argsort(depth[tu], kind="stable")]
+        tp = pred[tu].astype(np.int64)
+        edge = sp.coo_matrix((np.arange(1, m + 1), (eu, ev)), shape=(n + 1, n + 1)).tocsr()
+        edge = (edge + edge.T).tocsr()
+        te = np.asarray(edge[tu, tp]).ravel().astype(np.int64) - 1
+        is_root = te < 0
+        # Signo de la fuente en el nodo hijo: v_u = v_p + s_u·V
+        ts = np.where(is_root, 0.0, np.where(eu[np.maximum(te, 0)] == tu, es[np.maximum(te, 0)],
+                                             -es[np.maximum(te, 0)]))
+        lv = depth[tu].astype(np.int64)
+        self._levels = np.searchsorted(lv, np.arange(1, lv.max(initial=0) + 2))
+        self._tu, self._tp, self._te, self._ts = tu, tp, te, ts
+
+        # Incógnitas reducidas: nodos fuera del bosque y raíces sin GND
+        root = np.arange(n + 1, dtype=np.int64)
+        for lo, hi in zip(self._levels[:-1], self._levels[1:]):
+            u, p = tu[lo:hi], tp[lo:hi]
+            root[u] = np.where(is_root[lo:hi], u, root[p])
+        free = root[:n] != n
+        rep = np.full(n + 1, -1, dtype=np.int64)
+        reps = np.flatnonzero(free & (root[:n] == np.arange(n)))
+        rep[reps] = np.arange(len(reps))
+        cols = rep[root[:n]]
+        keep = cols >= 0
+        self.T = sp.csr_matrix((np.ones(int(keep.sum())), (np.flatnonzero(keep), cols[keep])),
+                               shape=(n, len(reps)))
+        self.matrix = (self.T.T @ G @ self.T).tocsr()
+
+    def offsets(self, bK) -> np.ndarray:
+        """
+        c: voltaje de cada nodo fijado por las fuentes bK respecto de su raíz.
+        """
+        c = np.zeros(len(self.N) + 1)
+        tu, tp, te, ts = self._tu, self._tp, self._te, self._ts
+        for lo, hi in zip(self._levels[:-1], self._levels[1:]):
+            c[tu[lo:hi]] = c[tp[lo:hi]] + ts[lo:hi] * bK[np.maximum(te[lo:hi], 0)]
+        return c[:-1]
+
+    def solve(self, b, inner) -> np.ndarray:
+        """
+        x completo desde la solución de matrix·y = r que da inner(r).
+        """
+        b = np.asarray(b, dtype=float)
+        bN, bK = b[self.N], b[self.K]
+        c = self.offsets(bK)
+        y = inner(self.T.T @ (bN - self.G @ c))
+        v = self.T @ y + c
+        # LCK: B·j = bN - G·v, de las hojas hacia la raíz de cada árbol
+        r = np.append(bN - self.G @ v, 0.0)
+        j = np.zeros(len(self.K))
+        tu, tp, te, ts = self._tu, self._tp, self._te, self._ts
+        for lo, hi in reversed(list(zip(self._levels[:-1], self._levels[1:]))):
+            e = te[lo:hi]
+            edge = e >= 0
+            u, p, s, e = tu[lo:hi][edge], tp[lo:hi][edge], ts[lo:hi][edge], e[edge]
+            j[e] = s * r[u]
+            np.add.at(r, p, s * j[e])
+        x = np.empty(self.size)
+        x[self.N] = v
+        x[self.K] = j
+        return x
+
+
+class CGBackend(SolverBackend):
+    """
+    Gradiente conjugado con precondicionador de Jacobi sobre el bloque nodal
+    del MNA (ver NodalBlock). Solo es válido si ese bloque es simétrico
+    definido positivo (redes de resistores y fuentes, sin diodos).
+    """
+    name = "cg"
+
+    def __init__(self, rtol=1e-10, maxiter=None, block=None):
+        self.rtol = rtol
+        self.maxiter = maxiter
+        self.block = block
+
+    def solve(self, A, b):
+        block = self.block
+        if block is None:
+            try:
+                block = NodalBlock(A)
+            except ValueError as e:
+                raise np.linalg.LinAlgError(f"CG no aplicable. {e}")
+        Gr = block.matrix
+        if not is_spd_candidate(Gr):
+            raise np.linalg.LinAlgError("CG no aplicable: el bloque nodal no es simétrico "
+                                        "definido positivo.")
+        d = Gr.diagonal()
+        d = np.where(d > 0, d, 1.0)
+        M = spla.LinearOperator(Gr.shape, matvec=lambda r: r.ravel() / d, dtype=float)
+        it = [0]
+        def count(_): it[0] += 1
+
+        def inner(r):
+            if not len(r):
+                return r
+            y, info = spla.cg(Gr, r, rtol=self.rtol, atol=0.0, maxiter=self.maxiter, M=M,
+                              callback=count)
+            if info != 0:
+                raise np.linalg.LinAlgError(f"CG no convergió tras {it[0]} iteraciones.")
+            return y
+        return block.solve(b, inner), it[0]
+
+
+class GMRESBackend(SolverBackend):
+    """
+    GMRES reiniciado con precondicionador ILU; sirve para cualquier matriz
+    no singular y es el último recurso de la política "auto".
+    """
+    name = "gmres"
+
+    def __init__(self, rtol=1e-10, maxiter=None, restart=50):
+        self.rtol = rtol
+        self.maxiter = maxiter
+        self.restart = restart
+
+    def solve(self, A, b):
+        A = sp.csc_matrix(A)
+        try:
+            ilu = spla.spilu(A, drop_tol=1e-5, fill_factor=10)
+            M = spla.LinearOperator(A.shape, matvec=ilu.solve, dtype=float)
+        except RuntimeError:
+            M = None  # ILU con pivote nulo: GMRES sin precondicionar
+        it = [0]
+        def count(_): it[0] += 1
+        x, info = spla.gmres(A, b, rtol=self.rtol, atol=0.0, restart=self.restart,
+                             maxiter=self.maxiter, M=M, callback=count,
+                             callback_type="pr_norm")
+        if info != 0:
+            raise np.linalg.LinAlgError(f"GMRES no convergió tras {it[0]} iteraciones.")
+        return x, it[0]
+
+
+BACKENDS = {
+    "dense": DenseBackend,
+    "splu": SparseLUBackend,
+    "cg": CGBackend,
+    "gmres": GMRESBackend,
+}
+
+
+def is_spd_candidate(A, tol=1e-12) -> bool:
+    """
+    Criterio barato de definida positiva: simétrica, diagonal positiva y
+    diagonal dominante por filas (lo que cumple toda red de resistores
+    conectada a GND).
+    """
+    A = sp.csr_matrix(A)
+    d = A.diagonal()
+    if np.any(d <= 0):
+        return False
+    asym = abs(A - A.T)
+    if asym.nnz and asym.max() > tol * abs(d).max():
+        return False
+    off = np.asarray(abs(A).sum(axis=1)).ravel() - d
+    return bool(np.all(d * (1.0 + tol) >= off))
+
 
 class LinearSolver:
+    """
+    Resuelve A·x = b con un backend intercambiable.
+    - method: "auto" (por defecto) o una clave de BACKENDS.
+    - ordering: orden de incógnitas de la LU dispersa (ver analysis.ordering).
+    - Tras cada solve, `method` y `iterations` describen lo que se usó; con
+      LU dispersa, info() incluye además "ordering" (ancho de banda y relleno).
+    """
+    def __init__(self, method="auto", rtol=1e-10, maxiter=None, ordering="colamd"):
+        if method != "auto" and method not in BACKENDS:
+            raise ValueError(f"Método de solución desconocido: {method}.")
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Orden desconocido: {ordering}.")
+        self.requested = method
+        self.ordering = ordering
+        self.ordering_stats = None
+        self.rtol = rtol
+        self.maxiter = maxiter
+        self.method = None
+        self.iterations = 0
+        self._block = None
+
+    def _backend(self, name):
+        if name == "cg":
+            return BACKENDS[name](rtol=self.rtol, maxiter=self.maxiter, block=self._block)
+        if name == "gmres":
+            return BACKENDS[name](rtol=self.rtol, maxiter=self.maxiter)
+        if name == "splu":
+            return BACKENDS[name](ordering=self.ordering)
+        return BACKENDS[name]()
+
+    def choose(self, A) -> str:
+        """
+        Política "auto": denso si es pequeño o muy lleno, CG si el bloque
+        nodal (sin las filas de las fuentes) es SPD y está bien escalado, LU
+        dispersa en cualquier otro caso.
+        """
+        n = A.shape[0]
+        if not sp.issparse(A):
+            return "dense" if n <= DENSE_MAX else "splu"
+        if n <= DENSE_MAX or A.nnz > DENSE_FILL * n * n:
+            return "dense"
+        try:
+            block = NodalBlock(A)
+        except ValueError:
+            return "splu"
+        G = block.matrix
+        d = G.diagonal()
+        if G.shape[0] and is_spd_candidate(G) and d.max() <= CG_MAX_SPREAD * d.min():
+            self._block = block
+            return "cg"
+        return "splu"
+
     def solve(self, A, b):
-        return np.linalg.solve(A, b)
+        self._block = None
+        name = self.choose(A) if self.requested == "auto" else self.requested
+        backend = self._backend(name)
+        self.ordering_stats = None
+        try:
+            x, it = backend.solve(A, b)
+        except (np.linalg.LinAlgError, RuntimeError, MemoryError):
+            if self.requested != "auto" or name not in ("cg", "splu"):
+                raise
+            # CG o LU fallaron (no SPD, pivote nulo, memoria): GMRES
+            name = "gmres"
+            x, it = self._backend(name).solve(A, b)
+        else:
+            self.ordering_stats = getattr(backend, "stats", None)
+        self.method = name
+        self.iterations = it
+        return x
+
+    def info(self) -> dict:
+        out = {"method": self.method, "iterations": self.iterations}
+        if self.ordering_stats is not None:
+            out["ordering"] = self.ordering_stats
+        return out
+
+
+class Factorization:
+    """
+    LU reutilizable de A: solve(B) acepta un vector o una matriz de lados
+    derechos. Densa (LAPACK) si A es ndarray, SuperLU (con el orden
+    `ordering`) si es dispersa.
+    """
+    def __init__(self, A, ordering="colamd"):
+        if sp.issparse(A):
+            self.method = "splu"
+            self._lu = OrderedLU(A, ordering)
+        else:
+            self.method = "dense"
+            lu, piv = sla.lu_factor(A, check_finite=False)
+            if np.any(np.diag(lu) == 0.0):
+                raise np.linalg.LinAlgError("Singular matrix")
+            self._lu = (lu, piv)
+
+    def solve(self, B):
+        if self.method == "splu":
+            return self._lu.solve(B)
+        return sla.lu_solve(self._lu, B, check_finite=False)
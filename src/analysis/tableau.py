@@ -1,90 +1,242 @@
 import numpy as np
-from typing import Tuple
-from ..domain.netlist import Netlist
-from ..domain.components.resistor import Resistor
-from ..domain.components.vsource import VSource
+import scipy.sparse as sp
+from typing import Tuple, Optional
+from ..domain.compiled import CompiledNetlist, KIND_CODES, as_compiled
+
+# Por encima de este número de incógnitas el sistema se ensambla en
+# formato disperso (CSR); por debajo la matriz densa es más rápida de resolver.
+SPARSE_THRESHOLD = 400
+
+# Conductancia mínima en paralelo con cada diodo ideal: evita que un nodo
+# alcanzado solo a través de diodos en corte deje la matriz singular.
+GMIN = 1e-12
 
 
 class Meta:
     """
-    Guarda metadatos de simulación: índices de nodos, componentes, etc.
+    Guarda metadatos de simulación sobre la forma compilada del Netlist.
+    - node_row: fila MNA de cada código de nodo (-1 = GND o inexistente);
+      node_ids: IDs de las filas de nodo en orden.
+    - res / src / dio / cap / ind / shk: posiciones de resistores, fuentes,
+      diodos ideales, condensadores, inductores y diodos de Shockley en el
+      Netlist; source_rows / inductor_rows / diode_rows: su fila/columna MNA.
+    - diode_anode / diode_cathode: filas (ánodo, cátodo) de cada diodo (-1 = GND).
+    - incidence: matriz de incidencia nodos × ramas (+1 en n1, -1 en n2;
+      los diodos se orientan ánodo → cátodo), sin la fila de GND. Cada
+      componente es una rama, en el orden del Netlist.
+    - conductance: 1/R por rama (GMIN en condensadores, abiertos en DC, y en
+      diodos de Shockley, cuya corriente exponencial añade analysis.newton;
+      0 en fuentes, inductores y diodos ideales).
+    - selector: incógnita MNA con la corriente de la rama (-1 en resistores).
+    Las corrientes de todas las ramas salen de un solo producto disperso.
     """
-    def __init__(self, node_index, components):
-        self.node_index = node_index
-        self.components = components
+    def __init__(self, cn: CompiledNetlist):
+        self.cn = cn
+        node_codes = np.flatnonzero(cn.declared & ~cn.is_ground)
+        self.n = n = len(node_codes)
+        self.node_row = np.full(cn.n_nodes, -1, dtype=np.int64)
+        self.node_row[node_codes] = np.arange(n)
+        self.node_ids = [cn.node_ids[i] for i in node_codes.tolist()]
+
+        kind = cn.kind
+        self.res = np.flatnonzero(kind == KIND_CODES["R"])
+        self.src = np.flatnonzero(kind == KIND_CODES["V"])
+        self.dio = np.flatnonzero(kind == KIND_CODES["D"])
+        self.cap = np.flatnonzero(kind == KIND_CODES["C"])
+        self.ind = np.flatnonzero(kind == KIND_CODES["L"])
+        self.shk = np.flatnonzero(kind == KIND_CODES["DS"])
+        ms = n + len(self.src)
+        m = ms + len(self.ind)
+        self.size = m + len(self.dio)
+        self.source_rows = np.arange(n, ms, dtype=np.int64)
+        self.inductor_rows = np.arange(ms, m, dtype=np.int64)
+        self.diode_rows = np.arange(m, self.size, dtype=np.int64)
+        self.diode_ids = [cn.comp_ids[k] for k in self.dio.tolist()]
+
+        nb = cn.n_components
+        self.branch_ids = cn.comp_ids
+        i, j = self.node_row[cn.n1], self.node_row[cn.n2]
+        flip = (kind == KIND_CODES["D"]) & (cn.value < 0)
+        i, j = np.where(flip, j, i), np.where(flip, i, j)
+        self.diode_anode, self.diode_cathode = i[self.dio], j[self.dio]
+        rows = np.concatenate([i, j])
+        cols = np.tile(np.arange(nb, dtype=np.int64), 2)
+        vals = np.repeat([1.0, -1.0], nb)
+        keep = rows >= 0
+        self.incidence = sp.csr_matrix((vals[keep], (rows[keep], cols[keep])), shape=(n, nb))
+        self.conductance = np.zeros(nb)
+        self.conductance[self.res] = 1.0 / cn.value[self.res]
+        self.conductance[self.cap] = GMIN
+        self.conductance[self.shk] = GMIN
+        self.selector = np.full(nb, -1, dtype=np.int64)
+        self.selector[self.src] = self.source_rows
+        self.selector[self.ind] = self.inductor_rows
+        self.selector[self.dio] = self.diode_rows
+        self.mna_branches = np.flatnonzero(self.selector >= 0)
+        # Fuentes de voltaje (en orden de rama) para la LVK
+        self.source_branches = self.src
+
+    def terminals(self, pos):
+        """
+        Filas MNA de los terminales n1/n2 de los componentes en `pos` (-1 = GND).
+        """
+        return self.node_row[self.cn.n1[pos]], self.node_row[self.cn.n2[pos]]
+
+    def branch_currents(self, x):
+        """
+        Corrientes de rama: g·(Aᵀ·v) para resistores (y condensadores con
+        GMIN) y la incógnita MNA para fuentes e inductores (entra por n1,
+        convención SPICE) y diodos (ánodo → cátodo).
+        x puede ser un vector o una matriz (n_puntos, size).
+        """
+        x = np.asarray(x)
+        n = self.n
+        if x.ndim == 1:
+            I = self.conductance * (self.incidence.T @ x[:n])
+            I[self.mna_branches] = x[self.selector[self.mna_branches]]
+        else:
+            I = (self.incidence.T @ x[:, :n].T).T * self.conductance
+            I[:, self.mna_branches] = x[:, self.selector[self.mna_branches]]
+        return I
 
     def reconstruct_solution(self, x):
         """
-        Reconstruye un objeto Solution con voltajes e intensidades.
+        Reconstruye un objeto Solution con voltajes e intensidades. Los dicts
+        son vistas perezosas sobre los arrays (ver results.ArrayMap).
         """
-        from .results import Solution
+        from .results import Solution, ArrayMap
 
-        V = {nid: float(x[idx]) for nid, idx in self.node_index.items()}
-        I = {}
+        V = ArrayMap(self.node_ids, np.array(x[:self.n], dtype=float))
+        I = ArrayMap(self.branch_ids, self.branch_currents(x))
+        return Solution(node_voltages=V, branch_currents=I, diode_states={}, checks={})
 
-        def v(nid):
-            return V.get(nid, 0.0)  # GND = 0
 
-        for c in self.components:
-            if isinstance(c, Resistor):
-                I[c.id] = (v(c.n1) - v(c.n2)) / c.R
-            elif isinstance(c, VSource):
-                # Estimación simple (corriente positiva de n1 → n2)
-                I[c.id] = 0.0
+def _conductance_pattern(i, j):
+    """
+    Patrón COO del estampado de conductancias entre los nodos i y j:
+    (filas, columnas, signo, dueño), donde dueño es el índice del componente
+    que aporta la entrada. Las entradas que tocan GND (-1) se descartan.
+    """
+    m = len(i)
+    owner = np.tile(np.arange(m, dtype=np.int64), 4)
+    rows = np.concatenate([i, j, i, j])
+    cols = np.concatenate([i, j, j, i])
+    sign = np.repeat([1.0, 1.0, -1.0, -1.0], m)
+    keep = (rows >= 0) & (cols >= 0)
+    return rows[keep], cols[keep], sign[keep], owner[keep]
 
-        return Solution(node_voltages=V, branch_currents=I, diode_states={}, checks={})
+
+def _conductance_triplets(i, j, g):
+    """
+    Tripletas COO (filas, columnas, valores) del estampado de conductancias
+    g entre los nodos i y j.
+    """
+    rows, cols, sign, owner = _conductance_pattern(i, j)
+    return rows, cols, sign * g[owner]
 
 
-def build_system(nl: Netlist) -> Tuple[np.ndarray, np.ndarray, Meta]:
+def _source_triplets(si, sj, n):
     """
-    Construye la matriz de ecuaciones A·x = b mediante el método de nodos.
+    Tripletas COO de los bloques B y Bᵀ de las fuentes de voltaje: la fuente
+    k ocupa la fila/columna n + k con +1 en n1 y -1 en n2.
+    """
+    k = np.arange(n, n + len(si), dtype=np.int64)
+    ones = np.ones(len(si))
+    bi = np.concatenate([si, sj])
+    bk = np.concatenate([k, k])
+    bv = np.concatenate([ones, -ones])
+    keep = bi >= 0
+    bi, bk, bv = bi[keep], bk[keep], bv[keep]
+    return np.concatenate([bi, bk]), np.concatenate([bk, bi]), np.concatenate([bv, bv])
+
+
+def build_system(nl, sparse: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray, Meta]:
+    """
+    Construye la matriz de ecuaciones A·x = b por análisis nodal modificado.
     - Aplica LVK y LCK.
-    - Considera resistencias y fuentes de voltaje ideal con terminal a GND.
+    - x = [voltajes de nodo (sin GND), corrientes de las fuentes de voltaje,
+      corrientes de los inductores, corrientes de los diodos]: cada fuente
+      añade una incógnita y una fila v(n1) - v(n2) = V, esté o no conectada
+      a GND.
+    - En DC un inductor es una fuente de 0 V y un condensador un circuito
+      abierto (con GMIN para que sus nodos no queden flotando).
+    - Los diodos de Shockley solo estampan GMIN (parte lineal); la
+      exponencial se resuelve en analysis.newton.
+    - Cada diodo ideal añade su corriente ánodo → cátodo con la fila en el
+      estado base "en corte" (i = 0) y una conductancia GMIN en paralelo;
+      la conducción se resuelve en analysis.diodes.
+    - sparse=None elige el formato según SPARSE_THRESHOLD; True devuelve A
+      como scipy.sparse CSR y False como ndarray denso.
+    - nl puede ser un Netlist o su forma compilada (Netlist.compile()).
     """
 
-    # Nodos (sin GND)
-    nodes = [nid for nid, n in nl.nodes.items() if not n.is_ground]
-    node_index = {nid: i for i, nid in enumerate(nodes)}
-
-    # Matriz de conductancias G y vector de corriente equivalente I
-    n = len(nodes)
-    G = np.zeros((n, n), dtype=float)
-    I = np.zeros(n, dtype=float)
-
-    # --- Resistores (Ley de Ohm + KCL)
-    for c in nl.components:
-        if isinstance(c, Resistor):
-            g = 1.0 / c.R
-            if c.n1 not in nl.nodes or c.n2 not in nl.nodes:
-                continue
-
-            n1, n2 = c.n1, c.n2
-            if not nl.nodes[n1].is_ground:
-                G[node_index[n1], node_index[n1]] += g
-            if not nl.nodes[n2].is_ground:
-                G[node_index[n2], node_index[n2]] += g
-
-            if not nl.nodes[n1].is_ground and not nl.nodes[n2].is_ground:
-                G[node_index[n1], node_index[n2]] -= g
-                G[node_index[n2], node_index[n1]] -= g
-
-    # --- Fuentes de voltaje (aplicadas respecto a GND)
-    for c in nl.components:
-        if isinstance(c, VSource):
-            # Solo soporta fuentes a GND (n2 = GND o n1 = GND)
-            if nl.nodes[c.n1].is_ground and not nl.nodes[c.n2].is_ground:
-                # V entre GND → n2 = -V
-                I[node_index[c.n2]] -= 1e12 * c.V
-                G[node_index[c.n2], node_index[c.n2]] += 1e12
-            elif nl.nodes[c.n2].is_ground and not nl.nodes[c.n1].is_ground:
-                # V entre n1 → GND = +V
-                I[node_index[c.n1]] += 1e12 * c.V
-                G[node_index[c.n1], node_index[c.n1]] += 1e12
-            else:
-                # Si ninguna terminal está a GND, ignoramos por ahora (MVP)
-                pass
+    cn = as_compiled(nl)
+    meta = Meta(cn)
+    n, size = meta.n, meta.size
+    ms = n + len(meta.src)
+    m = ms + len(meta.ind)
+    if sparse is None:
+        sparse = size > SPARSE_THRESHOLD
+
+    # Vector independiente
+    I = np.zeros(size, dtype=float)
+
+    # --- Resistores, condensadores y GMIN de los diodos de Shockley (Ley de
+    # Ohm + KCL), estampados en bloque
+    g = np.concatenate([meta.res, meta.cap, meta.shk])
+    ri, rj = meta.terminals(g)
+    rows, cols, vals = _conductance_triplets(ri, rj, meta.conductance[g])
+
+    # --- Fuentes de voltaje: bloques B y Bᵀ con ±1
+    si, sj = meta.terminals(meta.src)
+    br, bc, bv = _source_triplets(si, sj, n)
+    rows = np.concatenate([rows, br])
+    cols = np.concatenate([cols, bc])
+    vals = np.concatenate([vals, bv])
+    I[n:ms] = cn.value[meta.src]
+
+    # --- Inductores: como fuentes de 0 V
+    li, lj = meta.terminals(meta.ind)
+    lr, lc, lv = _source_triplets(li, lj, ms)
+    rows = np.concatenate([rows, lr])
+    cols = np.concatenate([cols, lc])
+    vals = np.concatenate([vals, lv])
+
+    # --- Diodos: columna de corriente (+1 ánodo, -1 cátodo), fila i = 0 y GMIN
+    nd = len(meta.dio)
+    da, dk = meta.diode_anode, meta.diode_cathode
+    dr, dc, dv = _source_triplets(da, dk, m)
+    gr, gc, gv = _conductance_triplets(da, dk, np.full(nd, GMIN))
+    col = dc >= m  # solo la mitad "columna" (filas de nodo, columna del diodo)
+    rows = np.concatenate([rows, dr[col], np.arange(m, size), gr])
+    cols = np.concatenate([cols, dc[col], np.arange(m, size), gc])
+    vals = np.concatenate([vals, dv[col], np.ones(nd), gv])
+
+    # Matriz MNA (las tripletas duplicadas se suman)
+    if sparse:
+        G = sp.coo_matrix((vals, (rows, cols)), shape=(size, size)).tocsr()
+    else:
+        G = np.zeros((size, size), dtype=float)
+        np.add.at(G, (rows, cols), vals)
 
     # Resultado
     A = G
     b = I
-    return A, b, Meta(node_index=node_index, components=list(nl.components))
+    return A, b, meta
+
+
+def build_reactive(meta: Meta) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+    """
+    Partes reactivas del MNA, con el mismo orden de incógnitas que
+    build_system: Y(s) = G + s·(C + L), donde G es la matriz de build_system.
+    - C: capacitancias estampadas entre los nodos de cada condensador (como
+      las conductancias).
+    - L: -L en la diagonal de la fila de cada inductor (v1 - v2 - s·L·i = 0).
+    """
+    cn, size = meta.cn, meta.size
+    ci, cj = meta.terminals(meta.cap)
+    rows, cols, vals = _conductance_triplets(ci, cj, cn.value[meta.cap])
+    C = sp.coo_matrix((vals, (rows, cols)), shape=(size, size)).tocsr()
+    r = meta.inductor_rows
+    L = sp.coo_matrix((-cn.value[meta.ind], (r, r)), shape=(size, size)).tocsr()
+    return C, L
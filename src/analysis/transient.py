@@ -0,0 +1,217 @@
+import numpy as np
+import scipy.sparse as sp
+from ..domain.compiled import CompiledNetlist
+from .tableau import SPARSE_THRESHOLD, build_reactive, build_system
+from .solver import Factorization, LinearSolver
+from .results import TransientResult
+
+# Métodos de integración: factor de los modelos compañeros (Geq = k·C/h,
+# Req = k·L/h) y si la historia arrastra la corriente/voltaje anterior.
+INTEGRATORS = {"be": (1.0, 0.0), "trap": (2.0, 1.0)}
+INITIAL = ("op", "zero")
+# Hasta este tamaño de estado se precalcula el propagador denso del paso
+# (s ← Φ·s + Γ·u); por encima, cada paso es una sustitución con la LU.
+PROPAGATOR_MAX = 400
+# Pasos por bloque: acota la memoria de estados intermedios
+BLOCK_STEPS = 4096
+
+
+class TransientSystem:
+    """
+    Sistema MNA discretizado con paso fijo h: A·x_k = H·s_(k-1) + S·u_k.
+    - Modelos compañeros: cada condensador es una conductancia Geq con una
+      fuente de historia; cada inductor mantiene su fila MNA con -Req en la
+      diagonal. Con h fijo A es constante y se factoriza una sola vez.
+    - s: fuentes de historia de los modelos compañeros, [Ieq; Veq]: Ieq
+      entra por n1 de cada condensador y Veq es el lado derecho de la fila
+      de cada inductor (v1 - v2 - Req·i = Veq).
+    - u: valores de las fuentes de voltaje en el instante.
+    - Tras resolver x_k, el estado avanza con s_k = P·x_k + Q·s_(k-1):
+      Euler implícito Ieq = Geq·vC, Veq = -Req·iL; trapezoidal
+      Ieq = 2·Geq·vC - Ieq_ant, Veq = -2·Req·iL - Veq_ant.
+    """
+    def __init__(self, cn: CompiledNetlist, h: float, method: str = "trap",
+                 ordering: str = "colamd"):
+        if method not in INTEGRATORS:
+            raise ValueError(f"Método de integración desconocido: {method}.")
+        if not h > 0:
+            raise ValueError(f"El paso debe ser > 0 (actual: {h}).")
+        A_dc, _, meta = build_system(cn, sparse=True)
+        if len(meta.dio) or len(meta.shk):
+            raise ValueError("El análisis transitorio no admite diodos.")
+        self.cn, self.meta, self.h, self.method = cn, meta, h, method
+        self.A_dc = A_dc
+        k, theta = INTEGRATORS[method]
+        n, size = meta.n, meta.size
+        nc, nl = len(meta.cap), len(meta.ind)
+        self.geq = geq = k * cn.value[meta.cap] / h
+        self.req = req = k * cn.value[meta.ind] / h
+        Bc = meta.incidence[:, meta.cap].tocsr()
+        Bl = meta.incidence[:, meta.ind].tocsr()
+        rows = meta.inductor_rows
+
+        def pad(M, shape):
+            M = sp.coo_matrix(M)
+            return sp.coo_matrix((M.data, (M.row, M.col)), shape=shape)
+
+        C, L = build_reactive(meta)
+        A = A_dc + (k / h) * (C + L)
+        self.theta = theta
+        self.d = d = nc + nl
+        self.Bc, self.Bl = Bc, Bl
+        self.H = sp.vstack([
+            pad(Bc, (n, d)),
+            sp.coo_matrix((np.ones(nl), (rows - n, nc + np.arange(nl))), shape=(size - n, d)),
+        ]).tocsr()
+        self.P = (1.0 + theta) * sp.vstack([
+            pad(sp.diags(geq) @ Bc.T, (nc, size)),
+            sp.coo_matrix((-req, (np.arange(nl), rows)), shape=(nl, size)),
+        ]).tocsr()
+        self.Q = -theta * sp.identity(d, format="csr")
+        self.A = A.tocsc() if size > SPARSE_THRESHOLD else A.toarray()
+        self.lu = Factorization(self.A, ordering)
+
+    def source_rhs(self, u) -> np.ndarray:
+        """
+        S·u: lado derecho de las fuentes (u es un vector o (n_puntos, ns)).
+        """
+        u = np.asarray(u, dtype=float)
+        b = np.zeros(u.shape[:-1] + (self.meta.size,))
+        b[..., self.meta.source_rows] = u
+        return b
+
+    def initial_state(self, u0, initial: str = "op", method: str = "auto"):
+        """
+        (x_0, s_0): punto de operación DC con las fuentes en u0 ("op") o el
+        circuito en reposo ("zero": todo a 0 en t = 0).
+        """
+        if initial not in INITIAL:
+            raise ValueError(f"Estado inicial desconocido: {initial}.")
+        if initial == "zero":
+            return np.zeros(self.meta.size), np.zeros(self.d)
+        x0 = LinearSolver(method).solve(self.A_dc, self.source_rhs(u0))
+        # En DC iC = 0: Ieq = Geq·vC (con ambos métodos)
+        n = self.meta.n
+        s0 = np.concatenate([self.geq * (self.Bc.T @ x0[:n]),
+                             -self.req * x0[self.meta.inductor_rows]
+                             - self.theta * (self.Bl.T @ x0[:n])])
+        return x0, s0
+
+    def capacitor_currents(self, X, S_prev) -> np.ndarray:
+        """
+        Corrientes de los condensadores (n1 → n2) desde las soluciones X
+        (n_puntos, size) y los estados del paso anterior: iC = Geq·vC - Ieq.
+        """
+        nc = len(self.meta.cap)
+        return (self.Bc.T @ X[:, :self.meta.n].T).T * self.geq - S_prev[:, :nc]
+
+    def _solve_columns(self, B):
+        return self.lu.solve(B) if B.shape[1] else np.zeros(B.shape)
+
+    def propagator(self):
+        """
+        Propagador denso del paso: (Φ, Γ, M, N) con s_k = Φ·s_(k-1) + Γ·u_k
+        y x_k = M·s_(k-1) + N·u_k.
+        """
+        M = self._solve_columns(self.H.toarray())
+        N = self._solve_columns(self.source_rhs(np.eye(len(self.meta.src))).T)
+        return self.P @ M + self.Q, self.P @ N, M, N
+
+
+def _waveforms(cn, meta, sources, time) -> np.ndarray:
+    """
+    U (n_pasos + 1, ns): valor de cada fuente en cada instante. sources
+    asigna a un ID de fuente una función de t (vectorizada) o un array con
+    un valor por instante; las demás quedan en su valor DC.
+    """
+    U = np.empty((len(time), len(meta.src)))
+    U[:] = cn.value[meta.src]
+    col = {cn.comp_ids[k]: j for j, k in enumerate(meta.src.tolist())}
+    for cid, w in (sources or {}).items():
+        if cid not in col:
+            raise ValueError(f"{cid}: no es una fuente de voltaje del circuito.")
+        vals = w(time) if callable(w) else w
+        vals = np.broadcast_to(np.asarray(vals, dtype=float), time.shape) if np.ndim(vals) == 0 \
+            else np.asarray(vals, dtype=float)
+        if vals.shape != time.shape:
+            raise ValueError(f"{cid}: la forma de onda tiene {vals.size} valores y "
+                             f"hacen falta {time.size}.")
+        U[:, col[cid]] = vals
+    return U
+
+
+def run_transient(cn: CompiledNetlist, t_stop: float, dt: float, method: str = "trap",
+                  sources=None, initial: str = "op", save_every: int = 1,
+                  currents: bool = True, ordering: str = "colamd") -> TransientResult:
+    """
+    Análisis transitorio de paso fijo sobre un circuito ya validado.
+    - Una sola factorización de A; cada paso es una sustitución (o, con
+      pocos elementos reactivos, un producto por el propagador denso, y
+      los voltajes se reconstruyen después en bloque).
+    - save_every: guarda uno de cada save_every instantes (siempre t = 0).
+    - Las salidas se escriben en arrays preasignados; con currents=False
+      solo se guardan los voltajes.
+    """
+    if save_every < 1:
+        raise ValueError(f"save_every debe ser >= 1 (actual: {save_every}).")
+    n_steps = int(round(t_stop / dt))
+    if n_steps < 1:
+        raise ValueError(f"t_stop ({t_stop}) debe ser al menos un paso ({dt}).")
+    ts = TransientSystem(cn, dt, method, ordering)
+    meta = ts.meta
+    n, d = meta.n, ts.d
+    time = np.arange(n_steps + 1) * dt
+    U = _waveforms(cn, meta, sources, time)
+    x0, s = ts.initial_state(U[0], initial)
+
+    saved = np.arange(0, n_steps + 1, save_every)
+    X = np.empty((len(saved), meta.size))
+    Sk = np.empty((len(saved), d))        # estado del paso anterior a cada fila
+    X[0], Sk[0] = x0, s
+    dense = d <= PROPAGATOR_MAX
+    if dense:
+        Phi, Gamma, M, N = ts.propagator()
+    else:
+        H, P, Q, lu, rows = ts.H, ts.P, ts.Q, ts.lu, meta.source_rows
+        b = np.zeros(meta.size)
+    pos = 1
+    for start in range(1, n_steps + 1, BLOCK_STEPS):
+        stop = min(start + BLOCK_STEPS, n_steps + 1)
+        Sb = np.empty((stop - start + 1, d))
+        Sb[0] = s
+        ks = saved[pos:np.searchsorted(saved, stop)]
+        j = ks - start
+        if dense:
+            GU = U[start:stop] @ Gamma.T
+            for i in range(stop - start):
+                np.dot(Phi, Sb[i], out=Sb[i + 1])
+                Sb[i + 1] += GU[i]
+            X[pos:pos + len(ks)] = Sb[j] @ M.T + U[ks] @ N.T
+        else:
+            want = np.zeros(stop - start, dtype=bool)
+            want[j] = True
+            q = pos
+            for i in range(stop - start):
+                b[rows] = U[start + i]
+                x = lu.solve(H @ Sb[i] + b)
+                Sb[i + 1] = P @ x + Q @ Sb[i]
+                if want[i]:
+                    X[q] = x
+                    q += 1
+        Sk[pos:pos + len(ks)] = Sb[j]
+        pos += len(ks)
+        s = Sb[-1]
+
+    I = np.empty((len(saved), 0))
+    if currents:
+        I = meta.branch_currents(X)
+        I[:, meta.cap] = ts.capacitor_currents(X, Sk)
+    return TransientResult(
+        time=time[saved],
+        node_ids=meta.node_ids,
+        node_voltages=X[:, :n],
+        branch_ids=meta.branch_ids if currents else [],
+        branch_currents=I,
+        solver={"method": method, "dt": dt, "steps": n_steps, "factorization": ts.lu.method,
+                "propagator": "dense" if dense else "substitution", "state_size": d},
+    )
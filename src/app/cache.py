@@ -0,0 +1,239 @@
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+from ..analysis.results import ArrayMap, Solution
+from ..domain.compiled import CompiledNetlist
+
+# Extensión de las entradas del nivel en disco
+_SUFFIX = ".npz"
+
+def _canonical(cn: CompiledNetlist):
+    """
+    Forma canónica del circuito, independiente del orden de los componentes
+    y de los nombres de los nodos.
+    - rank: posición de cada componente al ordenarlos por ID.
+    - label: etiqueta de cada nodo = menor (rank, terminal) incidente
+      (2·rank para n1, 2·rank + 1 para n2); GND = -1. Es seguro porque tras
+      validar todo nodo (salvo GND) tiene algún componente conectado.
+    - nodes: (etiqueta antes de igualar GND, es tierra, declarado) de cada
+      nodo, ordenado: distingue varias tierras y nodos sin componentes.
+    """
+    m = cn.n_components
+    order = np.argsort(np.array(cn.comp_ids, dtype=object), kind="stable")
+    rank = np.empty(m, dtype=np.int64)
+    rank[order] = np.arange(m)
+    label = np.full(cn.n_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(label, cn.n1, 2 * rank)
+    np.minimum.at(label, cn.n2, 2 * rank + 1)
+    nodes = np.column_stack([label, cn.is_ground, cn.declared]).astype(np.int64)
+    nodes = nodes[np.lexsort(nodes.T[::-1])]
+    label[cn.is_ground] = -1
+    return order, rank, label, nodes
+
+
+def canonical_key(nl, method: str = "auto", checks: str = "full",
+                  options=None) -> Tuple[str, tuple]:
+    """
+    Hash SHA-256 de la forma canónica + parámetros de simulación. Devuelve
+    (clave, canon) donde canon sirve para re-mapear resultados.
+    - options: resto de opciones que cambian el resultado (reduce,
+      ordering, ...), como dict.
+    """
+    cn = nl if isinstance(nl, CompiledNetlist) else nl.compile()
+    order, rank, label, nodes = _canonical(cn)
+    h = hashlib.sha256()
+    h.update(f"{method}\0{checks}\0".encode())
+    h.update(repr(sorted((options or {}).items())).encode() + b"\0")
+    h.update(nodes.tobytes())
+    h.update("\0".join(cn.comp_ids[k] for k in order.tolist()).encode())
+    h.update(cn.kind[order].tobytes())
+    h.update(label[cn.n1[order]].tobytes())
+    h.update(label[cn.n2[order]].tobytes())
+    h.update(cn.value[order].tobytes())
+    h.update(cn.aux[order].tobytes())
+    return h.hexdigest(), (cn, rank, label)
+
+
+def _node_labels(cn, label, node_ids):
+    # Etiquetas de las filas de nodo (no GND) en el orden del Solution
+    pos = {nid: i for i, nid in enumerate(cn.node_ids)}
+    return label[[pos[nid] for nid in node_ids]]
+
+
+def _values(m, ids):
+    if isinstance(m, ArrayMap) and m.ids == ids:
+        return np.asarray(m.array, dtype=float)
+    return np.fromiter((m[k] for k in ids), dtype=float, count=len(ids))
+
+
+def _to_entry(sol: Solution, canon) -> dict:
+    """
+    Solution -> entrada canónica (voltajes por etiqueta, corrientes por rank).
+    """
+    cn, rank, label = canon
+    node_ids = list(sol.node_voltages)
+    labels = _node_labels(cn, label, node_ids)
+    order = np.argsort(labels)
+    v = _values(sol.node_voltages, node_ids)
+    i = np.empty(cn.n_components)
+    i[rank] = _values(sol.branch_currents, cn.comp_ids)
+    checks = copy.deepcopy(sol.checks)
+    if "KCL" in checks:
+        kcl = checks["KCL"]
+        checks["KCL"] = [kcl[node_ids[j]] for j in order.tolist()]
+    return {"labels": labels[order], "v": v[order], "i": i,
+            "diode_states": dict(sol.diode_states), "checks": checks,
+            "solver": dict(sol.solver)}
+
+
+def _plain(o):
+    # Escalares y arrays de numpy en el JSON de la entrada en disco
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"No serializable en la caché: {type(o).__name__}.")
+
+
+def _write_entry(f, entry: dict) -> None:
+    """
+    Entrada -> .npz: arrays tal cual y el resto como texto JSON (sin pickle,
+    así leer un directorio de caché compartido no ejecuta código).
+    """
+    doc = {k: entry[k] for k in ("diode_states", "checks", "solver")}
+    np.savez(f, labels=entry["labels"], v=entry["v"], i=entry["i"],
+             doc=np.array(json.dumps(doc, default=_plain)))
+
+
+def _read_entry(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as z:
+        entry = json.loads(str(z["doc"]))
+        entry.update(labels=z["labels"], v=z["v"], i=z["i"])
+    return entry
+
+
+def _from_entry(entry: dict, canon) -> Solution:
+    """
+    Entrada canónica -> Solution con los nombres y el orden del llamador;
+    solver describe la simulación original y lleva "cached": True.
+    """
+    cn, rank, label = canon
+    node_ids = [cn.node_ids[j] for j in np.flatnonzero(cn.declared & ~cn.is_ground).tolist()]
+    pos = np.searchsorted(entry["labels"], _node_labels(cn, label, node_ids))
+    checks = copy.deepcopy(entry["checks"])
+    if "KCL" in checks:
+        kcl = checks["KCL"]
+        checks["KCL"] = {nid: kcl[p] for nid, p in zip(node_ids, pos.tolist())}
+    if "KVL" in checks:
+        kvl = checks["KVL"]
+        checks["KVL"] = {f"KVL_{cid}": kvl[f"KVL_{cid}"] for cid in cn.comp_ids
+                         if f"KVL_{cid}" in kvl}
+    return Solution(
+        node_voltages=ArrayMap(node_ids, entry["v"][pos]),
+        branch_currents=ArrayMap(cn.comp_ids, entry["i"][rank]),
+        diode_states=dict(entry["diode_states"]),
+        checks=checks,
+        solver=dict(entry["solver"], cached=True),
+    )
+
+
+class SimulationCache:
+    """
+    Caché de resultados de simulate() direccionada por contenido.
+    - Clave: canonical_key (ignora el orden de los componentes y los
+      nombres de los nodos; incluye IDs, tipos, valores, nodos, method,
+      checks y las demás opciones de simulate()).
+    - Nivel en memoria: LRU de max_entries entradas.
+    - Nivel en disco opcional (disk_dir): un .npz por clave con arrays y
+      JSON (nunca pickle); si el total supera max_disk_bytes se borran los
+      menos usados (por mtime). Un archivo ilegible cuenta como fallo.
+    - Un Solution servido desde la caché lleva solver["cached"] = True.
+    - stats(): aciertos en memoria/disco y fallos.
+    """
+    def __init__(self, max_entries: int = 128, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 2 ** 20):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._mem: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + _SUFFIX)
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def lookup(self, nl, method: str = "auto", checks: str = "full", options=None):
+        """
+        Devuelve (clave, canon, Solution o None). nl debe estar validado.
+        """
+        key, canon = canonical_key(nl, method, checks, options)
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+            self.hits_memory += 1
+            return key, canon, _from_entry(entry, canon)
+        if self.disk_dir:
+            path = self._path(key)
+            try:
+                entry = _read_entry(path)
+                os.utime(path)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                entry = None
+            if entry is not None:
+                self.hits_disk += 1
+                self._remember(key, entry)
+                return key, canon, _from_entry(entry, canon)
+        self.misses += 1
+        return key, canon, None
+
+    def store(self, key: str, canon, sol: Solution) -> None:
+        entry = _to_entry(sol, canon)
+        self._remember(key, entry)
+        if self.disk_dir:
+            fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                _write_entry(f, entry)
+            os.replace(tmp, self._path(key))
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(_SUFFIX):
+                st = os.stat(os.path.join(self.disk_dir, name))
+                files.append((st.st_mtime, st.st_size, name))
+        total = sum(s for _, s, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        self._mem.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(_SUFFIX):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def stats(self) -> dict:
+        return {"hits_memory": self.hits_memory, "hits_disk": self.hits_disk,
+                "misses": self.misses, "entries": len(self._mem)}
@@ -0,0 +1,176 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, Optional
+from ..analysis.compiled import CompiledCircuit
+from ..analysis.results import MonteCarloResult
+from ..domain.compiled import as_compiled
+from .validation import validate, ParameterError
+
+# Circuito compilado del proceso actual (uno por worker del pool)
+_CC: Optional[CompiledCircuit] = None
+
+
+def _init_worker(nl):
+    global _CC
+    _CC = CompiledCircuit(nl)
+
+
+class _RunningStats:
+    """
+    Acumulador combinable (Chan et al.) de media/varianza, extremos,
+    cumplimiento de límites y una submuestra para cuantiles.
+    """
+    def __init__(self, n_signals, n_limits):
+        self.count = 0
+        self.mean = np.zeros(n_signals)
+        self.m2 = np.zeros(n_signals)
+        self.min = np.full(n_signals, np.inf)
+        self.max = np.full(n_signals, -np.inf)
+        self.pass_all = 0
+        self.pass_each = np.zeros(n_limits, dtype=np.int64)
+        self.sample = np.empty((0, n_signals))
+
+    def add(self, Y, ok, keep_rows):
+        other = _RunningStats(Y.shape[1], ok.shape[1])
+        other.count = Y.shape[0]
+        other.mean = Y.mean(axis=0)
+        other.m2 = ((Y - other.mean) ** 2).sum(axis=0)
+        other.min = Y.min(axis=0)
+        other.max = Y.max(axis=0)
+        other.pass_all = int(ok.all(axis=1).sum())
+        other.pass_each = ok.sum(axis=0)
+        other.sample = Y[keep_rows]
+        self.merge(other)
+
+    def merge(self, o):
+        if o.count == 0:
+            return
+        n = self.count + o.count
+        delta = o.mean - self.mean
+        self.mean = self.mean + delta * (o.count / n)
+        self.m2 = self.m2 + o.m2 + delta ** 2 * (self.count * o.count / n)
+        self.count = n
+        self.min = np.minimum(self.min, o.min)
+        self.max = np.maximum(self.max, o.max)
+        self.pass_all += o.pass_all
+        self.pass_each = self.pass_each + o.pass_each
+        self.sample = np.concatenate([self.sample, o.sample])
+
+
+def _signal_columns(cc, limits):
+    """
+    Orden de señales ("V(n)" y luego "I(c)") y límites como arrays.
+    """
+    signals = [f"V({n})" for n in cc.node_ids] + [f"I({b})" for b in cc.branch_ids]
+    pos = {s: k for k, s in enumerate(signals)}
+    names = list(limits)
+    for name in names:
+        if name not in pos:
+            raise ParameterError(f"Límite sobre una señal inexistente: {name}.")
+    cols = np.array([pos[s] for s in names], dtype=np.int64)
+    lo = np.array([-np.inf if limits[s][0] is None else limits[s][0] for s in names], dtype=float)
+    hi = np.array([np.inf if limits[s][1] is None else limits[s][1] for s in names], dtype=float)
+    return signals, names, cols, lo, hi
+
+
+def _mc_task(ids, nominal, tol, dist, seed, n, batch_size, keep, cols, lo, hi):
+    """
+    Ejecuta n muestras con su propio flujo RNG y devuelve estadísticos parciales.
+    """
+    rng = np.random.default_rng(seed)
+    stats = None
+    for s in range(0, n, batch_size):
+        m = min(batch_size, n - s)
+        if dist == "uniform":
+            dev = rng.uniform(-1.0, 1.0, size=(m, len(ids))) * tol
+        else:
+            # La tolerancia es el límite ±3σ de la gaussiana
+            dev = rng.standard_normal(size=(m, len(ids))) * (tol / 3.0)
+        values = np.maximum(nominal * (1.0 + dev), np.finfo(float).tiny)
+        r = _CC.sweep(ids, values)
+        Y = np.concatenate([r.node_voltages, r.branch_currents], axis=1)
+        ok = (Y[:, cols] >= lo) & (Y[:, cols] <= hi)
+        if stats is None:
+            stats = _RunningStats(Y.shape[1], len(cols))
+        # Submuestra uniforme: cada lote guarda la misma fracción de filas
+        k = min(m, -(-keep * m // n))
+        stats.add(Y, ok, rng.choice(m, size=k, replace=False))
+    return stats
+
+
+def monte_carlo_iter(nl, n_samples: int, tolerance=0.05, dist: str = "gaussian",
+                     components=None, limits=None, seed=None, workers: int = 1,
+                     batch_size: int = 1000, task_size: int = 10000,
+                     q=(0.01, 0.5, 0.99), max_keep: int = 20000) -> Iterator[MonteCarloResult]:
+    """
+    Análisis de tolerancias de resistores por Monte Carlo, en streaming.
+    - tolerance: relativa (0.05 = 5%), global o {id: tol}. En "gaussian" es
+      el límite ±3σ; en "uniform" el intervalo ±tol.
+    - components: ids de resistores a variar (por defecto, todos).
+    - limits: {"V(N2)": (lo, hi), "I(R1)": (None, hi)} para el rendimiento.
+    - Las muestras se reparten en tareas de task_size con flujos RNG hijos de
+      SeedSequence(seed): el resultado no depende de `workers`.
+    - Produce un MonteCarloResult acumulado cada vez que termina una tarea.
+    - ParameterError si n_samples < 1.
+    """
+    if n_samples < 1:
+        raise ParameterError(f"n_samples debe ser >= 1 (actual: {n_samples}).")
+    if dist not in ("gaussian", "uniform"):
+        raise ParameterError(f"Distribución desconocida: {dist}.")
+    cn = as_compiled(nl)
+    validate(cn)
+    limits = limits or {}
+    _init_worker(cn)
+    cc = _CC
+    if components is None:
+        ids = [cn.comp_ids[k] for k in cc.meta.res.tolist()]
+    else:
+        ids = list(components)
+        for cid in ids:
+            if not cc.is_resistor(cid):
+                raise ParameterError(f"{cid}: solo se admiten resistores en Monte Carlo.")
+    nominal = np.array([cc.value_of(cid) for cid in ids], dtype=float)
+    if isinstance(tolerance, dict):
+        tol = np.array([float(tolerance.get(cid, 0.0)) for cid in ids])
+    else:
+        tol = np.full(len(ids), float(tolerance))
+    signals, names, cols, lo, hi = _signal_columns(cc, limits)
+
+    sizes = [min(task_size, n_samples - s) for s in range(0, n_samples, task_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    keep = max(1, -(-max_keep // max(1, len(sizes))))
+    args = [(ids, nominal, tol, dist, sd, m, batch_size, keep, cols, lo, hi)
+            for sd, m in zip(seeds, sizes)]
+
+    total = _RunningStats(len(signals), len(names))
+    def result():
+        std = np.sqrt(total.m2 / max(1, total.count - 1))
+        qs = (np.quantile(total.sample, q, axis=0) if len(total.sample)
+              else np.full((len(q), len(signals)), np.nan))
+        n = max(1, total.count)
+        return MonteCarloResult(
+            n_samples=total.count, signals=signals, mean=total.mean.copy(), std=std,
+            min=total.min.copy(), max=total.max.copy(), q=tuple(q), quantiles=qs,
+            yield_=total.pass_all / n,
+            limit_yield={s: float(total.pass_each[k]) / n for k, s in enumerate(names)},
+        )
+
+    if workers <= 1:
+        for a in args:
+            total.merge(_mc_task(*a))
+            yield result()
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cn,)) as ex:
+        for fut in as_completed([ex.submit(_mc_task, *a) for a in args]):
+            total.merge(fut.result())
+            yield result()
+
+
+def monte_carlo(nl, n_samples: int, **kw) -> MonteCarloResult:
+    """
+    Igual que monte_carlo_iter pero devuelve solo el resultado final.
+    """
+    res = None
+    for res in monte_carlo_iter(nl, n_samples, **kw):
+        pass
+    return res
@@ -1,13 +1,129 @@
+import argparse
+import glob
+import json
+import os
 import sys
-from .serialization import load_json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from .serialization import load_json_stream, load_binary
+from .spice import load_spice
 from .simulate import simulate
+from .validation import ValidationError
+from ..analysis.checks import CHECK_LEVELS
+from ..analysis.ordering import ORDERINGS
+from ..analysis.diodes import DiodeStateError
+from ..analysis.solver import BACKENDS
 
-def main():
-    if len(sys.argv) < 2:
-        print("Uso: python -m app.run_cli <netlist.json>")
-        sys.exit(1)
-    nl = load_json(sys.argv[1])
-    sol = simulate(nl)
+# Extensiones reconocidas al recorrer directorios, con su cargador (todos
+# devuelven la forma compilada salvo los JSON jerárquicos)
+_load_spice = partial(load_spice, compiled=True)
+LOADERS = {".json": load_json_stream, ".cir": _load_spice, ".sp": _load_spice,
+           ".spice": _load_spice, ".ckb": load_binary}
+
+# Fallas que se registran en el JSONL en lugar de abortar el lote: circuito
+# inválido, diodos sin estado consistente, matriz singular o no tratable por
+# el backend (LinAlgError; RuntimeError de SuperLU), Newton sin convergencia
+# (NewtonError es un RuntimeError) o archivo ilegible/mal formado.
+RECORDED_ERRORS = (ValidationError, DiodeStateError, np.linalg.LinAlgError, RuntimeError,
+                   OSError, ValueError, KeyError)
+METHODS = ("auto",) + tuple(BACKENDS)
+
+
+def expand_paths(paths, recursive: bool = False):
+    """
+    Archivos, directorios (sus archivos con extensión conocida) y globs, en
+    orden y sin duplicados. Lo que no existe se conserva para registrar el
+    error en su registro.
+    """
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            pattern = os.path.join(p, "**", "*") if recursive else os.path.join(p, "*")
+            out.extend(sorted(f for f in glob.glob(pattern, recursive=recursive)
+                              if os.path.splitext(f)[1].lower() in LOADERS and os.path.isfile(f)))
+        elif glob.has_magic(p):
+            out.extend(sorted(glob.glob(p, recursive=True)))
+        else:
+            out.append(p)
+    return list(dict.fromkeys(out))
+
+
+def _load(path: str):
+    loader = LOADERS.get(os.path.splitext(path)[1].lower(), load_json_stream)
+    return loader(path)
+
+
+def _solver_summary(solver: dict) -> dict:
+    # La historia por iteración de Newton no va al registro: solo el residuo
+    # final (iteraciones y factorizaciones del jacobiano ya están en solver)
+    out = {k: v for k, v in solver.items() if k != "history"}
+    if "history" in solver:
+        res = solver["history"]["residual"]
+        out["residual"] = float(res[-1]) if res else 0.0
+    return out
+
+
+def run_one(path: str, method: str = "auto", checks: str = "summary",
+            ordering: str = "colamd") -> dict:
+    """
+    Simula un archivo y devuelve su registro JSONL.
+    """
+    t0 = time.perf_counter()
+    try:
+        nl = _load(path)
+        t1 = time.perf_counter()
+        sol = simulate(nl, method=method, checks=checks, ordering=ordering)
+    except RECORDED_ERRORS as e:
+        return {"file": path, "ok": False, "error": type(e).__name__, "message": str(e),
+                "time_s": time.perf_counter() - t0}
+    t2 = time.perf_counter()
+    return {
+        "file": path,
+        "ok": True,
+        "node_voltages": dict(sol.node_voltages.items()),
+        "branch_currents": dict(sol.branch_currents.items()),
+        "diode_states": sol.diode_states,
+        "checks": sol.checks.get("summary", {}),
+        "solver": _solver_summary(sol.solver),
+        "time_s": t2 - t0,
+        "load_s": t1 - t0,
+        "solve_s": t2 - t1,
+    }
+
+
+def _run_one(args):
+    return run_one(*args)
+
+
+def run_batch(paths, out, workers: int = 1, chunksize: int = 8,
+              method: str = "auto", checks: str = "summary", ordering: str = "colamd") -> tuple:
+    """
+    Simula todos los archivos y escribe un registro JSON por línea en `out`
+    a medida que terminan (en el orden de entrada). Devuelve (total, fallidos).
+    """
+    tasks = [(p, method, checks, ordering) for p in paths]
+    total = failed = 0
+    if workers <= 1:
+        results = map(_run_one, tasks)
+        ex = None
+    else:
+        ex = ProcessPoolExecutor(max_workers=workers)
+        results = ex.map(_run_one, tasks, chunksize=max(1, chunksize))
+    try:
+        for rec in results:
+            total += 1
+            failed += not rec["ok"]
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+    finally:
+        if ex is not None:
+            ex.shutdown()
+    return total, failed
+
+
+def _print_solution(sol):
     print("Voltajes nodales:")
     for k,v in sol.node_voltages.items():
         print(f"  {k}: {v:.6f} V")
@@ -16,5 +132,44 @@ def main():
         print(f"  {k}: {i:.9f} A")
     print("Checks:", sol.checks)
 
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m src.app.run_cli",
+        description="Simula uno o varios netlists (JSON, SPICE .cir/.sp o binario .ckb).")
+    ap.add_argument("paths", nargs="+", help="archivos, directorios o globs")
+    ap.add_argument("-o", "--output", help="archivo JSONL de salida (por defecto stdout)")
+    ap.add_argument("--jsonl", action="store_true", help="salida JSONL aunque sea un solo archivo")
+    ap.add_argument("-j", "--workers", type=int, default=1, help="procesos en paralelo")
+    ap.add_argument("--chunksize", type=int, default=8, help="archivos por tarea del pool")
+    ap.add_argument("-r", "--recursive", action="store_true", help="recorrer subdirectorios")
+    ap.add_argument("--method", choices=METHODS, default="auto", help="backend de LinearSolver")
+    ap.add_argument("--checks", choices=CHECK_LEVELS,
+                    help="nivel de checks (por defecto: full con un archivo, summary en lote)")
+    ap.add_argument("--ordering", choices=ORDERINGS, default="colamd",
+                    help="orden de incógnitas de la LU dispersa")
+    args = ap.parse_args(argv)
+
+    paths = expand_paths(args.paths, args.recursive)
+    if not paths:
+        ap.error("no se encontraron netlists.")
+
+    # Un solo archivo sin opciones de lote: salida legible como antes
+    if len(paths) == 1 and not (args.jsonl or args.output):
+        sol = simulate(_load(paths[0]), method=args.method, checks=args.checks or "full",
+                       ordering=args.ordering)
+        _print_solution(sol)
+        return 0
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        total, failed = run_batch(paths, out, args.workers, args.chunksize, args.method,
+                                  args.checks or "summary", args.ordering)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{total} circuitos, {failed} con error.", file=sys.stderr)
+    return 1 if failed else 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
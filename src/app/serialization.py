@@ -1,25 +1,51 @@
 import json
+from array import array
 from typing import Any
+import numpy as np
 from ..domain.netlist import Netlist
+from ..domain.subcircuit import Instance, Subcircuit
+from ..domain.compiled import CompiledNetlist, KIND_CODES, POLARITY_CODES
 from ..domain.components.resistor import Resistor
 from ..domain.components.vsource import VSource
-from ..domain.components.diode import IdealDiode
+from ..domain.components.diode import IdealDiode, ShockleyDiode
+from ..domain.components.capacitor import Capacitor
+from ..domain.components.inductor import Inductor
 
-def load_json(path: str) -> Netlist:
-    data = json.load(open(path, "r", encoding="utf-8"))
+def _netlist_from_dict(data: dict) -> Netlist:
     nl = Netlist()
-    for n in data["nodes"]:
+    for n in data.get("nodes", []):
         nl.add_node(n["id"], n.get("is_ground", False))
-    for c in data["components"]:
+    for c in data.get("components", []):
         if c["kind"] == "R":
             nl.add_component(Resistor(c["id"], c["n1"], c["n2"], c["R"]))
         elif c["kind"] == "V":
             nl.add_component(VSource(c["id"], c["n1"], c["n2"], c["V"]))
         elif c["kind"] == "D":
             nl.add_component(IdealDiode(c["id"], c["n1"], c["n2"], c.get("polarity","A_to_K")))
+        elif c["kind"] == "DS":
+            nl.add_component(ShockleyDiode(c["id"], c["n1"], c["n2"], c.get("Is", 1e-14), c.get("n", 1.0)))
+        elif c["kind"] == "C":
+            nl.add_component(Capacitor(c["id"], c["n1"], c["n2"], c["C"]))
+        elif c["kind"] == "L":
+            nl.add_component(Inductor(c["id"], c["n1"], c["n2"], c["L"]))
+    for i in data.get("instances", []):
+        nl.add_instance(Instance(i["id"], i["subckt"], list(i["nodes"])))
     return nl
 
-def save_json(nl: Netlist, path: str) -> None:
+def load_json(path: str) -> Netlist:
+    """
+    Netlist desde JSON: "nodes", "components" y, opcionalmente,
+    "subcircuits" (cada uno con "name", "ports" y sus propios "nodes",
+    "components" e "instances") e "instances" ({"id", "subckt", "nodes"}).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    nl = _netlist_from_dict(data)
+    for sc in data.get("subcircuits", []):
+        nl.add_subcircuit(Subcircuit(sc["name"], list(sc["ports"]), _netlist_from_dict(sc)))
+    return nl
+
+def _netlist_to_dict(nl: Netlist) -> dict:
     out: dict[str, Any] = {
         "nodes": [{"id": n.id, "is_ground": n.is_ground} for n in nl.nodes.values()],
         "components": []
@@ -29,5 +55,316 @@ def save_json(nl: Netlist, path: str) -> None:
         if c.kind == "R": item["R"] = c.R
         if c.kind == "V": item["V"] = c.V
         if c.kind == "D": item["polarity"] = c.polarity
+        if c.kind == "DS": item.update(Is=c.Is, n=c.n)
+        if c.kind == "C": item["C"] = c.C
+        if c.kind == "L": item["L"] = c.L
         out["components"].append(item)
-    json.dump(out, open(path, "w", encoding="utf-8"), indent=2)
+    if nl.instances:
+        out["instances"] = [{"id": i.id, "subckt": i.subckt, "nodes": list(i.nodes)}
+                            for i in nl.instances]
+    return out
+
+def save_json(nl: Netlist, path: str) -> None:
+    out = _netlist_to_dict(nl)
+    if nl.subcircuits:
+        out["subcircuits"] = [dict(name=sc.name, ports=list(sc.ports), **_netlist_to_dict(sc.netlist))
+                              for sc in nl.subcircuits.values()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2)
+
+
+class _JSONStream:
+    """
+    Lector incremental: trozos de chunk_size caracteres y json.raw_decode
+    sobre un búfer del que se descarta lo ya consumido.
+    """
+    _WS = " \t\n\r"
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.buf) // 2:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in self._WS:
+                self.pos += 1
+            if self.pos < n:
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("JSON incompleto: fin de archivo inesperado.")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"JSON inválido: se esperaba '{ch}' en la posición {self.pos}.")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un número al final del búfer puede estar cortado
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self):
+        # Elementos de un array JSON, uno a uno
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            ch = self.peek()
+            self.pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"JSON inválido: se esperaba ',' o ']' en la posición {self.pos - 1}.")
+
+
+def load_json_stream(path: str, chunk_size: int = 1 << 20):
+    """
+    Carga un netlist JSON directamente en la forma compilada, elemento a
+    elemento, sin árbol JSON completo ni objetos de dominio intermedios.
+    - Los arrays "nodes" y "components" pueden venir en cualquier orden; el
+      resto de claves de primer nivel se ignora.
+    - El resultado equivale a load_json(path).compile() (mismo orden de
+      nodos y componentes; los tipos desconocidos se omiten igual).
+    - Si el archivo tiene "subcircuits" o "instances" se delega en
+      load_json y se devuelve el Netlist jerárquico, para que simulate
+      pueda usar los macromodelos.
+    """
+    node_ids, index = [], {}
+    is_ground, declared = [], []
+    node_order = []          # códigos en el orden del array "nodes"
+    comp_ids = []
+    kind, n1, n2, value, aux = array("b"), array("i"), array("i"), array("d"), array("d")
+
+    def code(nid):
+        i = index.get(nid)
+        if i is None:
+            i = index[nid] = len(node_ids)
+            node_ids.append(nid)
+            is_ground.append(False)
+            declared.append(False)
+        return i
+
+    with open(path, "r", encoding="utf-8") as f:
+        js = _JSONStream(f, chunk_size)
+        js.expect("{")
+        if js.peek() == "}":
+            js.pos += 1
+        else:
+            while True:
+                key = js.value()
+                js.expect(":")
+                if key == "nodes":
+                    for n in js.items():
+                        i = code(n["id"])
+                        if not declared[i]:
+                            declared[i] = True
+                            node_order.append(i)
+                        is_ground[i] = is_ground[i] or bool(n.get("is_ground", False))
+                elif key == "components":
+                    for c in js.items():
+                        k = c["kind"]
+                        x = 0.0
+                        if k == "R":
+                            v = float(c["R"])
+                        elif k == "V":
+                            v = float(c["V"])
+                        elif k == "D":
+                            v = POLARITY_CODES.get(c.get("polarity", "A_to_K"), np.nan)
+                        elif k in ("C", "L"):
+                            v = float(c[k])
+                        elif k == "DS":
+                            v, x = float(c.get("Is", 1e-14)), float(c.get("n", 1.0))
+                        else:
+                            continue
+                        comp_ids.append(c["id"])
+                        kind.append(KIND_CODES[k])
+                        n1.append(code(c["n1"]))
+                        n2.append(code(c["n2"]))
+                        value.append(v)
+                        aux.append(x)
+                elif key in ("subcircuits", "instances"):
+                    return load_json(path)
+                else:
+                    js.value()
+                ch = js.peek()
+                js.pos += 1
+                if ch == "}":
+                    break
+                if ch != ",":
+                    raise ValueError(f"JSON inválido: se esperaba ',' o '}}' en la posición {js.pos - 1}.")
+
+    # Nodos declarados en el orden de "nodes" y después los no declarados
+    seen = np.zeros(len(node_ids), dtype=bool)
+    seen[node_order] = True
+    order = np.concatenate([np.array(node_order, dtype=np.int64), np.flatnonzero(~seen)])
+    remap = np.empty(len(node_ids), dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    return CompiledNetlist(
+        node_ids=[node_ids[i] for i in order.tolist()],
+        is_ground=np.array(is_ground, dtype=bool)[order],
+        declared=np.array(declared, dtype=bool)[order],
+        comp_ids=comp_ids,
+        kind=np.frombuffer(kind, dtype=np.int8),
+        n1=remap[np.frombuffer(n1, dtype=np.int32)],
+        n2=remap[np.frombuffer(n2, dtype=np.int32)],
+        value=np.frombuffer(value, dtype=np.float64).copy(),
+        aux=np.frombuffer(aux, dtype=np.float64).copy(),
+    )
+
+
+# --- Formato binario: cabecera JSON + arrays crudos alineados -------------
+# [magic 8 B][longitud de cabecera uint64 LE][cabecera JSON][secciones]
+# Cada sección empieza en un múltiplo de _ALIGN y se describe en la cabecera
+# con dtype, shape y offset (relativo al inicio de los datos).
+BINARY_MAGIC = b"CIRKITB1"
+_ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _ids_blob(ids) -> np.ndarray:
+    return np.frombuffer("\0".join(ids).encode("utf-8"), dtype=np.uint8)
+
+
+def _ids_from_blob(blob, n: int) -> list:
+    return blob.tobytes().decode("utf-8").split("\0") if n else []
+
+
+def save_binary(nl, path: str, sol=None) -> None:
+    """
+    Guarda el netlist (Netlist o CompiledNetlist) en formato binario y,
+    opcionalmente, los vectores de una solución: voltajes de nodo (filas
+    MNA, sin GND), corrientes por componente y estado ON de los diodos.
+    De checks solo se guarda el resumen.
+    """
+    cn = nl if isinstance(nl, CompiledNetlist) else nl.compile()
+    sections = {
+        "node_ids": _ids_blob(cn.node_ids),
+        "comp_ids": _ids_blob(cn.comp_ids),
+        "is_ground": cn.is_ground.astype(np.uint8),
+        "declared": cn.declared.astype(np.uint8),
+        "kind": cn.kind.astype(np.int8),
+        "n1": cn.n1.astype("<i4"),
+        "n2": cn.n2.astype("<i4"),
+        "value": cn.value.astype("<f8"),
+        "aux": cn.aux.astype("<f8"),
+    }
+    header: dict[str, Any] = {"version": 1, "n_nodes": cn.n_nodes, "n_components": cn.n_components}
+    if sol is not None:
+        rows = np.flatnonzero(cn.declared & ~cn.is_ground).tolist()
+        node_ids = [cn.node_ids[i] for i in rows]
+        sections["node_voltages"] = np.array([sol.node_voltages[k] for k in node_ids], dtype="<f8")
+        sections["branch_currents"] = np.array([sol.branch_currents[k] for k in cn.comp_ids], dtype="<f8")
+        sections["diode_on"] = np.fromiter((sol.diode_states.get(k) == "ON" for k in cn.comp_ids),
+                                           dtype=np.uint8, count=cn.n_components)
+        header["solution"] = {"solver": sol.solver, "checks": {"summary": sol.checks.get("summary", {})}}
+
+    offset = 0
+    header["sections"] = {}
+    for name, arr in sections.items():
+        header["sections"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _align(offset + arr.nbytes)
+    head = json.dumps(header).encode("utf-8")
+    start = _align(len(BINARY_MAGIC) + 8 + len(head))
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(len(head).to_bytes(8, "little"))
+        f.write(head)
+        for name, arr in sections.items():
+            f.seek(start + header["sections"][name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(start + offset)
+
+
+def _read_binary(path: str, mmap: bool):
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path}: no es un netlist binario de CirKit.")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size).decode("utf-8"))
+        start = _align(len(BINARY_MAGIC) + 8 + size)
+        out = {}
+        for name, s in header["sections"].items():
+            dtype, shape = np.dtype(s["dtype"]), tuple(s["shape"])
+            count = int(np.prod(shape))
+            if mmap and count:
+                # Copia en escritura: se puede modificar sin tocar el archivo
+                out[name] = np.memmap(path, dtype=dtype, mode="c", offset=start + s["offset"], shape=shape)
+            else:
+                f.seek(start + s["offset"])
+                out[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return header, out
+
+
+def load_binary(path: str, mmap: bool = True) -> CompiledNetlist:
+    """
+    Carga un netlist binario como CompiledNetlist. Con mmap=True los arrays
+    son np.memmap sobre el archivo (sin copiar ni parsear); solo las
+    tablas de IDs se decodifican.
+    """
+    header, a = _read_binary(path, mmap)
+    return CompiledNetlist(
+        node_ids=_ids_from_blob(a["node_ids"], header["n_nodes"]),
+        is_ground=a["is_ground"].view(bool),
+        declared=a["declared"].view(bool),
+        comp_ids=_ids_from_blob(a["comp_ids"], header["n_components"]),
+        kind=a["kind"],
+        n1=a["n1"],
+        n2=a["n2"],
+        value=a["value"],
+        aux=a.get("aux"),
+    )
+
+
+def load_binary_solution(path: str, mmap: bool = True):
+    """
+    Solution guardado con save_binary (None si el archivo no tiene). Los
+    dicts de voltajes y corrientes son vistas sobre los arrays mapeados.
+    """
+    from ..analysis.results import ArrayMap, Solution
+    header, a = _read_binary(path, mmap)
+    if "solution" not in header:
+        return None
+    node_ids = _ids_from_blob(a["node_ids"], header["n_nodes"])
+    comp_ids = _ids_from_blob(a["comp_ids"], header["n_components"])
+    rows = np.flatnonzero(a["declared"].view(bool) & ~a["is_ground"].view(bool)).tolist()
+    diodes = np.flatnonzero(a["kind"] == KIND_CODES["D"]).tolist()
+    on = a["diode_on"]
+    return Solution(
+        node_voltages=ArrayMap([node_ids[i] for i in rows], a["node_voltages"]),
+        branch_currents=ArrayMap(comp_ids, a["branch_currents"]),
+        diode_states={comp_ids[k]: ("ON" if on[k] else "OFF") for k in diodes},
+        checks=header["solution"]["checks"],
+        solver=header["solution"]["solver"],
+    )
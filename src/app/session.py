@@ -0,0 +1,90 @@
+import numpy as np
+from typing import Optional
+from ..analysis.compiled import CompiledCircuit
+from ..analysis.results import Solution
+from ..domain.compiled import KIND_CODES, as_compiled
+from .simulate import simulate
+from .validation import validate
+
+
+def _topology_key(cn):
+    # Lo que obliga a recompilar: IDs, tipos, conexiones, GND y polaridades
+    diode = cn.kind == KIND_CODES["D"]
+    return (tuple(cn.comp_ids), cn.kind.tobytes(), cn.n1.tobytes(), cn.n2.tobytes(),
+            tuple(cn.node_ids), cn.is_ground.tobytes(), cn.value[diode].tobytes())
+
+
+class SimulationSession:
+    """
+    Sesión de simulación incremental para editar valores sin repetir todo
+    el pipeline validar/ensamblar/factorizar.
+    - Valida y compila una vez; set_value cambia R o V y re-resuelve como
+      actualización de rango 1 sobre la última factorización (ver
+      CompiledCircuit), que solo se rehace tras varios cambios acumulados.
+    - Con diodos ideales (o condensadores/inductores) no hay actualización
+      incremental: cada cambio re-simula completo.
+    - ordering: orden de incógnitas de la LU (ver analysis.ordering).
+    - solution: el último Solution calculado.
+    """
+    def __init__(self, nl, checks: str = "full", ordering: str = "colamd"):
+        self.nl = nl
+        self.checks = checks
+        self.ordering = ordering
+        self.cn = cn = as_compiled(nl)
+        validate(cn)
+        self._key = _topology_key(cn)
+        only_rv = bool(np.all((cn.kind == KIND_CODES["R"]) | (cn.kind == KIND_CODES["V"])))
+        self._cc: Optional[CompiledCircuit] = (
+            CompiledCircuit(nl, compiled=cn, ordering=ordering) if only_rv else None)
+        self.solution = self._solve()
+
+    def _solve(self) -> Solution:
+        if self._cc is None:
+            return simulate(self.cn, checks=self.checks, ordering=self.ordering)
+        return self._cc.solve(checks=self.checks)
+
+    def _apply(self, cid: str, value: float) -> None:
+        if self._cc is not None:
+            self._cc.set_value(cid, value)
+            return
+        k = self.cn.index_of(cid)
+        kind = self.cn.kind[k]
+        if kind == KIND_CODES["R"]:
+            if not (value > 0):
+                raise ValueError(f"{cid}: la resistencia R debe ser > 0 (actual: {value}).")
+            attr = "R"
+        elif kind == KIND_CODES["V"]:
+            attr = "V"
+        else:
+            raise KeyError(f"{cid}: no es un resistor ni una fuente del circuito.")
+        self.cn.value[k] = value
+        if self.cn is not self.nl and k < len(self.nl.components):
+            setattr(self.nl.components[k], attr, value)
+
+    def set_value(self, cid: str, value: float) -> Solution:
+        """
+        Cambia R (resistor) o V (fuente) y devuelve el Solution actualizado.
+        """
+        self._apply(cid, float(value))
+        self.solution = self._solve()
+        return self.solution
+
+    def set_values(self, values: dict) -> Solution:
+        for cid, value in values.items():
+            self._apply(cid, float(value))
+        self.solution = self._solve()
+        return self.solution
+
+    def sync(self, nl) -> Optional[Solution]:
+        """
+        Lleva la sesión a los valores de otro Netlist con la misma topología
+        (p. ej. reconstruido desde la UI) y devuelve el Solution; None si la
+        topología cambió y hace falta una sesión nueva.
+        """
+        cn = as_compiled(nl)
+        if _topology_key(cn) != self._key:
+            return None
+        changed = np.flatnonzero(cn.value != self.cn.value)
+        if len(changed):
+            self.set_values({cn.comp_ids[k]: cn.value[k] for k in changed.tolist()})
+        return self.solution
@@ -1,13 +1,231 @@
-from ..analysis.tableau import build_system
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
+from ..analysis.tableau import Meta, build_system
 from ..analysis.solver import LinearSolver
 from ..analysis.checks import run_checks
-from ..analysis.results import Solution
+from ..analysis.compiled import CompiledCircuit
+from ..analysis.blocks import CHUNK_UNKNOWNS, decompose
+from ..analysis.reduction import reduce_network
+from ..analysis.macromodel import MacromodelError, solve_hierarchical
+from ..analysis.diodes import solve_ideal_diodes
+from ..analysis.newton import solve_newton
+from ..analysis.transient import run_transient
+from ..analysis.ac import PRIMA_ORDER, run_ac, small_signal
+from ..analysis.results import ACResult, ArrayMap, Solution, SweepResult, TransientResult
+from ..domain.compiled import KIND_CODES, as_compiled
+from ..domain.subcircuit import flatten
 from .validation import validate
 
-def simulate(nl) -> Solution:
-    validate(nl)
-    A, b, meta = build_system(nl)
-    x = LinearSolver().solve(A, b)
-    sol = meta.reconstruct_solution(x)
-    sol.checks = run_checks(nl, sol)
+def _solve(cn, method: str = "auto", ordering: str = "colamd", jacobian_reuse: int = 1):
+    """
+    Ensambla y resuelve un circuito ya validado, sin checks: (Solution, Meta).
+    """
+    A, b, meta = build_system(cn)
+    if len(meta.shk):
+        # Diodos de Shockley: Newton-Raphson sobre el sistema lineal
+        x, I, solver = solve_newton(A, b, meta, ordering=ordering, jacobian_reuse=jacobian_reuse)
+        sol = meta.reconstruct_solution(x)
+        sol.branch_currents = ArrayMap(meta.branch_ids, I)
+        sol.solver = solver
+    elif len(meta.dio):
+        # Diodos ideales: búsqueda de estados con actualizaciones de bajo rango
+        x, states, pivots, fact = solve_ideal_diodes(A, b, meta, ordering=ordering)
+        sol = meta.reconstruct_solution(x)
+        sol.diode_states = states
+        sol.solver = {"method": fact, "iterations": 0, "diode_pivots": pivots}
+    else:
+        solver = LinearSolver(method, ordering=ordering)
+        x = solver.solve(A, b)
+        sol = meta.reconstruct_solution(x)
+        sol.solver = solver.info()
+    return sol, meta
+
+def _full_solution(cn, v, I, diode_states, solver) -> tuple:
+    """
+    Solution del circuito completo desde voltajes por código de nodo y
+    corrientes por componente: (Solution, Meta) listo para run_checks.
+    """
+    meta = Meta(cn)
+    rows = np.flatnonzero(cn.declared & ~cn.is_ground)
+    sol = Solution(
+        node_voltages=ArrayMap(meta.node_ids, v[rows]),
+        branch_currents=ArrayMap(cn.comp_ids, I),
+        diode_states={cid: diode_states[cid] for cid in meta.diode_ids},
+        solver=solver,
+    )
+    return sol, meta
+
+def _solve_reduced(cn, method: str = "auto", ordering: str = "colamd"):
+    """
+    Resuelve cn a través de su red reducida (analysis.reduction) y rellena
+    los nodos y corrientes eliminados.
+    """
+    red = reduce_network(cn)
+    rsol, _ = _solve(red.reduced, method, ordering)
+    v, I = red.expand(rsol.node_voltages.array, rsol.branch_currents.array)
+    solver = dict(rsol.solver, reduction=red.stats)
+    return _full_solution(cn, v, I, rsol.diode_states, solver)
+
+def simulate(nl, method: str = "auto", checks: str = "full", cache=None,
+             reduce: bool = False, ordering: str = "colamd", jacobian_reuse: int = 1) -> Solution:
+    """
+    Valida, ensambla y resuelve el circuito.
+    - method: backend de LinearSolver ("auto", "dense", "splu", "cg", "gmres").
+    - checks: nivel de verificación LCK/LVK ("off", "summary", "full").
+    - nl puede ser un Netlist o su forma compilada: se compila una sola vez.
+    - cache: SimulationCache opcional (app.cache); si el circuito (ya
+      validado) se simuló con las mismas opciones se devuelve el resultado
+      guardado sin resolver, con solver["cached"] = True.
+    - reduce: reduce antes los resistores en serie/paralelo; solver
+      incluye "reduction" con el tamaño antes/después.
+    - ordering: orden de incógnitas de la LU dispersa ("colamd", "mmd",
+      "rcm" o "natural"; ver analysis.ordering). Con LU dispersa, solver
+      incluye "ordering" con ancho de banda y relleno.
+    - Un Netlist con instancias de subcircuitos se valida aplanado pero se
+      resuelve con macromodelos de puertos (analysis.macromodel), salvo con
+      reduce o si alguna definición no lo admite (diodos, bloque singular).
+    - Con diodos de Shockley el punto de operación se calcula por
+      Newton-Raphson (analysis.newton); jacobian_reuse > 1 reutiliza el
+      jacobiano varias iteraciones (Newton modificado). solver incluye
+      "iterations", "factorizations" e "history" (residuo, paso y
+      amortiguación por iteración).
+    """
+    cn, hier = flatten(nl) if getattr(nl, "instances", None) else (as_compiled(nl), None)
+    validate(cn)
+    if cache is not None:
+        options = {"reduce": reduce, "ordering": ordering, "jacobian_reuse": jacobian_reuse,
+                   "hierarchical": hier is not None}
+        key, canon, sol = cache.lookup(cn, method, checks, options)
+        if sol is not None:
+            return sol
+    sol = None
+    if hier is not None and not reduce:
+        try:
+            sol, meta = _full_solution(cn, *solve_hierarchical(cn, hier, method, ordering))
+        except MacromodelError:
+            sol = None
+    if sol is None:
+        sol, meta = (_solve_reduced(cn, method, ordering) if reduce
+                     else _solve(cn, method, ordering, jacobian_reuse))
+    sol.checks = run_checks(cn, sol, level=checks, meta=meta)
+    if cache is not None:
+        cache.store(key, canon, sol)
+    return sol
+
+def _solve_chunk(sub, method):
+    sol, _ = _solve(sub, method)
+    return (sol.node_voltages.array, sol.branch_currents.array, sol.diode_states,
+            sol.solver.get("diode_pivots", 0))
+
+def simulate_blocks(nl, method: str = "auto", checks: str = "full", workers: int = 1,
+                    max_unknowns: int = CHUNK_UNKNOWNS) -> Solution:
+    """
+    Como simulate(), pero resolviendo por separado los bloques biconexos
+    del circuito (ver analysis.blocks): secciones que solo comparten GND o
+    un nodo de corte.
+    - Los bloques se agrupan en sub-sistemas de hasta max_unknowns
+      incógnitas y se resuelven en un pool de `workers` procesos.
+    - Los voltajes se recomponen con el voltaje de cada nodo de corte; las
+      corrientes y los estados de los diodos no cambian al unir.
+    - checks se calcula sobre el circuito completo.
+    """
+    cn = as_compiled(nl)
+    validate(cn)
+    dec = decompose(cn)
+    groups = [dec.subnetlist(cn, g) for g in dec.chunks(max_unknowns)]
+    tasks = [sub for sub, _, _ in groups]
+    if workers <= 1 or len(tasks) <= 1:
+        results = [_solve_chunk(sub, method) for sub in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_solve_chunk, tasks, [method] * len(tasks)))
+
+    v_local = np.zeros(cn.n_nodes)
+    I = np.empty(cn.n_components)
+    states, pivots = {}, 0
+    for (_, nodes, comps), (v, i, st, pv) in zip(groups, results):
+        v_local[nodes] = v
+        I[comps] = i
+        states.update(st)
+        pivots += pv
+    v = dec.stitch(v_local)
+
+    sol, meta = _full_solution(cn, v, I, states, {
+        "method": "blocks", "blocks": dec.n_blocks, "chunks": len(tasks),
+        "largest_block": int(dec.unknowns.max(initial=0)), "workers": workers,
+        "diode_pivots": pivots})
+    sol.checks = run_checks(cn, sol, level=checks, meta=meta)
     return sol
+
+def compile_circuit(nl, ordering: str = "colamd") -> CompiledCircuit:
+    """
+    Valida una vez y devuelve un handle que reutiliza patrón, orden y
+    factorización entre simulaciones que solo cambian valores de R/V.
+    - ordering: orden de incógnitas de la LU (ver analysis.ordering).
+    """
+    cn = as_compiled(nl)
+    validate(cn)
+    return CompiledCircuit(nl, compiled=cn, ordering=ordering)
+
+def sweep(nl, values, ordering: str = "colamd") -> SweepResult:
+    """
+    Barrido DC de valores de R/V resuelto en bloque.
+    - values como dict {id: secuencia}: rejilla (producto cartesiano).
+    - values como lista de dicts: un punto por elemento; los ids que falten
+      en un punto conservan el valor del Netlist.
+    - ordering: orden de incógnitas de la LU (ver analysis.ordering).
+    """
+    cn = as_compiled(nl)
+    validate(cn)
+    cc = CompiledCircuit(nl, compiled=cn, ordering=ordering)
+    if isinstance(values, Mapping):
+        ids = list(values)
+        axes = [np.asarray(values[k], dtype=float).ravel() for k in ids]
+        table = np.stack([a.ravel() for a in np.meshgrid(*axes, indexing="ij")], axis=1)
+    else:
+        points = list(values)
+        ids = list(dict.fromkeys(k for p in points for k in p))
+        table = np.array([[p.get(k, cc.value_of(k)) for k in ids] for p in points], dtype=float)
+    return cc.sweep(ids, table.reshape(-1, len(ids)))
+
+def transient(nl, t_stop: float, dt: float, method: str = "trap", sources=None,
+              initial: str = "op", save_every: int = 1, currents: bool = True,
+              ordering: str = "colamd") -> TransientResult:
+    """
+    Valida el circuito y lo integra en el tiempo con paso fijo dt hasta
+    t_stop (ver analysis.transient).
+    - method: "trap" (trapezoidal) o "be" (Euler implícito).
+    - sources: {ID de fuente: función de t o array por instante}; las demás
+      fuentes mantienen su valor DC.
+    - initial: "op" parte del punto de operación DC; "zero", del reposo.
+    - save_every: decimación de las formas de onda guardadas.
+    - Los subcircuitos se aplanan; no admite diodos ideales.
+    """
+    cn = flatten(nl)[0] if getattr(nl, "instances", None) else as_compiled(nl)
+    validate(cn)
+    return run_transient(cn, t_stop, dt, method=method, sources=sources, initial=initial,
+                         save_every=save_every, currents=currents, ordering=ordering)
+
+def ac(nl, freqs, inputs=None, nodes=None, method: str = "auto",
+       order: int = PRIMA_ORDER) -> ACResult:
+    """
+    Valida el circuito y calcula su respuesta en frecuencia de pequeña
+    señal (ver analysis.ac).
+    - freqs: frecuencias en Hz.
+    - inputs: {ID de fuente: amplitud compleja}; None excita todas las
+      fuentes con amplitud 1.
+    - nodes: IDs de los nodos sondeados (None = todos).
+    - method: "auto", "direct" o "prima" (modelo reducido de dimensión
+      `order`).
+    - Con diodos se linealiza en el punto de operación DC.
+    """
+    cn = flatten(nl)[0] if getattr(nl, "instances", None) else as_compiled(nl)
+    validate(cn)
+    if np.any((cn.kind == KIND_CODES["D"]) | (cn.kind == KIND_CODES["DS"])):
+        if inputs is None:
+            # Solo las fuentes del circuito, no las de 0 V de los diodos
+            inputs = {cn.comp_ids[k]: 1.0 for k in np.flatnonzero(cn.kind == KIND_CODES["V"]).tolist()}
+        sol, _ = _solve(cn)
+        cn = small_signal(cn, sol)
+    return run_ac(cn, freqs, inputs=inputs, nodes=nodes, method=method, order=order)
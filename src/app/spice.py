@@ -0,0 +1,379 @@
+import re
+from array import array
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from ..domain.netlist import Netlist
+from ..domain.compiled import CompiledNetlist, KIND_CODES, POLARITY_CODES
+from ..domain.components.resistor import Resistor
+from ..domain.components.vsource import VSource
+from ..domain.components.diode import IdealDiode, ShockleyDiode
+from ..domain.components.capacitor import Capacitor
+from ..domain.components.inductor import Inductor
+
+# Sufijos de ingeniería de SPICE (sin distinguir mayúsculas; "m" es mili y
+# "meg" mega). Las letras que siguen al sufijo (unidades: "10kOhm", "5V")
+# se ignoran.
+_SUFFIX = {"t": 1e12, "g": 1e9, "meg": 1e6, "k": 1e3, "mil": 25.4e-6,
+           "m": 1e-3, "u": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15}
+_NUMBER = re.compile(r"([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(meg|mil|[tgkmunpf])?[a-z]*", re.IGNORECASE)
+_GROUND = {"0", "gnd"}
+# Funciones transitorias de las fuentes; sus argumentos (entre paréntesis o
+# no) no cuentan para el valor DC
+_TRANSIENT = {"sin", "pulse", "pwl", "exp", "sffm", "am"}
+_PARENS = re.compile(r"\([^)]*\)?")
+_DIODE_MODEL = "DIDEAL"
+_SHOCKLEY_MODEL = "DS"
+
+
+class SpiceError(ValueError):
+    """
+    Deck SPICE con una tarjeta no soportada o mal formada.
+    """
+
+
+def parse_value(tok: str) -> float:
+    """
+    Número SPICE con sufijo de ingeniería: "4.7k" -> 4700.0, "1meg" -> 1e6.
+    """
+    try:
+        return float(tok)
+    except ValueError:
+        pass
+    m = _NUMBER.match(tok)
+    if not m:
+        raise ValueError(f"Valor SPICE inválido: {tok!r}.")
+    v = float(m.group(1))
+    suf = m.group(2)
+    return v * _SUFFIX[suf.lower()] if suf else v
+
+
+def _logical_lines(lines: Iterable[str]):
+    """
+    Une las continuaciones "+", quita comentarios ("*" al inicio, ";" o
+    "$ " en línea) y salta la línea de título. Produce (nº de línea, tokens).
+    """
+    it = iter(lines)
+    next(it, None)  # título
+    pending, start = None, 0
+    for no, line in enumerate(it, start=2):
+        if ";" in line:
+            line = line.split(";", 1)[0]
+        if "$ " in line:
+            line = line.split("$ ", 1)[0]
+        toks = line.split()
+        if not toks or toks[0][0] == "*":
+            continue
+        if toks[0][0] == "+":
+            if pending is None:
+                raise SpiceError(f"Línea {no}: continuación '+' sin tarjeta previa.")
+            first = toks[0][1:]
+            pending.extend(([first] if first else []) + toks[1:])
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = toks, no
+    if pending is not None:
+        yield start, pending
+
+
+def _source_value(toks: List[str], no: int) -> float:
+    # V<nombre> n+ n- [[DC] valor] [AC mag [fase]] [SIN(...) | PULSE(...) | ...]:
+    # se toma el valor DC (0 si solo hay especificación AC o transitoria)
+    if len(toks) == 4:
+        try:
+            return parse_value(toks[3])
+        except ValueError:
+            pass
+    text = " ".join(toks[3:])
+    if "(" in text:
+        text = _PARENS.sub(" ", text)
+    rest = text.replace("=", " ").split()
+    value, i = 0.0, 0
+    try:
+        while i < len(rest):
+            t = rest[i].lower()
+            if t == "dc":
+                value = parse_value(rest[i + 1])
+                i += 2
+            elif t == "ac":
+                i += 1
+                for _ in range(2):          # magnitud y fase opcionales
+                    if i < len(rest) and _NUMBER.fullmatch(rest[i]):
+                        i += 1
+            elif t in _TRANSIENT:
+                break                       # sus argumentos (sin paréntesis) van detrás
+            else:
+                value = parse_value(rest[i])
+                i += 1
+    except IndexError:
+        raise SpiceError(f"Línea {no}: falta el valor tras DC.")
+    except ValueError as e:
+        raise SpiceError(f"Línea {no}: {e}")
+    return value
+
+
+def _model_params(toks: List[str], no: int) -> Dict[str, float]:
+    # .model <nombre> D [(] IS=... N=... [)]: parámetros en minúsculas
+    out = {}
+    text = " ".join(toks[2:])[1:]
+    for tok in text.replace("(", " ").replace(")", " ").replace(",", " ").split():
+        if "=" in tok:
+            key, _, val = tok.partition("=")
+            try:
+                out[key.lower()] = parse_value(val)
+            except ValueError as e:
+                raise SpiceError(f"Línea {no}: {e}")
+    return out
+
+
+def loads_spice(text_or_lines, compiled: bool = False):
+    """
+    Convierte un deck SPICE en Netlist en una sola pasada.
+    - Tarjetas R, C, L (IC= se ignora), V (valor DC; las especificaciones
+      AC y SIN/PULSE/PWL/EXP/SFFM se ignoran) y D (ánodo -> cátodo).
+      Nodo "0" o "gnd" -> "GND".
+    - Un diodo cuyo .model D define IS es un diodo de Shockley (IS y N; el
+      resto de parámetros se ignora); sin modelo o sin IS, un diodo ideal.
+    - .subckt/.ends y X<nombre> ... <subckt>: las instancias se aplanan con
+      nombres jerárquicos ("X1.R1", nodo interno "X1.n3") y sus componentes
+      quedan después de los de primer nivel.
+    - .end termina el deck; el resto de directivas (.op, ...) se ignoran.
+    - Otros elementos lanzan SpiceError.
+    - Las tarjetas van directamente a los arrays de la forma compilada (sin
+      objetos de dominio intermedios); compiled=True la devuelve tal cual,
+      como load_json_stream.
+    """
+    lines = text_or_lines.splitlines() if isinstance(text_or_lines, str) else text_or_lines
+    node_ids: List[str] = []
+    index: Dict[str, int] = {}   # nombre en el deck -> código de nodo
+    comp_ids: List[str] = []
+    kind, n1, n2, value, aux = array("b"), array("i"), array("i"), array("d"), array("d")
+    codes = {k: KIND_CODES[k] for k in ("R", "V", "C", "L")}
+    diode, shockley = KIND_CODES["D"], KIND_CODES["DS"]
+    a_to_k = POLARITY_CODES["A_to_K"]
+
+    def node(name: str) -> int:
+        i = index.get(name)
+        if i is None:
+            nid = "GND" if name.lower() in _GROUND else name
+            i = index.get(nid)
+            if i is None:
+                i = index[nid] = len(node_ids)
+                node_ids.append(nid)
+            index[name] = i
+        return i
+
+    def add(k, cid, a, b, v):
+        comp_ids.append(cid)
+        n1.append(a)
+        n2.append(b)
+        if k != "D":
+            kind.append(codes[k])
+            value.append(v)
+            aux.append(0.0)
+            return
+        params = models.get(v, {}) if v else {}
+        if "is" in params:
+            kind.append(shockley)
+            value.append(params["is"])
+            aux.append(params.get("n", 1.0))
+        else:
+            kind.append(diode)
+            value.append(a_to_k)
+            aux.append(0.0)
+
+    # Las tarjetas de primer nivel van a los arrays al leerlas; los diodos quedan
+    # como ideales y se resuelven con su .model al final (puede definirse
+    # después). Los cuerpos de .subckt y las instancias X se guardan como
+    # (tipo, nombre, nodos, valor, línea) y se expanden al final.
+    pending: List[Tuple[int, str]] = []
+    values: Dict[str, float] = {}        # valores ya convertidos (se repiten mucho)
+    instances: List[Tuple] = []
+    models: Dict[str, Dict[str, float]] = {}
+    subckts: Dict[str, Tuple[List[str], List[Tuple]]] = {}
+    body = None
+    current = None
+    for no, toks in _logical_lines(lines):
+        head = toks[0]
+        c = head[0].upper()
+        if c == ".":
+            d = head.lower()
+            if d == ".subckt":
+                if current is not None:
+                    raise SpiceError(f"Línea {no}: .subckt anidado.")
+                if len(toks) < 2:
+                    raise SpiceError(f"Línea {no}: .subckt sin nombre.")
+                current = toks[1].lower()
+                body = []
+                subckts[current] = ([p for p in toks[2:] if "=" not in p], body)
+            elif d == ".ends":
+                if current is None:
+                    raise SpiceError(f"Línea {no}: .ends sin .subckt.")
+                current, body = None, None
+            elif d == ".model":
+                if len(toks) >= 3 and toks[2].lower().startswith("d"):
+                    models[toks[1].lower()] = _model_params(toks, no)
+            elif d == ".end":
+                break
+            continue
+        try:
+            if c in ("R", "C", "L"):
+                v = values.get(toks[3])
+                if v is None:
+                    v = values[toks[3]] = parse_value(toks[3])
+            elif c == "V":
+                v = _source_value(toks, no)
+            elif c == "D":
+                v = toks[3].lower() if len(toks) > 3 and "=" not in toks[3] else None
+            elif c == "X":
+                args = [t for t in toks[1:] if "=" not in t]
+                elem = ("X", head, tuple(args[:-1]), args[-1].lower(), no)
+            else:
+                raise SpiceError(f"Línea {no}: elemento no soportado: {head}.")
+            if c != "X":
+                pa, pb = toks[1], toks[2]
+        except (IndexError, ValueError) as e:
+            if isinstance(e, SpiceError):
+                raise
+            raise SpiceError(f"Línea {no}: tarjeta incompleta o inválida: {' '.join(toks)}.")
+        if body is not None:
+            body.append(elem if c == "X" else (c, head, (pa, pb), v, no))
+        elif c == "X":
+            instances.append(elem)
+        else:
+            a = index.get(pa)
+            if a is None:
+                a = node(pa)
+            b = index.get(pb)
+            if b is None:
+                b = node(pb)
+            if c == "D":
+                pending.append((len(comp_ids), v))
+                k, v = diode, a_to_k
+            else:
+                k = codes[c]
+            comp_ids.append(head)
+            kind.append(k)
+            n1.append(a)
+            n2.append(b)
+            value.append(v)
+            aux.append(0.0)
+    if current is not None:
+        raise SpiceError(f"Falta .ends del subcircuito {current}.")
+
+    for k, model in pending:
+        params = models.get(model, {}) if model else {}
+        if "is" in params:
+            kind[k] = shockley
+            value[k] = params["is"]
+            aux[k] = params.get("n", 1.0)
+
+    def expand(elem, outer, prefix: str, stack):
+        _, name, _, sub_name, no = elem
+        if sub_name not in subckts:
+            raise SpiceError(f"Línea {no}: subcircuito no definido: {sub_name}.")
+        if sub_name in stack:
+            raise SpiceError(f"Línea {no}: subcircuito recursivo: {sub_name}.")
+        ports, sub = subckts[sub_name]
+        if len(ports) != len(outer):
+            raise SpiceError(f"Línea {no}: {name} conecta {len(outer)} nodos y "
+                             f"{sub_name} tiene {len(ports)} puertos.")
+        inner = dict(zip(ports, outer))
+        pre = f"{prefix}{name}."
+        for e in sub:
+            pins = [inner[p] if p in inner else node(p) if p.lower() in _GROUND else node(pre + p)
+                    for p in e[2]]
+            if e[0] == "X":
+                expand(e, pins, pre, stack + (sub_name,))
+            else:
+                add(e[0], pre + e[1], pins[0], pins[1], e[3])
+
+    for elem in instances:
+        expand(elem, [node(p) for p in elem[2]], "", ())
+    is_ground = np.array([nid == "GND" for nid in node_ids], dtype=bool)
+    cn = CompiledNetlist(
+        node_ids=node_ids,
+        is_ground=is_ground,
+        declared=np.ones(len(node_ids), dtype=bool),
+        comp_ids=comp_ids,
+        kind=np.frombuffer(kind, dtype=np.int8),
+        n1=np.frombuffer(n1, dtype=np.int32),
+        n2=np.frombuffer(n2, dtype=np.int32),
+        value=np.frombuffer(value, dtype=np.float64).copy(),
+        aux=np.frombuffer(aux, dtype=np.float64).copy(),
+    )
+    return cn if compiled else cn.to_netlist()
+
+
+def load_spice(path: str, compiled: bool = False):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return loads_spice(f, compiled)
+
+
+def _card_name(letter: str, cid: str) -> str:
+    # SPICE identifica el elemento por la primera letra del nombre
+    return cid if cid[:1].upper() == letter else letter + cid
+
+
+def dumps_spice(nl, title: str = "CirKit netlist") -> str:
+    """
+    Netlist (o CompiledNetlist) como deck SPICE: R, C, L, V (DC) y D;
+    los diodos ideales comparten un modelo sin parámetros y los de
+    Shockley usan un .model con IS y N por cada par distinto. GND se escribe
+    como "0"; los diodos K_to_A se escriben con los nodos invertidos.
+    - Cada subcircuito de nl.subcircuits se escribe como .subckt/.ends (con
+      sus propias instancias) y cada instancia como una tarjeta X; loads_spice
+      las vuelve a aplanar.
+    """
+    if not isinstance(nl, Netlist):
+        nl = nl.to_netlist()
+    out = [f"* {title}"]
+    models = {"ideal": False, "shockley": {}}
+    for sc in nl.subcircuits.values():
+        out.append(f".subckt {sc.name} {' '.join(sc.ports)}")
+        _cards(sc.netlist, out, models)
+        out.append(".ends")
+    _cards(nl, out, models)
+    if models["ideal"]:
+        out.append(f".model {_DIODE_MODEL} D")
+    for (Is, n), model in models["shockley"].items():
+        out.append(f".model {model} D (IS={Is!r} N={n!r})")
+    out.append(".op")
+    out.append(".end")
+    return "\n".join(out) + "\n"
+
+
+def _cards(nl, out: List[str], models: dict) -> None:
+    # Tarjetas de componentes e instancias de un Netlist (primer nivel o
+    # cuerpo de un .subckt); anota en `models` los modelos de diodo usados
+    gnd = {nid for nid, n in nl.nodes.items() if n.is_ground}
+    shockley: Dict[Tuple[float, float], str] = models["shockley"]
+
+    def node(nid):
+        return "0" if nid in gnd else nid
+
+    for c in nl.components:
+        a, b = node(c.n1), node(c.n2)
+        if c.kind == "R":
+            out.append(f"{_card_name('R', c.id)} {a} {b} {c.R!r}")
+        elif c.kind == "C":
+            out.append(f"{_card_name('C', c.id)} {a} {b} {c.C!r}")
+        elif c.kind == "L":
+            out.append(f"{_card_name('L', c.id)} {a} {b} {c.L!r}")
+        elif c.kind == "V":
+            out.append(f"{_card_name('V', c.id)} {a} {b} DC {c.V!r}")
+        elif c.kind == "D":
+            if c.polarity == "K_to_A":
+                a, b = b, a
+            out.append(f"{_card_name('D', c.id)} {a} {b} {_DIODE_MODEL}")
+            models["ideal"] = True
+        elif c.kind == "DS":
+            model = shockley.setdefault((c.Is, c.n), f"{_SHOCKLEY_MODEL}{len(shockley) + 1}")
+            out.append(f"{_card_name('D', c.id)} {a} {b} {model}")
+    for inst in nl.instances:
+        out.append(f"{_card_name('X', inst.id)} {' '.join(node(n) for n in inst.nodes)} {inst.subckt}")
+
+
+def save_spice(nl, path: str, title: str = "CirKit netlist") -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps_spice(nl, title))
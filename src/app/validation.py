@@ -1,6 +1,8 @@
 # src/app/validation.py
-from collections import defaultdict
-from typing import Iterable
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List
+from ..domain.compiled import KIND_CODES, as_compiled
 
 class ValidationError(Exception): ...
 class ConnectivityError(ValidationError): ...
@@ -8,52 +10,189 @@ class GroundError(ValidationError): ...
 class ParameterError(ValidationError): ...
 class TopologyError(ValidationError): ...
 
+@dataclass
+class ValidationIssue:
+    """
+    Un problema encontrado: regla, excepción que le corresponde, mensaje e
+    IDs (de componente o nodo) afectados.
+    """
+    rule: str
+    error: type
+    message: str
+    ids: tuple = ()
+
+    def exception(self) -> ValidationError:
+        return self.error(self.message)
+
+
+@dataclass
+class ValidationReport:
+    """
+    Resultado de check_netlist.
+    - issues: problemas en orden de detección (como mucho max_issues).
+    - counts: total por regla, aunque se haya truncado la lista.
+    - component_masks: {regla: máscara booleana por componente}.
+    """
+    issues: List[ValidationIssue] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+    component_masks: Dict[str, np.ndarray] = field(default_factory=dict)
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.counts
+
+    def raise_first(self) -> None:
+        """
+        Lanza la excepción del primer problema (si hay alguno).
+        """
+        if self.issues:
+            raise self.issues[0].exception()
+
+    def __str__(self):
+        if self.ok:
+            return "Circuito válido."
+        lines = [f"{sum(self.counts.values())} problema(s): "
+                 + ", ".join(f"{r}={n}" for r, n in self.counts.items())]
+        lines += [f"  [{i.error.__name__}] {i.message}" for i in self.issues]
+        if self.truncated:
+            lines.append("  ...")
+        return "\n".join(lines)
+
+
 def validate(nl):
+    """
+    Valida el circuito y lanza la primera falla encontrada (acepta Netlist
+    o CompiledNetlist). Para obtener todas las fallas, ver check_netlist.
+    """
+    check_netlist(nl, fail_fast=True).raise_first()
+
+
+def check_netlist(nl, fail_fast: bool = False, max_issues: int = 1000) -> ValidationReport:
+    """
+    Validación vectorizada en una pasada sobre la forma compilada.
+    - Reúne todos los problemas en un ValidationReport (las máscaras por
+      regla se calculan siempre completas).
+    - fail_fast=True se detiene en el primero, en el mismo orden que
+      validate: GND, componentes, reglas por componente (en orden del
+      netlist) y conectividad.
+    """
+    cn = as_compiled(nl)
+    ids = cn.node_ids
+    rep = ValidationReport()
+
+    def add(rule, error, message, ref=()):
+        rep.counts[rule] = rep.counts.get(rule, 0) + 1
+        if len(rep.issues) < max_issues:
+            rep.issues.append(ValidationIssue(rule, error, message, tuple(ref)))
+        else:
+            rep.truncated = True
+
     # 1) Un único GND
-    gnds = [nid for nid, n in nl.nodes.items() if n.is_ground]
+    gnds = np.flatnonzero(cn.is_ground & cn.declared)
     if len(gnds) == 0:
-        raise GroundError("Falta definir un nodo de tierra (GND).")
-    if len(gnds) > 1:
-        raise GroundError(f"Hay {len(gnds)} nodos marcados como tierra; debe ser exactamente 1.")
+        add("ground", GroundError, "Falta definir un nodo de tierra (GND).")
+    elif len(gnds) > 1:
+        add("ground", GroundError, f"Hay {len(gnds)} nodos marcados como tierra; debe ser exactamente 1.",
+            [ids[i] for i in gnds.tolist()])
+    if fail_fast and rep.issues:
+        return rep
 
     # 2) Componentes presentes
-    if not nl.components:
-        raise ValidationError("No hay componentes en el circuito.")
-
-    # 3) Nodos válidos, extremos distintos y parámetros sanos
-    for c in nl.components:
-        if c.n1 not in nl.nodes or c.n2 not in nl.nodes:
-            raise TopologyError(f"{c.id}: terminal conectado a nodo inexistente ({c.n1}/{c.n2}).")
-        if c.n1 == c.n2:
-            raise TopologyError(f"{c.id}: ambos terminales al mismo nodo ({c.n1}).")
-        if getattr(c, "kind", "") == "R":
-            R = float(getattr(c, "R", 0))
-            if not (R > 0):
-                raise ParameterError(f"{c.id}: la resistencia R debe ser > 0 (actual: {R}).")
-        if getattr(c, "kind", "") == "V":
-            # Fuente ideal puede ser cualquier valor real (incluye 0)
-            pass
-        if getattr(c, "kind", "") == "D":
-            pol = getattr(c, "polarity", "A_to_K")
-            if pol not in ("A_to_K", "K_to_A"):
-                raise ParameterError(f"{c.id}: polarity inválida: {pol}.")
+    if cn.n_components == 0:
+        add("empty", ValidationError, "No hay componentes en el circuito.")
+        return rep
+
+    # 3) Nodos válidos, extremos distintos y parámetros sanos: una máscara
+    #    por regla. Fuente ideal puede ser cualquier valor real (incluye 0).
+    kind, value = cn.kind, cn.value
+    rules = [
+        ("unknown_node", ~(cn.declared[cn.n1] & cn.declared[cn.n2]), TopologyError,
+         lambda k: f"terminal conectado a nodo inexistente ({ids[cn.n1[k]]}/{ids[cn.n2[k]]})."),
+        ("self_loop", cn.n1 == cn.n2, TopologyError,
+         lambda k: f"ambos terminales al mismo nodo ({ids[cn.n1[k]]})."),
+        ("resistance", (kind == KIND_CODES["R"]) & ~(value > 0), ParameterError,
+         lambda k: f"la resistencia R debe ser > 0 (actual: {value[k]})."),
+        ("capacitance", (kind == KIND_CODES["C"]) & ~(value > 0), ParameterError,
+         lambda k: f"la capacitancia C debe ser > 0 (actual: {value[k]})."),
+        ("inductance", (kind == KIND_CODES["L"]) & ~(value > 0), ParameterError,
+         lambda k: f"la inductancia L debe ser > 0 (actual: {value[k]})."),
+        ("saturation", (kind == KIND_CODES["DS"]) & ~(value > 0), ParameterError,
+         lambda k: f"la corriente de saturación Is debe ser > 0 (actual: {value[k]})."),
+        ("ideality", (kind == KIND_CODES["DS"]) & ~(cn.aux > 0), ParameterError,
+         lambda k: f"el factor de idealidad n debe ser > 0 (actual: {cn.aux[k]})."),
+        ("polarity", (kind == KIND_CODES["D"]) & np.isnan(value), ParameterError,
+         lambda k: "polarity inválida" + ("." if nl is cn or k >= len(nl.components) else f": {nl.components[k].polarity}.")),
+        ("kind", kind < 0, ParameterError, lambda k: "tipo de componente desconocido."),
+        ("duplicate_id", _repeated(cn.comp_ids), TopologyError,
+         lambda k: "ID repetido; cada componente debe tener un ID único."),
+    ]
+    for rule, mask, _, _ in rules:
+        rep.component_masks[rule] = mask
+    if fail_fast:
+        bad = np.zeros(cn.n_components, dtype=bool)
+        for _, mask, _, _ in rules:
+            bad |= mask
+        if bad.any():
+            k = int(np.argmax(bad))
+            rule, _, exc, msg = next(r for r in rules if r[1][k])
+            add(rule, exc, f"{cn.comp_ids[k]}: {msg(k)}", [cn.comp_ids[k]])
+            return rep
+    else:
+        for rule, mask, exc, msg in rules:
+            bad = np.flatnonzero(mask)
+            if not len(bad):
+                continue
+            # Solo se redactan mensajes hasta max_issues; el resto solo cuenta
+            room = max(0, max_issues - len(rep.issues))
+            rep.issues.extend(ValidationIssue(rule, exc, f"{cn.comp_ids[k]}: {msg(k)}", (cn.comp_ids[k],))
+                              for k in bad[:room].tolist())
+            rep.counts[rule] = len(bad)
+            rep.truncated |= len(bad) > room
 
     # 4) Conectividad (desde GND alcanzamos todos los nodos?)
-    _assert_connected(nl, start=gnds[0])
+    if len(gnds):
+        label = connected_labels(cn.n_nodes, cn.n1, cn.n2)
+        missing = np.flatnonzero(cn.declared & (label != label[gnds[0]]))
+        if len(missing):
+            names = sorted(ids[i] for i in missing.tolist())
+            add("connectivity", ConnectivityError, "Nodos desconectados del GND: " + ", ".join(names), names)
 
     # 5) Sin ramas colgantes (terminales de componentes no conectan a nada más?) — opcional suave
     #    Permitimos resistencias/fuentes/diodos directos a GND o entre nodos si el grafo general es conexo.
+    return rep
+
+
+def _repeated(ids) -> np.ndarray:
+    # Máscara de las apariciones de un ID a partir de la segunda; el caso
+    # sin repetidos (el habitual) se resuelve con un set
+    m = len(ids)
+    if len(set(ids)) == m:
+        return np.zeros(m, dtype=bool)
+    _, first, inv = np.unique(np.array(ids), return_index=True, return_inverse=True)
+    return first[inv.ravel()] != np.arange(m)
+
 
-def _assert_connected(nl, start: str):
-    adj = defaultdict(set)
-    for c in nl.components:
-        adj[c.n1].add(c.n2); adj[c.n2].add(c.n1)
-    seen = set([start]); stack = [start]
-    while stack:
-        u = stack.pop()
-        for v in adj[u]:
-            if v not in seen:
-                seen.add(v); stack.append(v)
-    missing = set(nl.nodes.keys()) - seen
-    if missing:
-        raise ConnectivityError("Nodos desconectados del GND: " + ", ".join(sorted(missing)))
+def connected_labels(n: int, a, b) -> np.ndarray:
+    """
+    Union-find sobre arrays: etiqueta (mínimo índice) de la componente
+    conexa de cada uno de los n nodos del grafo con aristas (a[k], b[k]).
+    Cada ronda engancha cada raíz a la menor raíz vecina y luego comprime
+    los caminos por saltos de puntero hasta que todos apuntan a su raíz.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    while True:
+        pa, pb = parent[a], parent[b]
+        diff = pa != pb
+        if not diff.any():
+            return parent
+        lo = np.minimum(pa[diff], pb[diff])
+        hi = np.maximum(pa[diff], pb[diff])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
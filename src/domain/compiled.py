@@ -0,0 +1,143 @@
+from typing import List, Optional
+import numpy as np
+
+# Códigos de tipo de componente en CompiledNetlist.kind (-1 = desconocido)
+KIND_CODES = {"R": 0, "V": 1, "D": 2, "C": 3, "L": 4, "DS": 5}
+KIND_NAMES = {v: k for k, v in KIND_CODES.items()}
+# En los diodos, value guarda la orientación: +1 A_to_K, -1 K_to_A (NaN si
+# la polaridad no es válida)
+POLARITY_CODES = {"A_to_K": 1.0, "K_to_A": -1.0}
+POLARITY_NAMES = {v: k for k, v in POLARITY_CODES.items()}
+
+
+class CompiledNetlist:
+    """
+    Netlist en forma de estructura de arrays.
+    - node_ids / comp_ids: tablas de IDs internadas (el índice es el código).
+    - is_ground, declared: por nodo; declared=False marca nodos citados por
+      algún componente pero ausentes de Netlist.nodes.
+    - kind (int8), n1/n2 (int32, códigos de nodo) y value (float64: R, V,
+      C, L, la orientación del diodo ideal o Is del diodo de Shockley) por
+      componente.
+    - aux (float64): segundo parámetro por componente (factor de idealidad
+      n del diodo de Shockley; 0 en el resto). None = todo ceros.
+    """
+    __slots__ = ("node_ids", "is_ground", "declared", "comp_ids", "kind", "n1", "n2", "value",
+                 "aux", "_comp_index")
+
+    def __init__(self, node_ids: List[str], is_ground, declared, comp_ids: List[str],
+                 kind, n1, n2, value, aux=None):
+        self.node_ids = node_ids
+        self.is_ground = np.asarray(is_ground, dtype=bool)
+        self.declared = np.asarray(declared, dtype=bool)
+        self.comp_ids = comp_ids
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.n1 = np.asarray(n1, dtype=np.int32)
+        self.n2 = np.asarray(n2, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.aux = (np.zeros(len(self.kind)) if aux is None
+                    else np.asarray(aux, dtype=np.float64))
+        self._comp_index = None
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_components(self) -> int:
+        return len(self.comp_ids)
+
+    def index_of(self, cid: str) -> int:
+        """
+        Posición de un componente por ID (el índice se crea al primer uso).
+        """
+        if self._comp_index is None:
+            self._comp_index = {c: k for k, c in enumerate(self.comp_ids)}
+        return self._comp_index[cid]
+
+    @classmethod
+    def from_netlist(cls, nl) -> "CompiledNetlist":
+        node_ids = list(nl.nodes)
+        index = {nid: i for i, nid in enumerate(node_ids)}
+        is_ground = [n.is_ground for n in nl.nodes.values()]
+        declared = [True] * len(node_ids)
+
+        def code(nid):
+            i = index.get(nid)
+            if i is None:
+                i = index[nid] = len(node_ids)
+                node_ids.append(nid)
+                is_ground.append(False)
+                declared.append(False)
+            return i
+
+        comps = nl.components
+        m = len(comps)
+        return cls(
+            node_ids=node_ids,
+            is_ground=is_ground,
+            declared=declared,
+            comp_ids=[c.id for c in comps],
+            kind=np.fromiter((KIND_CODES.get(getattr(c, "kind", ""), -1) for c in comps),
+                             dtype=np.int8, count=m),
+            n1=np.fromiter((code(c.n1) for c in comps), dtype=np.int32, count=m),
+            n2=np.fromiter((code(c.n2) for c in comps), dtype=np.int32, count=m),
+            value=np.fromiter((_value_of(c) for c in comps), dtype=np.float64, count=m),
+            aux=np.fromiter((float(getattr(c, "n", 0.0)) if getattr(c, "kind", "") == "DS" else 0.0
+                             for c in comps), dtype=np.float64, count=m),
+        )
+
+    def to_netlist(self):
+        """
+        Reconstruye los objetos de dominio (p. ej. para la UI o save_json).
+        """
+        from .netlist import Netlist
+        from .components.resistor import Resistor
+        from .components.vsource import VSource
+        from .components.diode import IdealDiode, ShockleyDiode
+        from .components.capacitor import Capacitor
+        from .components.inductor import Inductor
+        nl = Netlist()
+        for nid, g, d in zip(self.node_ids, self.is_ground.tolist(), self.declared.tolist()):
+            if d:
+                nl.add_node(nid, g)
+        ids = self.node_ids
+        for cid, k, a, b, v, x in zip(self.comp_ids, self.kind.tolist(), self.n1.tolist(),
+                                      self.n2.tolist(), self.value.tolist(), self.aux.tolist()):
+            if k == KIND_CODES["R"]:
+                nl.add_component(Resistor(cid, ids[a], ids[b], v))
+            elif k == KIND_CODES["V"]:
+                nl.add_component(VSource(cid, ids[a], ids[b], v))
+            elif k == KIND_CODES["D"]:
+                nl.add_component(IdealDiode(cid, ids[a], ids[b], POLARITY_NAMES.get(v, "A_to_K")))
+            elif k == KIND_CODES["C"]:
+                nl.add_component(Capacitor(cid, ids[a], ids[b], v))
+            elif k == KIND_CODES["L"]:
+                nl.add_component(Inductor(cid, ids[a], ids[b], v))
+            elif k == KIND_CODES["DS"]:
+                nl.add_component(ShockleyDiode(cid, ids[a], ids[b], v, x))
+        return nl
+
+
+def _value_of(c) -> float:
+    kind = getattr(c, "kind", "")
+    if kind == "R":
+        return float(getattr(c, "R", 0))
+    if kind == "V":
+        return float(getattr(c, "V", 0))
+    if kind == "C":
+        return float(getattr(c, "C", 0))
+    if kind == "L":
+        return float(getattr(c, "L", 0))
+    if kind == "DS":
+        return float(getattr(c, "Is", 0))
+    if kind == "D":
+        return POLARITY_CODES.get(getattr(c, "polarity", "A_to_K"), np.nan)
+    return np.nan
+
+
+def as_compiled(nl) -> CompiledNetlist:
+    """
+    Acepta un Netlist o un CompiledNetlist y devuelve la forma compilada.
+    """
+    return nl if isinstance(nl, CompiledNetlist) else nl.compile()
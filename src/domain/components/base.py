@@ -1,9 +1,11 @@
 from dataclasses import dataclass
 from typing import Literal
 
-ComponentKind = Literal["R", "V", "D"]  # Resistor, VSource, Diode
+ComponentKind = Literal["R", "V", "D", "C", "L", "DS"]  # Resistor, VSource, IdealDiode, Capacitor, Inductor, ShockleyDiode
 
-@dataclass
+# slots=True recrea la clase: las subclases llaman a Component.__init__
+# explícitamente porque super() sin argumentos apuntaría a la clase vieja.
+@dataclass(slots=True)
 class Component:
     id: str
     n1: str
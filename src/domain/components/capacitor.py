@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from .base import Component
+
+@dataclass(slots=True)
+class Capacitor(Component):
+    C: float = 1e-6
+    def __init__(self, id: str, n1: str, n2: str, C: float):
+        Component.__init__(self, id, n1, n2, "C")
+        self.C = float(C)
@@ -1,9 +1,18 @@
 from dataclasses import dataclass
 from .base import Component
 
-@dataclass
+@dataclass(slots=True)
 class IdealDiode(Component):
     polarity: str = "A_to_K"  # ánodo -> cátodo
     def __init__(self, id: str, n1: str, n2: str, polarity: str = "A_to_K"):
-        super().__init__(id, n1, n2, "D")
+        Component.__init__(self, id, n1, n2, "D")
         self.polarity = polarity
+
+@dataclass(slots=True)
+class ShockleyDiode(Component):
+    Is: float = 1e-14  # corriente de saturación (A)
+    n: float = 1.0     # factor de idealidad
+    def __init__(self, id: str, n1: str, n2: str, Is: float = 1e-14, n: float = 1.0):
+        Component.__init__(self, id, n1, n2, "DS")  # n1 = ánodo, n2 = cátodo
+        self.Is = float(Is)
+        self.n = float(n)
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from .base import Component
+
+@dataclass(slots=True)
+class Inductor(Component):
+    L: float = 1e-3
+    def __init__(self, id: str, n1: str, n2: str, L: float):
+        Component.__init__(self, id, n1, n2, "L")
+        self.L = float(L)
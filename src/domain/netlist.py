@@ -1,12 +1,34 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, List, Set
 from .node import Node
 from .components.base import Component
+from .compiled import CompiledNetlist
+from .subcircuit import Instance, Subcircuit, flatten
 
 @dataclass
 class Netlist:
     nodes: Dict[str, Node] = field(default_factory=dict)
     components: List[Component] = field(default_factory=list)
+    # Definiciones de subcircuitos (por nombre) e instancias de primer nivel
+    subcircuits: Dict[str, Subcircuit] = field(default_factory=dict)
+    instances: List[Instance] = field(default_factory=list)
+    # Índice nodo -> componentes incidentes e ID -> posición en `components`;
+    # se mantienen en add_component y remove_component (no modificar
+    # `components` directamente).
+    _incident: Dict[str, List[Component]] = field(default_factory=dict, init=False,
+                                                 repr=False, compare=False)
+    _position: Dict[str, int] = field(default_factory=dict, init=False,
+                                      repr=False, compare=False)
+
+    def __post_init__(self):
+        for k, c in enumerate(self.components):
+            self._index(c)
+            self._position[c.id] = k
+
+    def _index(self, c: Component) -> None:
+        self._incident.setdefault(c.n1, []).append(c)
+        if c.n2 != c.n1:
+            self._incident.setdefault(c.n2, []).append(c)
 
     def add_node(self, id: str, is_ground: bool = False) -> Node:
         if id not in self.nodes:
@@ -17,7 +39,88 @@ class Netlist:
         return self.nodes[id]
 
     def add_component(self, c: Component) -> None:
+        self._position[c.id] = len(self.components)
         self.components.append(c)
+        self._index(c)
+
+    def add_subcircuit(self, sc: Subcircuit) -> None:
+        self.subcircuits[sc.name] = sc
+
+    def add_instance(self, inst: Instance) -> None:
+        self.instances.append(inst)
+
+    def remove_component(self, cid: str) -> Component:
+        """
+        Quita el componente con ese ID y lo devuelve (KeyError si no existe).
+        - Se localiza por el índice ID -> posición y el último componente
+          ocupa su hueco: O(1) más O(grado) de sus nodos para el índice de
+          incidencia. No conserva el orden de `components`.
+        - Con IDs repetidos (que la validación rechaza) cae en una búsqueda
+          lineal.
+        """
+        comps = self.components
+        k = self._position.pop(cid, None)
+        if k is None or k >= len(comps) or comps[k].id != cid:
+            for k, c in enumerate(comps):
+                if c.id == cid:
+                    break
+            else:
+                raise KeyError(f"{cid}: no existe en el netlist.")
+        c = comps[k]
+        last = comps.pop()
+        if k < len(comps):
+            comps[k] = last
+            if self._position.get(last.id) == len(comps):
+                self._position[last.id] = k
+        for nid in (c.n1, c.n2):
+            lst = self._incident.get(nid)
+            if lst is None:
+                continue
+            lst[:] = [x for x in lst if x is not c]
+            if not lst:
+                del self._incident[nid]
+        return c
+
+    def components_at(self, nid: str) -> List[Component]:
+        """
+        Componentes con algún terminal en el nodo (O(grado)).
+        """
+        return list(self._incident.get(nid, ()))
+
+    def degree(self, nid: str) -> int:
+        return len(self._incident.get(nid, ()))
+
+    def neighbors(self, nid: str) -> Set[str]:
+        """
+        Nodos unidos a `nid` por algún componente.
+        """
+        out = set()
+        for c in self._incident.get(nid, ()):
+            out.add(c.n2 if c.n1 == nid else c.n1)
+        return out
+
+    def reachable(self, start: str) -> Set[str]:
+        """
+        Nodos alcanzables desde `start` recorriendo el índice (O(nodos + componentes)).
+        """
+        seen = {start}
+        stack = [start]
+        while stack:
+            for v in self.neighbors(stack.pop()):
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return seen
+
+    def compile(self) -> CompiledNetlist:
+        """
+        Forma de estructura de arrays (ver domain.compiled) que consumen
+        validación, ensamblado, checks y reconstrucción. Las instancias de
+        subcircuitos se aplanan (ver domain.subcircuit.flatten).
+        """
+        if self.instances:
+            return flatten(self)[0]
+        return CompiledNetlist.from_netlist(self)
 
     def ground_id(self) -> str:
         for k, n in self.nodes.items():
@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .compiled import CompiledNetlist
+
+
+@dataclass(slots=True)
+class Instance:
+    """
+    Uso de un subcircuito: nodes[k] se conecta al puerto k de la definición.
+    """
+    id: str
+    subckt: str
+    nodes: List[str]
+
+
+@dataclass
+class Subcircuit:
+    """
+    Definición de subcircuito reutilizable.
+    - ports: IDs de nodos de `netlist` que se conectan, por posición, a los
+      nodos de cada instancia. No pueden ser de tierra.
+    - Los nodos de tierra de `netlist` son la tierra global; los demás son
+      internos y al aplanar se llaman "<instancia>.<nodo>" (los componentes,
+      "<instancia>.<id>").
+    - netlist puede tener a su vez instancias; los nombres se resuelven en
+      los subcircuitos del Netlist raíz.
+    """
+    name: str
+    ports: List[str]
+    netlist: "Netlist"
+
+
+class InstanceGroup:
+    """
+    Instancias de una misma definición dentro de un Netlist aplanado.
+    - compiled: forma compilada (aplanada) del netlist de la definición.
+    - port_local / internal: códigos de nodo de `compiled` de los puertos y
+      de los nodos internos (ni puerto ni tierra), en orden.
+    - ids: IDs de las instancias; ports: (K, p) códigos en el aplanado de
+      los nodos conectados a cada puerto.
+    - node_start / comp_start: dónde empiezan los nodos internos y los
+      componentes de cada instancia en el aplanado (bloques contiguos).
+    """
+    def __init__(self, subckt: Subcircuit, compiled: CompiledNetlist, port_local, internal):
+        self.subckt = subckt
+        self.compiled = compiled
+        self.port_local = port_local
+        self.internal = internal
+        self.ids: List[str] = []
+        self.ports = []
+        self.node_start = []
+        self.comp_start = []
+
+
+class Hierarchy:
+    """
+    Cómo se aplanó un Netlist con instancias: los primeros n_top_nodes
+    nodos y n_top_comps componentes del aplanado son los de primer nivel;
+    groups agrupa las instancias por definición.
+    """
+    def __init__(self, n_top_nodes: int, n_top_comps: int, groups: Dict[str, InstanceGroup]):
+        self.n_top_nodes = n_top_nodes
+        self.n_top_comps = n_top_comps
+        self.groups = groups
+
+    def top(self, cn: CompiledNetlist) -> CompiledNetlist:
+        """
+        Circuito de primer nivel (sin las instancias) sobre los códigos de cn.
+        """
+        nt, mt = self.n_top_nodes, self.n_top_comps
+        return CompiledNetlist(cn.node_ids[:nt], cn.is_ground[:nt], cn.declared[:nt],
+                               cn.comp_ids[:mt], cn.kind[:mt], cn.n1[:mt], cn.n2[:mt],
+                               cn.value[:mt], cn.aux[:mt])
+
+
+def flatten(nl, registry: Optional[Dict[str, Subcircuit]] = None,
+            _stack: Tuple[str, ...] = ()) -> Tuple[CompiledNetlist, Optional[Hierarchy]]:
+    """
+    Aplana un Netlist con instancias de subcircuitos en su forma compilada.
+    - Orden: nodos y componentes de primer nivel (como from_netlist), nodos
+      de instancias no declarados y después, instancia a instancia, sus
+      nodos internos y sus componentes.
+    - Devuelve (compilado, Hierarchy); Hierarchy es None sin instancias.
+    - ValueError si una instancia usa un subcircuito no definido o
+      recursivo, o no conecta tantos nodos como puertos tiene.
+    """
+    registry = nl.subcircuits if registry is None else registry
+    top = CompiledNetlist.from_netlist(nl)
+    if not nl.instances:
+        return top, None
+
+    node_ids = list(top.node_ids)
+    index = {nid: i for i, nid in enumerate(node_ids)}
+    is_ground = [top.is_ground]
+    declared = [top.declared]
+    extra = []
+
+    def code(nid):
+        i = index.get(nid)
+        if i is None:
+            i = index[nid] = len(node_ids)
+            node_ids.append(nid)
+            extra.append(nid)
+        return i
+
+    groups: Dict[str, InstanceGroup] = {}
+    outer = []
+    for inst in nl.instances:
+        sc = registry.get(inst.subckt)
+        if sc is None:
+            raise ValueError(f"{inst.id}: subcircuito no definido: {inst.subckt}.")
+        if sc.name in _stack:
+            raise ValueError(f"{inst.id}: subcircuito recursivo: {sc.name}.")
+        if len(inst.nodes) != len(sc.ports):
+            raise ValueError(f"{inst.id}: conecta {len(inst.nodes)} nodos y {sc.name} "
+                             f"tiene {len(sc.ports)} puertos.")
+        g = groups.get(sc.name)
+        if g is None:
+            dcn, _ = flatten(sc.netlist, registry, _stack + (sc.name,))
+            local = {nid: i for i, nid in enumerate(dcn.node_ids)}
+            missing = [p for p in sc.ports if p not in local]
+            if missing:
+                raise ValueError(f"{sc.name}: puertos sin nodo en la definición: {', '.join(missing)}.")
+            port_local = np.array([local[p] for p in sc.ports], dtype=np.int64)
+            if np.any(dcn.is_ground[port_local]):
+                raise ValueError(f"{sc.name}: un puerto no puede ser el nodo de tierra.")
+            inner = ~dcn.is_ground
+            inner[port_local] = False
+            g = groups[sc.name] = InstanceGroup(sc, dcn, port_local, np.flatnonzero(inner))
+        outer.append((inst, g, [code(n) for n in inst.nodes]))
+    # Tierra de las definiciones: la de primer nivel; si falta, un nodo no
+    # declarado (la validación reporta la falta de GND)
+    gnds = np.flatnonzero(top.is_ground)
+    gnd = int(gnds[0]) if len(gnds) else None
+    for g in groups.values():
+        if gnd is None and np.any(g.compiled.is_ground):
+            gnd = code(g.compiled.node_ids[int(np.flatnonzero(g.compiled.is_ground)[0])])
+    # Nodos citados solo por instancias y no declarados en Netlist.nodes
+    is_ground.append(np.zeros(len(extra), dtype=bool))
+    declared.append(np.zeros(len(extra), dtype=bool))
+
+    n_top = len(node_ids)
+    comp_ids = list(top.comp_ids)
+    kind, n1, n2, value, aux = [top.kind], [top.n1], [top.n2], [top.value], [top.aux]
+    for inst, g, codes in outer:
+        dcn = g.compiled
+        start = len(node_ids)
+        lut = np.empty(dcn.n_nodes, dtype=np.int64)
+        lut[g.internal] = np.arange(start, start + len(g.internal))
+        lut[g.port_local] = codes
+        lut[dcn.is_ground] = gnd if gnd is not None else -1
+        pre = inst.id + "."
+        node_ids.extend(pre + dcn.node_ids[i] for i in g.internal.tolist())
+        is_ground.append(np.zeros(len(g.internal), dtype=bool))
+        declared.append(dcn.declared[g.internal])
+        g.ids.append(inst.id)
+        g.ports.append(codes)
+        g.node_start.append(start)
+        g.comp_start.append(len(comp_ids))
+        comp_ids.extend(pre + cid for cid in dcn.comp_ids)
+        kind.append(dcn.kind)
+        n1.append(lut[dcn.n1])
+        n2.append(lut[dcn.n2])
+        value.append(dcn.value)
+        aux.append(dcn.aux)
+    for g in groups.values():
+        g.ports = np.array(g.ports, dtype=np.int64).reshape(len(g.ids), len(g.port_local))
+        g.node_start = np.array(g.node_start, dtype=np.int64)
+        g.comp_start = np.array(g.comp_start, dtype=np.int64)
+
+    cn = CompiledNetlist(
+        node_ids=node_ids,
+        is_ground=np.concatenate(is_ground),
+        declared=np.concatenate(declared),
+        comp_ids=comp_ids,
+        kind=np.concatenate(kind),
+        n1=np.concatenate(n1),
+        n2=np.concatenate(n2),
+        value=np.concatenate(value),
+        aux=np.concatenate(aux),
+    )
+    return cn, Hierarchy(n_top, top.n_components, groups)
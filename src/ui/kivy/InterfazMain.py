@@ -47,6 +47,7 @@ from tkinter import filedialog
 #  BACKEND
 # -------------------------------------------------
 from src.app.simulate import simulate
+from src.app.session import SimulationSession
 from src.app.export_pdf import export_solution_pdf
 from src.domain.netlist import Netlist
 from src.domain.components.resistor import Resistor
@@ -315,6 +316,9 @@ class CircuitCanvas(FloatLayout):
         self._wire_first: Optional[Tuple[str, str]] = None
         self._ghost: Optional[InstructionGroup] = None
         self._gnd: Optional[Tuple[str, str]] = None
+        # Sesión de la última simulación: los cambios de valor se re-resuelven
+        # de forma incremental mientras la topología no cambie
+        self._session: Optional[SimulationSession] = None
 
     def _setup(self, *_):
         self.bind(size=self._grid, pos=self._grid)
@@ -662,74 +666,22 @@ class CircuitCanvas(FloatLayout):
 
     # --------------- conectividad ---------------
     def _connectivity_ok(self) -> Tuple[bool, str]:
-        uf = UF()
-        # cables
-        for w in self.wires:
-            uf.union(f"{w.a[0]}:{w.a[1]}", f"{w.b[0]}:{w.b[1]}")
-
-        pins: List[Tuple[str, str]] = []
-        for cid, cw in self.components.items():
-            for pname in cw.pin_world().keys():
-                pins.append((cid, pname))
-        for jid in self.junctions.keys():
-            pins.append((f"J:{jid}", "J"))
-        if not pins:
+        if not self.components and not self.junctions:
             return False, "Añade al menos un componente."
 
-        groups: Dict[str, List[Tuple[str, str]]] = {}
-        for cid, pn in pins:
-            r = uf.find(f"{cid}:{pn}")
-            groups.setdefault(r, []).append((cid, pn))
-
-        names: Dict[str, str] = {}
-        k = 1
-        if self._gnd:
-            names[uf.find(f"{self._gnd[0]}:{self._gnd[1]}")] = "GND"
-        for r in groups.keys():
-            if r not in names:
-                names[r] = f"N{k}"
-                k += 1
-
-        # grafo de nodos
-        adj: Dict[str, set] = {names[r]: set() for r in groups.keys()}
-        used_nodes: set = set()
-
-        for cid, cw in self.components.items():
-            pin2node: Dict[str, str] = {}
-            for pname in cw.pin_world().keys():
-                root = uf.find(f"{cid}:{pname}")
-                pin2node[pname] = names[root]
-                used_nodes.add(names[root])
-
-            if cw.ctype == "R":
-                n1, n2 = pin2node["A"], pin2node["B"]
-            elif cw.ctype == "V":
-                n1, n2 = pin2node["+"], pin2node["-"]
-            else:
-                n1, n2 = pin2node["A"], pin2node["K"]
-
-            adj.setdefault(n1, set()).add(n2)
-            adj.setdefault(n2, set()).add(n1)
-
+        # Mismo nombrado de nodos que la simulación; el recorrido usa el
+        # índice de incidencia del Netlist
+        nl = self.build_netlist()
+        used_nodes = {nid for nid in nl.nodes if nl.degree(nid)}
         if not used_nodes:
             return False, "Coloca y conecta componentes antes de simular."
 
-        if self._gnd:
-            ref_node = names[uf.find(f"{self._gnd[0]}:{self._gnd[1]}")]
+        if self._gnd or nl.degree("GND"):
+            ref_node = "GND"
         else:
             ref_node = next(iter(used_nodes))
 
-        visited = set()
-        stack = [ref_node]
-        while stack:
-            u = stack.pop()
-            if u in visited:
-                continue
-            visited.add(u)
-            for v in adj.get(u, ()):
-                if v not in visited:
-                    stack.append(v)
-
+        visited = nl.reachable(ref_node)
         not_reached = used_nodes - visited
         if not_reached:
             listado = ", ".join(sorted(not_reached))
@@ -808,7 +760,10 @@ class CircuitCanvas(FloatLayout):
                 app.set_status(msg)
                 return
             nl = self.build_netlist()
-            sol = simulate(nl)
+            sol = self._session.sync(nl) if self._session else None
+            if sol is None:
+                self._session = SimulationSession(nl)
+                sol = self._session.solution
             app.show_results(sol)
             app.set_status("Simulación lista.")
         except Exception as e:
@@ -991,6 +946,9 @@ class CircuitCanvas(FloatLayout):
                 p.dismiss()
                 App.get_running_app().update_inspector(cw)
                 cw._redraw()
+                # Si ya hay resultados, se actualizan al instante
+                if self._session is not None:
+                    self.simulate_from_canvas()
             except Exception as e:
                 App.get_running_app().set_status(f"Error: {e}")
 
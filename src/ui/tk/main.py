@@ -3,6 +3,7 @@ from tkinter import filedialog, messagebox
 import os
 from src.app.serialization import load_json
 from src.app.simulate import simulate
+from src.app.cache import SimulationCache
 from src.app.export_pdf import export_solution_pdf
 from src.ui.tk.tutorials import open_tutorial
 from src.ui.tk.errors import guard
@@ -19,6 +20,8 @@ class App(tk.Tk):
         self.title("Sim-Elec")
         self.geometry("820x560")
         self.netlist_path = None
+        # export_pdf repite la simulación de run_sim: la caché la evita
+        self.cache = SimulationCache()
         self.text = tk.Text(self, wrap="word")
         self.text.pack(fill="both", expand=True)
         self._menu()
@@ -77,7 +80,7 @@ class App(tk.Tk):
             messagebox.showwarning("Atención","Carga un netlist JSON primero.")
             return
         nl = load_json(self.netlist_path)
-        sol = simulate(nl)
+        sol = simulate(nl, cache=self.cache)
         self.text_delete()
         self.text.insert("end", "=== RESULTADOS ===\n")
         for k,v in sol.node_voltages.items():
@@ -94,7 +97,7 @@ class App(tk.Tk):
             messagebox.showwarning("Atención","Simula o carga primero un netlist.")
             return
         nl = load_json(self.netlist_path)
-        sol = simulate(nl)
+        sol = simulate(nl, cache=self.cache)
         path = filedialog.asksaveasfilename(defaultextension=".pdf")
         if not path: return
         export_solution_pdf(path, nl, sol)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permite `pytest` desde la raíz sin instalar el paquete (imports `src.…`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.capacitor import Capacitor
+from src.domain.components.inductor import Inductor
+from src.app.simulate import ac
+
+
+def lowpass(R=1e3, C=1e-6):
+    nl = Netlist()
+    for nid in ("GND", "in", "out"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "in", "GND", 0.0))
+    nl.add_component(Resistor("R1", "in", "out", R))
+    nl.add_component(Capacitor("C1", "out", "GND", C))
+    return nl
+
+
+def rc_ladder(n, inductor=False):
+    # Línea RC distribuida (con una inductancia de carga opcional)
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("n0")
+    nl.add_component(VSource("V1", "n0", "GND", 0.0))
+    for k in range(1, n + 1):
+        nl.add_node(f"n{k}")
+        nl.add_component(Resistor(f"R{k}", f"n{k-1}", f"n{k}", 10.0))
+        nl.add_component(Capacitor(f"C{k}", f"n{k}", "GND", 1e-10 * (1 + k % 3)))
+    if inductor:
+        nl.add_node("load")
+        nl.add_component(Inductor("L1", f"n{n}", "load", 1e-4))
+        nl.add_component(Resistor("RL", "load", "GND", 1e3))
+    return nl
+
+
+@pytest.mark.parametrize("method", ["direct", "prima"])
+def test_rc_lowpass_closed_form(method):
+    R, C = 1e3, 1e-6
+    f = np.logspace(0, 5, 41)
+    res = ac(lowpass(R, C), f, inputs={"V1": 1.0}, nodes=["out"], method=method)
+    H = 1.0 / (1.0 + 2j * np.pi * f * R * C)
+    np.testing.assert_allclose(np.abs(res.response[:, 0]), np.abs(H), rtol=1e-9)
+    np.testing.assert_allclose(np.angle(res.response[:, 0]), np.angle(H), atol=1e-9)
+    fc = 1.0 / (2 * np.pi * R * C)
+    hc = ac(lowpass(R, C), [fc], nodes=["out"], method=method).response[0, 0]
+    assert abs(hc) == pytest.approx(1 / np.sqrt(2), rel=1e-9)
+    assert np.angle(hc) == pytest.approx(-np.pi / 4, abs=1e-9)
+
+
+@pytest.mark.parametrize("inductor", [False, True])
+def test_prima_matches_direct(inductor):
+    nl = rc_ladder(400, inductor)
+    f = np.logspace(2, 6, 60)
+    nodes = ["n50", "n400"]
+    direct = ac(nl, f, nodes=nodes, method="direct")
+    prima = ac(nl, f, nodes=nodes, method="prima")
+    assert prima.solver["method"] == "prima" and prima.solver["order"] < 401
+    scale = np.abs(direct.response).max(axis=0)
+    assert np.max(np.abs(prima.response - direct.response) / scale) < 1e-6
+    assert prima.solver["residual"] < 1e-6
+    # La banda incluye el corte: la respuesta en n400 cae más de 40 dB
+    assert np.abs(direct.response[-1, 1]) < 1e-2 * np.abs(direct.response[0, 1])
@@ -0,0 +1,81 @@
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import IdealDiode
+from src.domain.compiled import as_compiled
+from src.analysis.blocks import decompose
+from src.app.simulate import simulate, simulate_blocks
+
+
+def assert_same(sol, ref):
+    for k, v in ref.node_voltages.items():
+        assert sol.node_voltages[k] == pytest.approx(v, rel=1e-9, abs=1e-9), k
+    for k, i in ref.branch_currents.items():
+        assert sol.branch_currents[k] == pytest.approx(i, rel=1e-9, abs=1e-12), k
+    assert sol.diode_states == ref.diode_states
+
+
+def multi_block(cells):
+    # Cadena de puentes unidos por nodos de corte: cada celda cuelga de la
+    # anterior por un solo nodo y su corriente circula por una fuente
+    # flotante (con un diodo en serie en las celdas pares). Un bloque aparte
+    # solo comparte GND.
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("c0")
+    nl.add_component(VSource("V0", "c0", "GND", 9.0))
+    nl.add_component(Resistor("R0", "c0", "GND", 1e3))
+    for k in range(cells):
+        a, b, c, d = f"c{k}", f"x{k}", f"y{k}", f"c{k+1}"
+        for nid in (b, c, d):
+            nl.add_node(nid)
+        nl.add_component(Resistor(f"A{k}", a, b, 100.0 + k))
+        nl.add_component(Resistor(f"B{k}", a, c, 220.0))
+        nl.add_component(Resistor(f"C{k}", b, c, 330.0))
+        nl.add_component(Resistor(f"D{k}", b, d, 470.0))
+        nl.add_component(Resistor(f"E{k}", c, d, 150.0))
+        if k % 2:
+            nl.add_component(VSource(f"VF{k}", d, a, 1.5))
+        else:
+            nl.add_node(f"z{k}")
+            nl.add_component(VSource(f"VF{k}", f"z{k}", a, 1.5))
+            nl.add_component(IdealDiode(f"DD{k}", f"z{k}", d))
+    nl.add_node("s")
+    nl.add_component(VSource("VS", "s", "GND", -3.0))
+    nl.add_component(Resistor("RS", "s", "GND", 10.0))
+    return nl
+
+
+def parallel_bridges():
+    # Dos puentes que solo comparten GND con la fuente y un nodo de corte
+    nl = Netlist()
+    for nid in ("GND", "a", "b", "c", "d", "e", "f"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 5.0))
+    for cid, n1, n2, r in (("R1", "a", "b", 10.0), ("R2", "a", "c", 20.0), ("R3", "b", "c", 30.0),
+                           ("R4", "b", "GND", 40.0), ("R5", "c", "GND", 50.0),
+                           ("R6", "c", "d", 60.0), ("R7", "c", "e", 70.0), ("R8", "d", "e", 80.0),
+                           ("R9", "d", "f", 90.0), ("R10", "e", "f", 100.0)):
+        nl.add_component(Resistor(cid, n1, n2, r))
+    return nl
+
+
+@pytest.mark.parametrize("make", [lambda: multi_block(12), parallel_bridges])
+@pytest.mark.parametrize("max_unknowns,workers", [(20000, 1), (1, 1), (4, 2)])
+def test_blocks_match_plain(make, max_unknowns, workers):
+    nl = make()
+    ref = simulate(nl)
+    sol = simulate_blocks(nl, workers=workers, max_unknowns=max_unknowns)
+    assert_same(sol, ref)
+    assert sol.checks["summary"]["ok"]
+    if max_unknowns == 1:
+        assert sol.solver["chunks"] == sol.solver["blocks"]
+
+
+def test_decomposition():
+    dec = decompose(as_compiled(multi_block(4)))
+    # V0 con R0, un bloque por celda y el de VS; los anclajes de las celdas
+    # son los nodos de corte
+    assert dec.n_blocks == 1 + 4 + 1
+    assert len(dec.articulation) == 4
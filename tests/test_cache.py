@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.app.cache import SimulationCache
+from src.app.simulate import simulate
+from src.app.validation import ConnectivityError, GroundError
+
+
+def divider():
+    nl = Netlist()
+    for nid in ("GND", "a", "b"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 5.0))
+    nl.add_component(Resistor("R1", "a", "b", 1e3))
+    nl.add_component(Resistor("R2", "b", "GND", 1e3))
+    return nl
+
+
+def test_cache_hit_reuses_solution():
+    cache = SimulationCache()
+    first = simulate(divider(), cache=cache)
+    again = simulate(divider(), cache=cache)
+    assert cache.stats()["hits_memory"] == 1
+    assert again.node_voltages["b"] == pytest.approx(first.node_voltages["b"])
+
+
+def test_cache_does_not_hide_second_ground():
+    cache = SimulationCache()
+    simulate(divider(), cache=cache)
+    nl = divider()
+    nl.add_node("G2", True)
+    with pytest.raises(GroundError):
+        simulate(nl, cache=cache)
+
+
+def test_cache_does_not_hide_isolated_node():
+    cache = SimulationCache()
+    simulate(divider(), cache=cache)
+    nl = divider()
+    nl.add_node("x")
+    with pytest.raises(ConnectivityError):
+        simulate(nl, cache=cache)
+
+
+def test_second_ground_changes_key():
+    from src.app.cache import canonical_key
+    nl = divider()
+    nl.add_node("G2", True)
+    nl.add_component(Resistor("R3", "b", "GND", 1e3))
+    other = divider()
+    other.add_node("G2", True)
+    other.add_component(Resistor("R3", "b", "G2", 1e3))
+    assert canonical_key(nl)[0] != canonical_key(other)[0]
+
+
+@pytest.mark.parametrize("options", [{"reduce": True}, {"ordering": "rcm"},
+                                     {"jacobian_reuse": 3}])
+def test_cache_key_includes_solve_options(options):
+    cache = SimulationCache()
+    simulate(divider(), cache=cache)
+    sol = simulate(divider(), cache=cache, **options)
+    assert cache.stats()["misses"] == 2
+    if options.get("reduce"):
+        assert "reduction" in sol.solver
+    simulate(divider(), cache=cache, **options)
+    assert cache.stats()["hits_memory"] == 1
+
+
+def shockley_divider():
+    from src.domain.components.diode import ShockleyDiode
+    nl = divider()
+    nl.add_node("c")
+    nl.add_component(Resistor("R3", "b", "c", 100.0))
+    nl.add_component(ShockleyDiode("D1", "c", "GND", 1e-14, 1.2))
+    return nl
+
+
+@pytest.mark.parametrize("build", [divider, shockley_divider])
+def test_disk_tier_roundtrip_without_pickle(tmp_path, build):
+    first = simulate(build(), cache=SimulationCache(disk_dir=str(tmp_path)))
+    assert "cached" not in first.solver
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 1 and files[0].endswith(".npz")
+    with np.load(tmp_path / files[0], allow_pickle=False) as z:
+        assert set(z.files) == {"labels", "v", "i", "doc"}
+    cache = SimulationCache(disk_dir=str(tmp_path))
+    again = simulate(build(), cache=cache)
+    assert cache.stats()["hits_disk"] == 1
+    assert again.solver["cached"] is True
+    assert again.solver["method"] == first.solver["method"]
+    for k, v in first.node_voltages.items():
+        assert again.node_voltages[k] == v
+    for k, i in first.branch_currents.items():
+        assert again.branch_currents[k] == i
+    assert again.checks == first.checks
+    assert simulate(build(), cache=cache).solver["cached"] is True
+    assert cache.stats()["hits_memory"] == 1
+
+
+def test_disk_tier_ignores_foreign_files(tmp_path):
+    from src.app.cache import canonical_key
+    cn = divider().compile()
+    key = canonical_key(cn, "auto", "full", {"reduce": False, "ordering": "colamd",
+                                            "jacobian_reuse": 1, "hierarchical": False})[0]
+    # Un pickle (o cualquier otra cosa) con el nombre de la clave no se carga
+    (tmp_path / f"{key}.npz").write_bytes(b"\x80\x04garbage")
+    cache = SimulationCache(disk_dir=str(tmp_path))
+    sol = simulate(divider(), cache=cache)
+    assert cache.stats() == {"hits_memory": 0, "hits_disk": 0, "misses": 1, "entries": 1}
+    assert "cached" not in sol.solver
+    assert SimulationCache(disk_dir=str(tmp_path)).lookup(cn, options={
+        "reduce": False, "ordering": "colamd", "jacobian_reuse": 1, "hierarchical": False})[2] is not None
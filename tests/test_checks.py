@@ -0,0 +1,59 @@
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import IdealDiode
+from src.analysis.checks import CHECK_LEVELS, run_checks
+from src.analysis.results import Solution
+from src.app.simulate import simulate
+
+SUMMARY_KEYS = {"kcl_max", "kcl_rms", "kcl_failed", "kvl_max", "kvl_failed", "ok"}
+
+
+def divider():
+    nl = Netlist()
+    for nid in ("GND", "a", "b", "c"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 10.0))
+    nl.add_component(Resistor("R1", "a", "b", 1e3))
+    nl.add_component(Resistor("R2", "b", "GND", 1e3))
+    nl.add_component(IdealDiode("D1", "b", "c"))
+    nl.add_component(Resistor("R3", "c", "GND", 2e3))
+    return nl
+
+
+def test_levels_keys():
+    nl = divider()
+    sol = simulate(nl, checks="off")
+    assert sol.checks == {}
+    assert run_checks(nl, sol, level="off") == {}
+    summary = run_checks(nl, sol, level="summary")
+    assert set(summary) == {"summary"} and set(summary["summary"]) == SUMMARY_KEYS
+    full = run_checks(nl, sol, level="full")
+    assert set(full) == {"summary", "KCL", "KVL"}
+    assert set(full["KCL"]) == {"a", "b", "c"}
+    assert set(full["KVL"]) == {"KVL_V1"}
+    assert all(set(d) == {"sum_A", "ok"} for d in full["KCL"].values())
+    assert full["summary"] == summary["summary"] and full["summary"]["ok"]
+    for level in CHECK_LEVELS:
+        assert simulate(nl, checks=level).checks == run_checks(nl, sol, level=level)
+
+
+def test_detects_violations():
+    nl = divider()
+    sol = simulate(nl, checks="off")
+    bad = Solution(node_voltages=dict(sol.node_voltages.items()),
+                   branch_currents=dict(sol.branch_currents.items()))
+    bad.node_voltages["b"] += 0.5     # rompe LCK en a y b (Ley de Ohm)
+    bad.node_voltages["a"] = 9.0      # y LVK de V1
+    out = run_checks(nl, bad, level="full")
+    s = out["summary"]
+    assert not s["ok"] and s["kvl_failed"] == 1 and s["kcl_failed"] >= 2
+    assert s["kvl_max"] == pytest.approx(1.0)
+    assert not out["KCL"]["b"]["ok"] and not out["KVL"]["KVL_V1"]["ok"]
+
+
+def test_unknown_level():
+    nl = divider()
+    with pytest.raises(ValueError, match="Nivel de checks"):
+        run_checks(nl, simulate(nl, checks="off"), level="basic")
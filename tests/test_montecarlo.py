@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import scipy.sparse.linalg as spla
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.analysis.compiled import BATCH_DENSE_MAX, BATCH_LOWRANK_MAX, CompiledCircuit
+from src.app.montecarlo import monte_carlo
+from src.app.validation import ParameterError
+
+
+def divider():
+    nl = Netlist()
+    for nid in ("GND", "a", "b"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 10.0))
+    nl.add_component(Resistor("R1", "a", "b", 1e3))
+    nl.add_component(Resistor("R2", "b", "GND", 1e3))
+    return nl
+
+
+def test_monte_carlo_counts_samples():
+    res = monte_carlo(divider(), 500, seed=1, limits={"V(b)": (4.0, 6.0)})
+    assert res.n_samples == 500
+    assert res.mean[res.signals.index("V(b)")] == pytest.approx(5.0, abs=0.05)
+
+
+@pytest.mark.parametrize("n", [0, -3])
+def test_monte_carlo_rejects_empty_run(n):
+    with pytest.raises(ParameterError):
+        monte_carlo(divider(), n)
+
+
+def ladder(n):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for i in range(n + 1):
+        nl.add_node(f"n{i}")
+    nl.add_component(VSource("V1", "n0", "GND", 5.0))
+    for i in range(n):
+        nl.add_component(Resistor(f"Rs{i}", f"n{i}", f"n{i+1}", 10.0 + i % 7))
+        nl.add_component(Resistor(f"Rp{i}", f"n{i+1}", "GND", 1e3 + 13 * i))
+    return nl
+
+
+@pytest.mark.parametrize("n_varied", [5, 400])
+def test_large_batch_matches_per_point_solve(n_varied, monkeypatch):
+    nl = ladder(300)
+    cc = CompiledCircuit(nl)
+    assert cc.size > BATCH_DENSE_MAX
+    ids = ["V1"] + [f"Rs{i}" for i in range(n_varied // 2)] + [f"Rp{i}" for i in range(n_varied - n_varied // 2)]
+    rng = np.random.default_rng(0)
+    nominal = np.array([5.0] + [cc.value_of(c) for c in ids[1:]])
+    values = nominal * rng.uniform(0.8, 1.2, size=(8, len(ids)))
+    calls = []
+    real = spla.splu
+    monkeypatch.setattr(spla, "splu", lambda *a, **k: calls.append(1) or real(*a, **k))
+    X, _ = cc.solve_batch(ids, values)
+    assert len(calls) == (0 if n_varied <= BATCH_LOWRANK_MAX else len(values))
+    monkeypatch.undo()
+    for p, row in enumerate(values):
+        ref = CompiledCircuit(nl)
+        ref.set_values(dict(zip(ids, row)))
+        np.testing.assert_allclose(X[p], ref.solve_vector(), rtol=1e-9, atol=1e-12)
@@ -0,0 +1,47 @@
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+
+
+def chain(n):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for k in range(n):
+        nl.add_node(f"n{k}")
+        nl.add_component(Resistor(f"R{k}", f"n{k}", "GND" if k == 0 else f"n{k-1}", 1.0))
+    return nl
+
+
+def test_remove_component_updates_indexes():
+    nl = chain(5)
+    c = nl.remove_component("R2")
+    assert c.id == "R2"
+    assert sorted(x.id for x in nl.components) == ["R0", "R1", "R3", "R4"]
+    assert [x.id for x in nl.components_at("n2")] == ["R3"]
+    assert nl.neighbors("n1") == {"n0"}
+    # El que ocupó el hueco sigue localizable
+    nl.remove_component("R4")
+    nl.remove_component("R0")
+    assert sorted(x.id for x in nl.components) == ["R1", "R3"]
+
+
+def test_remove_component_missing_raises():
+    nl = chain(2)
+    nl.remove_component("R1")
+    with pytest.raises(KeyError):
+        nl.remove_component("R1")
+
+
+def test_remove_component_with_duplicate_ids():
+    nl = chain(2)
+    nl.add_component(Resistor("R0", "n1", "GND", 2.0))
+    nl.remove_component("R0")
+    nl.remove_component("R0")
+    assert [x.id for x in nl.components] == ["R1"]
+
+
+def test_netlist_from_component_list():
+    nl = Netlist(components=[Resistor("A", "x", "y", 1.0), Resistor("B", "y", "z", 1.0)])
+    nl.remove_component("A")
+    assert [x.id for x in nl.components] == ["B"]
+    assert nl.degree("x") == 0
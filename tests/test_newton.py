@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import ShockleyDiode
+from src.analysis.newton import VT, NewtonError
+from src.analysis.tableau import GMIN
+from src.app.simulate import simulate
+
+
+def diode_circuit(V, R=None, Is=1e-14, n=1.0):
+    nl = Netlist()
+    for nid in ("GND", "a") if R is None else ("GND", "a", "b"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", V))
+    if R is None:
+        nl.add_component(ShockleyDiode("D1", "a", "GND", Is, n))
+    else:
+        nl.add_component(Resistor("R1", "a", "b", R))
+        nl.add_component(ShockleyDiode("D1", "b", "GND", Is, n))
+    return nl
+
+
+@pytest.mark.parametrize("V,R", [(5.0, 1e3), (10.0, 1.0), (-5.0, 1e3)])
+def test_series_resistor_matches_shockley(V, R):
+    sol = simulate(diode_circuit(V, R, n=1.5))
+    vd, i = sol.node_voltages["b"], sol.branch_currents["D1"]
+    assert i == pytest.approx((V - vd) / R, rel=1e-6, abs=1e-12)
+    # La corriente de rama incluye el GMIN en paralelo con el diodo
+    assert i == pytest.approx(1e-14 * np.expm1(vd / (1.5 * VT)) + GMIN * vd, rel=1e-6, abs=1e-15)
+    assert abs(i) < abs(V) / R + 1e-12
+
+
+def test_stiff_source_across_diode_raises():
+    with pytest.raises(NewtonError, match="D1"):
+        simulate(diode_circuit(10.0))
+
+
+def test_moderate_source_across_diode_converges():
+    sol = simulate(diode_circuit(0.6))
+    assert sol.branch_currents["D1"] == pytest.approx(1e-14 * np.expm1(0.6 / VT) + GMIN * 0.6, rel=1e-6)
+
+
+def test_jacobian_reuse_same_point():
+    ref = simulate(diode_circuit(5.0, 1e3))
+    sol = simulate(diode_circuit(5.0, 1e3), jacobian_reuse=3)
+    assert sol.node_voltages["b"] == pytest.approx(ref.node_voltages["b"], abs=1e-9)
+    assert sol.solver["factorizations"] <= sol.solver["iterations"]
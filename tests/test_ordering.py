@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.analysis.tableau import build_system
+from src.analysis.ordering import OrderedLU, compare_orderings
+from src.analysis.compiled import CompiledCircuit
+from src.app.simulate import compile_circuit, simulate, sweep
+
+
+def grid(n):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for i in range(n):
+        for j in range(n):
+            nl.add_node(f"n{i}_{j}")
+    nl.add_component(VSource("V0", "n0_0", "GND", 1.0))
+    for i in range(n):
+        for j in range(n):
+            if j + 1 < n:
+                nl.add_component(Resistor(f"Rh{i}_{j}", f"n{i}_{j}", f"n{i}_{j+1}", 1.0 + (i + j) % 3))
+            if i + 1 < n:
+                nl.add_component(Resistor(f"Rv{i}_{j}", f"n{i}_{j}", f"n{i+1}_{j}", 2.0))
+    nl.add_component(Resistor("RL", f"n{n-1}_{n-1}", "GND", 10.0))
+    return nl
+
+
+def test_natural_fill_only_on_request():
+    A, _, _ = build_system(grid(12), sparse=True)
+    st = OrderedLU(A, "mmd").stats
+    assert st["nnz_LU_natural"] is None and st["fill"][0] is None
+    assert st["fill"][1] == st["nnz_LU"] - st["nnz_A"]
+    assert st["profile"][1] is None
+
+
+def test_bandwidth_uses_actual_permutations():
+    A, _, _ = build_system(grid(10), sparse=True)
+    for name in ("colamd", "mmd", "rcm", "natural"):
+        lu = OrderedLU(A, name)
+        Ap = sp.csr_matrix(A)[lu.row_order][:, lu.column_order].tocoo()
+        assert lu.stats["bandwidth"][1] == int(np.abs(Ap.row - Ap.col).max()), name
+    rcm = OrderedLU(A, "rcm").stats
+    assert rcm["profile"][1] <= rcm["profile"][0]
+
+
+def test_stats_record_natural_fill():
+    A, b, _ = build_system(grid(12), sparse=True)
+    lu = OrderedLU(A, "mmd", natural_fill=True)
+    st = lu.stats
+    assert st["nnz_LU_natural"] is not None
+    assert st["fill"] == (st["nnz_LU_natural"] - st["nnz_A"], st["nnz_LU"] - st["nnz_A"])
+    assert st["fill"][0] >= st["fill"][1]
+    assert st["profile"][0] >= st["nnz_A"]
+    nat = OrderedLU(A, "natural").stats
+    assert st["nnz_LU_natural"] == nat["nnz_LU"]
+    np.testing.assert_allclose(A @ lu.solve(b), b, atol=1e-9)
+
+
+def test_compare_orderings_shares_natural_fill():
+    A, _, _ = build_system(grid(8), sparse=True)
+    out = compare_orderings(A)
+    natural = out["natural"]["nnz_LU"]
+    for st in out.values():
+        assert st["nnz_LU_natural"] == natural
+        assert st["fill"][0] == natural - st["nnz_A"]
+
+
+@pytest.mark.parametrize("ordering", ["colamd", "mmd", "rcm", "natural"])
+def test_compiled_circuit_honours_ordering(ordering):
+    nl = grid(6)
+    cc = CompiledCircuit(nl, ordering=ordering)
+    assert cc.ordering_stats["ordering"] == ordering
+    sol = cc.solve()
+    assert sol.solver["ordering"]["ordering"] == ordering
+    ref = simulate(nl, method="splu")
+    for k, v in ref.node_voltages.items():
+        assert sol.node_voltages[k] == pytest.approx(v, abs=1e-9)
+    cc.set_value("RL", 20.0)
+    res = sweep(nl, {"RL": [10.0, 20.0]}, ordering=ordering)
+    col = res.node_ids.index("n5_5")
+    assert cc.solve().node_voltages["n5_5"] == pytest.approx(res.node_voltages[1, col], abs=1e-9)
+    assert sol.node_voltages["n5_5"] == pytest.approx(res.node_voltages[0, col], abs=1e-9)
+
+
+def test_default_ordering_is_shared():
+    assert compile_circuit(grid(3)).ordering == "colamd"
+    assert simulate(grid(3), method="splu").solver["ordering"]["ordering"] == "colamd"
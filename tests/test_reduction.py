@@ -0,0 +1,76 @@
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import IdealDiode
+from src.app.simulate import simulate
+
+
+def assert_same(sol, ref):
+    assert set(sol.node_voltages.keys()) == set(ref.node_voltages.keys())
+    for k, v in ref.node_voltages.items():
+        assert sol.node_voltages[k] == pytest.approx(v, rel=1e-9, abs=1e-9), k
+    assert set(sol.branch_currents.keys()) == set(ref.branch_currents.keys())
+    for k, i in ref.branch_currents.items():
+        assert sol.branch_currents[k] == pytest.approx(i, rel=1e-9, abs=1e-12), k
+    assert sol.diode_states == ref.diode_states
+
+
+def build(nodes, comps):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for nid in nodes:
+        nl.add_node(nid)
+    for c in comps:
+        nl.add_component(c)
+    return nl
+
+
+def series_parallel_chain(n):
+    # Escalera de tramos: serie de dos resistores, paralelo de tres y una
+    # rama colgante por tramo
+    nodes, comps = ["n0"], [VSource("V1", "n0", "GND", 12.0)]
+    for k in range(n):
+        a, m, b, p = f"n{k}", f"m{k}", f"n{k+1}", f"p{k}"
+        nodes += [m, b, p]
+        comps += [Resistor(f"Rs{k}a", a, m, 100.0 + k), Resistor(f"Rs{k}b", m, b, 50.0),
+                  Resistor(f"Rp{k}a", b, "GND", 1e3), Resistor(f"Rp{k}b", b, "GND", 2e3),
+                  Resistor(f"Rp{k}c", b, "GND", 3e3 + k), Resistor(f"Rd{k}", b, p, 10.0)]
+    return build(nodes, comps)
+
+
+def bridge():
+    # Puente de Wheatstone desequilibrado con resistores en serie en sus ramas
+    return build(("a", "b", "c", "d", "e"), [
+        VSource("V1", "a", "GND", 10.0),
+        Resistor("R1", "a", "b", 100.0), Resistor("R2", "a", "c", 220.0),
+        Resistor("R3", "b", "GND", 330.0), Resistor("R4", "c", "d", 200.0),
+        Resistor("R5", "d", "GND", 270.0), Resistor("R6", "b", "e", 40.0),
+        Resistor("R7", "e", "c", 60.0), Resistor("R8", "b", "c", 500.0),
+    ])
+
+
+def with_diodes():
+    return build(("a", "b", "c", "d"), [
+        VSource("V1", "a", "GND", 5.0),
+        Resistor("R1", "a", "b", 100.0), Resistor("R2", "b", "c", 200.0),
+        Resistor("R3", "b", "c", 300.0), IdealDiode("D1", "c", "d"),
+        Resistor("R4", "d", "GND", 1e3), IdealDiode("D2", "GND", "b"),
+    ])
+
+
+@pytest.mark.parametrize("make", [lambda: series_parallel_chain(30), bridge, with_diodes])
+def test_reduced_matches_plain(make):
+    nl = make()
+    ref = simulate(nl)
+    sol = simulate(nl, reduce=True)
+    assert_same(sol, ref)
+    assert sol.checks["summary"]["ok"]
+
+
+def test_reduction_stats():
+    nl = series_parallel_chain(10)
+    stats = simulate(nl, reduce=True).solver["reduction"]
+    assert stats["nodes"][1] < stats["nodes"][0]
+    assert stats["components"][1] < stats["components"][0]
+    assert stats["series"] > 0 and stats["parallel"] > 0 and stats["dangling"] > 0
@@ -0,0 +1,47 @@
+import io
+import json
+import pytest
+from src.app.run_cli import main, run_batch
+
+GOOD = "* ok\nV1 a 0 5\nR1 a b 1k\nR2 b 0 1k\n.end\n"
+# Dos fuentes en paralelo con valores distintos: la LU es singular
+LOOP = "* lazo\nV1 a 0 5\nV2 a 0 3\nR1 a 0 1k\n.end\n"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_records_failure_and_continues(tmp_path, workers):
+    paths = []
+    for name, deck in (("a.cir", GOOD), ("b.cir", LOOP), ("c.cir", GOOD)):
+        p = tmp_path / name
+        p.write_text(deck)
+        paths.append(str(p))
+    out = io.StringIO()
+    total, failed = run_batch(paths, out, workers=workers, method="splu", checks="off")
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (total, failed) == (3, 1)
+    assert [r["ok"] for r in recs] == [True, False, True]
+    assert recs[1]["error"] in ("RuntimeError", "LinAlgError", "ValidationError")
+    assert recs[2]["node_voltages"]["b"] == pytest.approx(2.5)
+
+
+def test_method_choices(tmp_path, capsys):
+    p = tmp_path / "a.cir"
+    p.write_text(GOOD)
+    with pytest.raises(SystemExit) as e:
+        main([str(p), "--method", "spl"])
+    assert e.value.code == 2
+    assert "spl" in capsys.readouterr().err
+
+
+def test_newton_record_summarised(tmp_path):
+    good = tmp_path / "d.cir"
+    good.write_text("* d\nV1 a 0 5\nR1 a b 1k\nD1 b 0 DS\n.model DS D (IS=1e-14 N=1.5)\n.end\n")
+    bad = tmp_path / "e.cir"
+    bad.write_text("* e\nV1 a 0 10\nD1 a 0 DS\n.model DS D (IS=1e-14)\n.end\n")
+    out = io.StringIO()
+    assert run_batch([str(bad), str(good)], out, checks="off") == (2, 1)
+    bad_rec, rec = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert bad_rec["error"] == "NewtonError"
+    assert "history" not in rec["solver"]
+    assert rec["solver"]["iterations"] >= 1 and rec["solver"]["factorizations"] >= 1
+    assert rec["solver"]["residual"] < 1e-6
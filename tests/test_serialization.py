@@ -0,0 +1,115 @@
+import json
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.subcircuit import Instance, Subcircuit
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import IdealDiode, ShockleyDiode
+from src.domain.components.capacitor import Capacitor
+from src.domain.components.inductor import Inductor
+from src.app.serialization import (load_binary, load_binary_solution, load_json,
+                                   load_json_stream, save_binary, save_json)
+from src.app.simulate import simulate
+
+
+def mixed():
+    nl = Netlist()
+    for nid in ("GND", "a", 'nodo "b" ñ', "c", "d"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 5.0))
+    nl.add_component(Resistor("R1", "a", 'nodo "b" ñ', 1e3))
+    nl.add_component(IdealDiode("D1", 'nodo "b" ñ', "c", "A_to_K"))
+    nl.add_component(IdealDiode("D2", "GND", "c", "K_to_A"))
+    nl.add_component(Resistor("R2", "c", "GND", 2.2e3))
+    nl.add_component(Capacitor("C1", "c", "d", 1e-6))
+    nl.add_component(Inductor("L1", "d", "GND", 1e-3))
+    return nl
+
+
+def with_shockley():
+    nl = mixed()
+    nl.remove_component("D1")
+    nl.remove_component("D2")
+    nl.add_component(ShockleyDiode("DS1", 'nodo "b" ñ', "c", 2e-14, 1.7))
+    return nl
+
+
+def assert_same_compiled(a, b):
+    assert list(a.node_ids) == list(b.node_ids)
+    assert list(a.comp_ids) == list(b.comp_ids)
+    for name in ("is_ground", "declared", "kind", "n1", "n2", "value", "aux"):
+        assert np.array_equal(np.asarray(getattr(a, name)), np.asarray(getattr(b, name))), name
+
+
+@pytest.mark.parametrize("build", [mixed, with_shockley])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_json_binary_json_roundtrip(tmp_path, build, mmap):
+    src = tmp_path / "in.json"
+    save_json(build(), str(src))
+    save_binary(load_json(str(src)), str(tmp_path / "nl.bin"))
+    cn = load_binary(str(tmp_path / "nl.bin"), mmap=mmap)
+    assert_same_compiled(cn, load_json(str(src)).compile())
+    out = tmp_path / "out.json"
+    save_json(cn.to_netlist(), str(out))
+    assert json.loads(out.read_text(encoding="utf-8")) == json.loads(src.read_text(encoding="utf-8"))
+
+
+def test_solution_memmap_roundtrip(tmp_path):
+    nl = mixed()
+    sol = simulate(nl)
+    path = str(tmp_path / "sol.bin")
+    save_binary(nl, path, sol)
+    back = load_binary_solution(path)
+    assert isinstance(back.node_voltages.array, np.memmap)
+    assert list(back.node_voltages) == list(sol.node_voltages)
+    assert np.array_equal(back.node_voltages.array, sol.node_voltages.array)
+    assert np.array_equal(back.branch_currents.array, sol.branch_currents.array)
+    assert back.diode_states == sol.diode_states
+    assert back.checks["summary"] == sol.checks["summary"]
+    assert back.solver == json.loads(json.dumps(sol.solver))
+    # Copia en escritura: modificar la vista no cambia el archivo
+    back.node_voltages.array[:] = 0.0
+    assert np.array_equal(load_binary_solution(path, mmap=False).node_voltages.array,
+                          sol.node_voltages.array)
+
+
+def test_binary_without_solution(tmp_path):
+    path = str(tmp_path / "nl.bin")
+    save_binary(mixed(), path)
+    assert load_binary_solution(path) is None
+
+
+@pytest.mark.parametrize("build", [mixed, with_shockley])
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1 << 20])
+def test_json_stream_small_chunks(tmp_path, build, chunk_size):
+    path = str(tmp_path / "nl.json")
+    save_json(build(), path)
+    assert_same_compiled(load_json_stream(path, chunk_size=chunk_size), load_json(path).compile())
+
+
+def test_json_stream_components_before_nodes(tmp_path):
+    path = tmp_path / "nl.json"
+    save_json(mixed(), str(path))
+    full = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps({"components": full["components"], "nodes": full["nodes"]}),
+                    encoding="utf-8")
+    assert_same_compiled(load_json_stream(str(path), chunk_size=5), load_json(str(path)).compile())
+
+
+def test_json_stream_hierarchical_delegates(tmp_path):
+    sub = Netlist()
+    for nid in ("GND", "p"):
+        sub.add_node(nid, nid == "GND")
+    sub.add_component(Resistor("R", "p", "GND", 1e3))
+    nl = Netlist()
+    for nid in ("GND", "a"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 1.0))
+    nl.add_subcircuit(Subcircuit("S", ["p"], sub))
+    nl.add_instance(Instance("X1", "S", ["a"]))
+    path = str(tmp_path / "h.json")
+    save_json(nl, path)
+    back = load_json_stream(path, chunk_size=4)
+    assert isinstance(back, Netlist) and [i.id for i in back.instances] == ["X1"]
+    assert simulate(back).branch_currents["X1.R"] == pytest.approx(1e-3)
@@ -0,0 +1,80 @@
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.diode import IdealDiode
+from src.analysis.compiled import MAX_LOWRANK
+from src.app.session import SimulationSession
+from src.app.simulate import simulate
+
+
+def ladder(n, values=None, diode=False):
+    values = values or {}
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("n0")
+    nl.add_component(VSource("V1", "n0", "GND", values.get("V1", 5.0)))
+    for k in range(1, n + 1):
+        nl.add_node(f"n{k}")
+        nl.add_component(Resistor(f"R{k}", f"n{k-1}", f"n{k}", values.get(f"R{k}", 100.0 + k)))
+        nl.add_component(Resistor(f"G{k}", f"n{k}", "GND", values.get(f"G{k}", 1e3)))
+    if diode:
+        nl.add_node("d")
+        nl.add_component(IdealDiode("D1", f"n{n}", "d"))
+        nl.add_component(Resistor("RD", "d", "GND", values.get("RD", 50.0)))
+    return nl
+
+
+def assert_matches_fresh(sol, n, values, diode=False):
+    # Netlist nuevo con los mismos valores, sin compartir objetos con la sesión
+    ref = simulate(ladder(n, values, diode), method="splu")
+    for k, v in ref.node_voltages.items():
+        assert sol.node_voltages[k] == pytest.approx(v, rel=1e-9, abs=1e-12), k
+    for k, i in ref.branch_currents.items():
+        assert sol.branch_currents[k] == pytest.approx(i, rel=1e-9, abs=1e-14), k
+
+
+def test_rank_one_edit():
+    s = SimulationSession(ladder(40))
+    sol = s.set_value("R7", 33.0)
+    assert sol.solver["factorizations"] == 1 and sol.solver["lowrank_updates"] == 1
+    assert_matches_fresh(sol, 40, {"R7": 33.0})
+    sol = s.set_value("V1", -2.0)
+    assert sol.solver["factorizations"] == 1
+    assert_matches_fresh(sol, 40, {"R7": 33.0, "V1": -2.0})
+
+
+def test_refactor_after_max_lowrank():
+    s = SimulationSession(ladder(40))
+    values = {}
+    for k in range(1, MAX_LOWRANK + 3):
+        values[f"G{k}"] = 10.0 * k
+        sol = s.set_value(f"G{k}", values[f"G{k}"])
+        assert_matches_fresh(sol, 40, values)
+        if k <= MAX_LOWRANK:
+            assert sol.solver["factorizations"] == 1
+            assert sol.solver["lowrank_updates"] == k
+    # Pasado MAX_LOWRANK se refactoriza y las actualizaciones vuelven a cero
+    assert sol.solver["factorizations"] >= 2
+    assert sol.solver["lowrank_updates"] <= 1
+    values["R3"] = 1.0
+    assert_matches_fresh(s.set_value("R3", 1.0), 40, values)
+
+
+def test_set_values_and_sync():
+    s = SimulationSession(ladder(10))
+    sol = s.set_values({"R1": 1.0, "G5": 2.0, "V1": 3.0})
+    assert_matches_fresh(sol, 10, {"R1": 1.0, "G5": 2.0, "V1": 3.0})
+    values = {"R1": 1.0, "G5": 2.0, "V1": 3.0, "R9": 7.0}
+    assert_matches_fresh(s.sync(ladder(10, values)), 10, values)
+    other = ladder(10)
+    other.add_node("x")
+    other.add_component(Resistor("RX", "n3", "x", 1.0))
+    assert s.sync(other) is None
+
+
+def test_diode_session_resimulates():
+    s = SimulationSession(ladder(5, diode=True))
+    sol = s.set_value("RD", 5.0)
+    assert_matches_fresh(sol, 5, {"RD": 5.0}, diode=True)
+    assert sol.diode_states == {"D1": "ON"}
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.analysis.tableau import build_system
+from src.analysis.solver import LinearSolver, NodalBlock
+
+
+def ladder(n, floating=False):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for k in range(n):
+        nl.add_node(f"n{k}")
+    nl.add_component(VSource("V0", "n0", "GND", 5.0))
+    for k in range(1, n):
+        nl.add_component(Resistor(f"R{k}", f"n{k-1}", f"n{k}", 1.0 + k % 7))
+    for k in range(0, n, 10):
+        nl.add_component(Resistor(f"G{k}", f"n{k}", "GND", 100.0))
+    if floating:
+        nl.add_component(VSource("VF1", "n50", "n20", 1.5))
+        nl.add_component(VSource("VF2", "n21", "n50", -0.5))
+        nl.add_component(VSource("VG", "GND", f"n{n-1}", 1.0))
+    return nl
+
+
+@pytest.mark.parametrize("floating", [False, True])
+def test_cg_matches_splu_with_sources(floating):
+    A, b, _ = build_system(ladder(600, floating), sparse=True)
+    ref = LinearSolver("splu").solve(A, b)
+    ls = LinearSolver("cg")
+    x = ls.solve(A, b)
+    assert ls.method == "cg" and ls.iterations > 0
+    assert np.allclose(x, ref, rtol=0, atol=1e-7)
+
+
+def test_nodal_block_eliminates_source_nodes():
+    A, _, meta = build_system(ladder(600, True), sparse=True)
+    # n0 y n599 fijados por fuentes a GND; n20 y n21 ligados a n50
+    assert NodalBlock(A).matrix.shape == (meta.n - 4, meta.n - 4)
+
+
+def test_cg_rejects_source_loop():
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("a")
+    nl.add_component(VSource("V1", "a", "GND", 5.0))
+    nl.add_component(VSource("V2", "a", "GND", 5.0))
+    nl.add_component(Resistor("R1", "a", "GND", 1.0))
+    A, b, _ = build_system(nl, sparse=True)
+    with pytest.raises(np.linalg.LinAlgError, match="CG no aplicable"):
+        LinearSolver("cg").solve(A, b)
+
+
+def test_auto_picks_cg_on_powered_resistive_network():
+    A, b, _ = build_system(ladder(1500, True), sparse=True)
+    ls = LinearSolver()
+    x = ls.solve(A, b)
+    assert ls.method == "cg"
+    assert np.allclose(x, LinearSolver("splu").solve(A, b), rtol=0, atol=1e-7)
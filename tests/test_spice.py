@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+from src.app.spice import SpiceError, dumps_spice, loads_spice, parse_value
+from src.app.simulate import simulate
+from src.domain.netlist import Netlist
+from src.domain.subcircuit import Instance, Subcircuit
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+
+
+def source_value(card):
+    nl = loads_spice(f"* t\n{card}\nR1 in 0 1k\n.end\n")
+    return next(c.V for c in nl.components if c.kind == "V")
+
+
+@pytest.mark.parametrize("tok, value", [("4.7k", 4700.0), ("1meg", 1e6), ("10mil", 254e-6),
+                                        ("2.2uF", 2.2e-6), ("5V", 5.0), ("-3e-3", -3e-3)])
+def test_parse_value_suffixes(tok, value):
+    assert parse_value(tok) == pytest.approx(value)
+
+
+@pytest.mark.parametrize("card, value", [
+    ("V1 in 0 5", 5.0),
+    ("V1 in 0 DC 5", 5.0),
+    ("V1 in 0 dc=2.5", 2.5),
+    ("V1 in 0 DC 1 AC 1 0", 1.0),
+    ("V1 in 0 AC 1", 0.0),
+    ("V1 in 0 SIN(0 1 1k)", 0.0),
+    ("V1 in 0 SIN (0 1 1k)", 0.0),
+    ("V1 in 0 DC 3 SIN(0 1 1k)", 3.0),
+    ("V1 in 0 PULSE(0 5 1n 1n 1n 1u 2u)", 0.0),
+    ("V1 in 0 2 PULSE(0 5 1n 1n 1n 1u 2u)", 2.0),
+    ("V1 in 0 PWL(0 0 1m 5)", 0.0),
+    ("V1 in 0 SIN 0 1 1k", 0.0),
+])
+def test_source_forms(card, value):
+    assert source_value(card) == pytest.approx(value)
+
+
+def test_source_bad_value():
+    with pytest.raises(SpiceError, match="Línea 2"):
+        loads_spice("* t\nV1 in 0 DC abc\n.end\n")
+
+
+def test_model_after_use_and_continuation():
+    nl = loads_spice("* t\nV1 a 0 5\nR1 a b 1k\nD1 b 0 DMOD\nD2 b 0\n"
+                     ".model DMOD D(IS=1e-14\n+ N=1.5 RS=0)\n.end\n")
+    d1, d2 = nl.components[2], nl.components[3]
+    assert (d1.kind, d1.Is, d1.n) == ("DS", 1e-14, 1.5)
+    assert d2.kind == "D"
+
+
+def test_subckt_flattened():
+    deck = """* t
+V1 in 0 1
+X1 in mid DIV
+X2 mid out DIV
+RL out 0 1k
+.subckt DIV a b
+R1 a b 1k
+R2 b inner 500
+R3 inner 0 500
+.ends
+.end
+"""
+    nl = loads_spice(deck)
+    ids = [c.id for c in nl.components]
+    assert ids[:2] == ["V1", "RL"] and "X2.R2" in ids
+    assert "X1.inner" in nl.nodes and nl.nodes["GND"].is_ground
+    sol = simulate(nl)
+    assert sol.checks["summary"]["ok"]
+
+
+def test_compiled_matches_netlist():
+    deck = "* t\nV1 a 0 5\nR1 a b 1k\nD1 b GND DMOD\nC1 b c 1u\nL1 c 0 1m\n.model DMOD D (IS=2e-14)\n"
+    cn = loads_spice(deck, compiled=True)
+    ref = loads_spice(deck).compile()
+    assert cn.node_ids == ref.node_ids and cn.comp_ids == ref.comp_ids
+    for name in ("is_ground", "declared", "kind", "n1", "n2", "value", "aux"):
+        assert np.array_equal(getattr(cn, name), getattr(ref, name)), name
+
+
+def test_roundtrip_flat():
+    deck = "* t\nV1 a 0 5\nR1 a b 1k\nD1 b 0 DMOD\n.model DMOD D (IS=2e-14 N=1.2)\n"
+    nl = loads_spice(deck)
+    back = loads_spice(dumps_spice(nl))
+    assert [(c.id, c.kind) for c in back.components] == [(c.id, c.kind) for c in nl.components]
+    assert simulate(back).node_voltages["b"] == pytest.approx(simulate(nl).node_voltages["b"])
+
+
+def hierarchical():
+    div = Netlist()
+    div.add_node("GND", True)
+    for n in ("a", "b", "m"):
+        div.add_node(n)
+    div.add_component(Resistor("R1", "a", "m", 1000.0))
+    div.add_component(Resistor("R2", "m", "b", 500.0))
+    div.add_component(Resistor("R3", "m", "GND", 2000.0))
+    cell = Netlist()
+    cell.add_node("GND", True)
+    for n in ("p", "q", "k"):
+        cell.add_node(n)
+    cell.add_instance(Instance("XA", "div", ["p", "k"]))
+    cell.add_instance(Instance("XB", "div", ["k", "q"]))
+    nl = Netlist()
+    nl.add_node("GND", True)
+    for n in ("in", "mid", "out"):
+        nl.add_node(n)
+    nl.add_subcircuit(Subcircuit("div", ["a", "b"], div))
+    nl.add_subcircuit(Subcircuit("cell", ["p", "q"], cell))
+    nl.add_component(VSource("V1", "in", "GND", 3.0))
+    nl.add_component(Resistor("RL", "out", "GND", 750.0))
+    nl.add_instance(Instance("X1", "cell", ["in", "mid"]))
+    nl.add_instance(Instance("X2", "div", ["mid", "out"]))
+    return nl
+
+
+def test_roundtrip_hierarchical():
+    nl = hierarchical()
+    text = dumps_spice(nl)
+    assert ".subckt div a b" in text and ".subckt cell p q" in text
+    assert "X1 in mid cell" in text and "XA p k div" in text
+    back = loads_spice(text)
+    ref = simulate(nl)
+    assert sorted(c.id for c in back.components) == sorted(nl.compile().comp_ids)
+    sol = simulate(back)
+    assert sol.checks["summary"]["ok"]
+    for nid, v in ref.node_voltages.items():
+        assert sol.node_voltages[nid] == pytest.approx(v, abs=1e-12), nid
+
+
+@pytest.mark.parametrize("deck", ["* t\nQ1 a b c npn\n", "* t\nR1 a\n", "* t\n.subckt S a\nR1 a 0 1\n"])
+def test_errors(deck):
+    with pytest.raises(SpiceError):
+        loads_spice(deck)
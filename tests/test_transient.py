@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.domain.components.capacitor import Capacitor
+from src.domain.components.inductor import Inductor
+from src.analysis import ordering, transient as tr
+from src.app.simulate import transient
+
+R, C, L = 1e3, 1e-6, 1e-3
+
+
+def rc():
+    nl = Netlist()
+    for nid in ("GND", "in", "out"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "in", "GND", 1.0))
+    nl.add_component(Resistor("R1", "in", "out", R))
+    nl.add_component(Capacitor("C1", "out", "GND", C))
+    return nl
+
+
+def rl():
+    nl = Netlist()
+    for nid in ("GND", "in", "out"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "in", "GND", 1.0))
+    nl.add_component(Resistor("R1", "in", "out", R))
+    nl.add_component(Inductor("L1", "out", "GND", L))
+    return nl
+
+
+def rc_ladder(n):
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("n0")
+    nl.add_component(VSource("V1", "n0", "GND", 1.0))
+    for k in range(1, n + 1):
+        nl.add_node(f"n{k}")
+        nl.add_component(Resistor(f"R{k}", f"n{k-1}", f"n{k}", 10.0))
+        nl.add_component(Capacitor(f"C{k}", f"n{k}", "GND", 1e-9))
+    return nl
+
+
+# Error global: O(h) con Euler implícito, O(h²) con trapezoidal
+TOL = {"be": 2e-3, "trap": 1e-5}
+# Desde el reposo, el trapecio integra el escalón de la fuente como una rampa
+# en [0, h]: hasta O(h²) equivale al escalón en h/2.
+DELAY = {"be": 0.0, "trap": 0.5}
+
+
+@pytest.mark.parametrize("method", ["be", "trap"])
+def test_rc_step(method):
+    tau = R * C
+    h = tau / 500
+    res = transient(rc(), 5 * tau, h, method=method, sources={"V1": 1.0}, initial="zero")
+    t = res.time[1:] - DELAY[method] * h
+    v = res.node_voltages[1:, res.node_ids.index("out")]
+    np.testing.assert_allclose(v, 1.0 - np.exp(-t / tau), atol=TOL[method])
+    i = res.branch_currents[1:, res.branch_ids.index("C1")]
+    np.testing.assert_allclose(i[50:], np.exp(-t[50:] / tau) / R, atol=TOL[method] / R)
+
+
+@pytest.mark.parametrize("method", ["be", "trap"])
+def test_rl_step(method):
+    tau = L / R
+    h = tau / 500
+    res = transient(rl(), 5 * tau, h, method=method, initial="zero")
+    t = res.time[1:] - DELAY[method] * h
+    i = res.branch_currents[1:, res.branch_ids.index("L1")]
+    np.testing.assert_allclose(i, (1.0 - np.exp(-t / tau)) / R, atol=TOL[method] / R)
+    v = res.node_voltages[1:, res.node_ids.index("out")]
+    np.testing.assert_allclose(v[50:], np.exp(-t[50:] / tau), atol=TOL[method])
+
+
+def test_op_start_is_steady():
+    res = transient(rc(), 1e-3, 1e-5)
+    np.testing.assert_allclose(res.node_voltages[:, res.node_ids.index("out")], 1.0, atol=1e-12)
+
+
+@pytest.mark.parametrize("n", [20, 500])
+def test_fixed_step_factorizes_once(monkeypatch, n):
+    calls = {"factorization": 0, "splu": 0}
+    Factorization, splu = tr.Factorization, ordering.spla.splu
+
+    def counting_factorization(*args, **kw):
+        calls["factorization"] += 1
+        return Factorization(*args, **kw)
+
+    def counting_splu(*args, **kw):
+        calls["splu"] += 1
+        return splu(*args, **kw)
+
+    monkeypatch.setattr(tr, "Factorization", counting_factorization)
+    monkeypatch.setattr(ordering.spla, "splu", counting_splu)
+    res = transient(rc_ladder(n), 2e-6, 1e-8, initial="zero", currents=False)
+    assert res.solver["steps"] == 200
+    assert res.solver["propagator"] == ("dense" if n <= tr.PROPAGATOR_MAX else "substitution")
+    assert calls["factorization"] == 1
+    assert calls["splu"] == (1 if res.solver["factorization"] == "splu" else 0)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from src.domain.netlist import Netlist
+from src.domain.components.resistor import Resistor
+from src.domain.components.vsource import VSource
+from src.app.validation import (ConnectivityError, GroundError, ParameterError, TopologyError,
+                                ValidationError, check_netlist, connected_labels, validate)
+
+
+def broken():
+    nl = Netlist()
+    for nid in ("GND", "a", "b", "float"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 1.0))
+    nl.add_component(Resistor("R1", "a", "b", 10.0))
+    nl.add_component(Resistor("R1", "b", "GND", 20.0))      # ID repetido
+    nl.add_component(Resistor("R2", "b", "nada", 5.0))      # nodo inexistente
+    nl.add_component(Resistor("R3", "a", "GND", -1.0))      # R <= 0
+    return nl                                               # "float" queda suelto
+
+
+def test_report_collects_all_issues():
+    rep = check_netlist(broken())
+    assert not rep.ok
+    assert rep.counts == {"unknown_node": 1, "resistance": 1, "duplicate_id": 1, "connectivity": 1}
+    by_rule = {i.rule: i for i in rep.issues}
+    assert by_rule["unknown_node"].ids == ("R2",) and by_rule["unknown_node"].error is TopologyError
+    assert by_rule["duplicate_id"].ids == ("R1",)
+    assert by_rule["resistance"].error is ParameterError
+    assert "float" in by_rule["connectivity"].ids and by_rule["connectivity"].error is ConnectivityError
+    dup = rep.component_masks["duplicate_id"]
+    assert dup.tolist() == [False, False, True, False, False]
+    assert "4 problema(s)" in str(rep)
+
+
+def test_fail_fast_matches_validate():
+    # Reglas por componente en orden del netlist: el segundo R1 va antes que R2
+    rep = check_netlist(broken(), fail_fast=True)
+    assert len(rep.issues) == 1 and rep.issues[0].rule == "duplicate_id"
+    with pytest.raises(TopologyError, match="R1: ID repetido"):
+        validate(broken())
+
+
+def test_ground_and_empty():
+    nl = Netlist()
+    nl.add_node("a")
+    rep = check_netlist(nl)
+    assert [i.error for i in rep.issues] == [GroundError, ValidationError]
+    nl.add_node("GND", True)
+    nl.add_node("G2", True)
+    with pytest.raises(GroundError, match="2 nodos"):
+        validate(nl)
+
+
+def test_max_issues_truncates_but_counts():
+    nl = Netlist()
+    nl.add_node("GND", True)
+    nl.add_node("a")
+    nl.add_component(VSource("V1", "a", "GND", 1.0))
+    for k in range(50):
+        nl.add_component(Resistor(f"R{k}", "a", "GND", 0.0))
+    rep = check_netlist(nl, max_issues=10)
+    assert rep.counts["resistance"] == 50 and len(rep.issues) == 10 and rep.truncated
+
+
+def test_valid_circuit():
+    nl = Netlist()
+    for nid in ("GND", "a"):
+        nl.add_node(nid, nid == "GND")
+    nl.add_component(VSource("V1", "a", "GND", 1.0))
+    nl.add_component(Resistor("R1", "a", "GND", 1.0))
+    rep = check_netlist(nl)
+    assert rep.ok and not rep.issues and str(rep) == "Circuito válido."
+    validate(nl)
+
+
+def test_connected_labels_matches_scipy():
+    rng = np.random.default_rng(3)
+    n = 500
+    a, b = rng.integers(0, n, 300), rng.integers(0, n, 300)
+    label = connected_labels(n, a, b)
+    _, ref = connected_components(coo_matrix((np.ones(300), (a, b)), shape=(n, n)), directed=False)
+    # Misma partición y la etiqueta es el menor índice de cada componente
+    assert np.array_equal(label[:, None] == label[None, :], ref[:, None] == ref[None, :])
+    assert np.all(label <= np.arange(n)) and np.array_equal(label[label], label)